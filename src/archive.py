@@ -0,0 +1,145 @@
+import io
+import os
+import posixpath
+import shutil
+import tarfile
+import zipfile
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+# tar write modes; `|` streams, so output goes out as entries are added
+TAR_MODES = {".tar": "w|", ".tar.gz": "w|gz", ".tgz": "w|gz", ".tar.bz2": "w|bz2", ".tar.xz": "w|xz"}
+# formats that are already compressed, stored as-is in zip output
+STORED_SUFFIXES = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif",
+    ".woff", ".woff2", ".mp3", ".mp4", ".webm", ".pdf",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz",
+}
+# entries get a fixed timestamp, so the same site always gives the same archive
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def member_name(name):
+    """Normalize an archive member name, or return None for one outside the root."""
+    name = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+    if name in (".", "") or name.split("/")[0] == "..":
+        return None
+    return name
+
+
+def iter_members(path):
+    """Yield (name, bytes) for every regular file in a tar or zip archive.
+
+    Members are read one at a time as the caller asks for them; a tar is
+    read as a stream, so even a compressed one is never seeked or unpacked.
+    """
+    if path.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                name = member_name(info.filename)
+                if name is not None and not info.is_dir():
+                    yield name, archive.read(info)
+        return
+
+    with tarfile.open(path, "r|*") as archive:
+        for info in archive:
+            name = member_name(info.name)
+            if name is not None and info.isfile():
+                yield name, archive.extractfile(info).read()
+
+
+def iter_directory(path):
+    """Yield (name, bytes) for every file under a directory, names relative to it."""
+    path = os.path.abspath(path)
+    for directory, dirs, files in os.walk(path):
+        dirs.sort()
+        for file_name in sorted(files):
+            file_path = os.path.join(directory, file_name)
+            with open(file_path, "rb") as f:
+                yield os.path.relpath(file_path, path).replace(os.sep, "/"), f.read()
+
+
+def iter_files(path):
+    """Files of an archive or of a directory, as (name, bytes)."""
+    return iter_members(path) if is_archive(path) else iter_directory(path)
+
+
+def open_writer(path):
+    """Return a writer for a site written to path: a zip, a tar or a directory."""
+    lower = path.lower()
+    if lower.endswith(".zip"):
+        return ZipWriter(path)
+    for suffix, mode in TAR_MODES.items():
+        if lower.endswith(suffix):
+            return TarWriter(path, mode)
+    return DirectoryWriter(path)
+
+
+class ZipWriter:
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path, "w")
+
+    def add(self, name, data):
+        info = zipfile.ZipInfo(name, ZIP_DATE_TIME)
+        if os.path.splitext(name)[1].lower() in STORED_SUFFIXES:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+        self.archive.writestr(info, data)
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TarWriter:
+    def __init__(self, path, mode):
+        self.archive = tarfile.open(path, mode)
+
+    def add(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = 0o644
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DirectoryWriter:
+    """Writes entries as files under a fresh directory, like src_to_dest."""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.makedirs(self.path)
+
+    def add(self, name, data):
+        path = os.path.join(self.path, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
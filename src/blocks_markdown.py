@@ -1,8 +1,12 @@
 import re
 from enum import Enum
 from textnode import TextNode, TextType
-from htmlnode import LeafNode, ParentNode
-from inline_markdown import text_to_textnodes
+from htmlnode import LeafNode, ParentNode, escape_text
+from inline_markdown import link_title, normalize_label, text_to_textnodes
+from highlight import highlight, language_name
+from headings import Slugger
+from extensions import Line, registry
+from summary import Summary, inline_text
 
 
 class BlockType(Enum):
@@ -12,6 +16,11 @@ class BlockType(Enum):
     QUOTE = "quote"
     UNORDERED_LIST = "unordered list"
     ORDERED_LIST = "ordered list"
+    LIST_ITEM = "list item"
+    TABLE = "table"
+    EXTENSION = "extension"
+    EXCERPT_BREAK = "excerpt break"
+    DOCUMENT = "document"
 
 
 def markdown_to_blocks(markdown):
@@ -50,131 +59,631 @@ def block_to_block_type(block):
     return BlockType.PARAGRAPH
 
 
+# container-block parsing: one pass over the lines, open blocks kept on a stack
+QUOTE_MARKER = re.compile(r" {0,3}> ?")
+LIST_MARKER = re.compile(r"( {0,3})([-+*]|(\d{1,9})[.)])(?=[ \t]|$)")
+HEADING_LINE = re.compile(r" {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+EXCERPT_BREAK = re.compile(r" {0,3}<!--\s*more\s*-->[ \t]*$")
+OPENING_FENCE = re.compile(r"( {0,3})(`{3,})([^`]*)$")
+CLOSING_FENCE = re.compile(r" {0,3}(`{3,})[ \t]*$")
+# quotes, lists and list items nested deeper than this are not opened; their
+# markers stay text, so the recursive render walks stay far from the
+# recursion limit
+MAX_DEPTH = 64
+# a table's delimiter row, e.g. `| :--- | :---: |`; it must contain a pipe
+TABLE_DELIMITER_ROW = re.compile(
+    r" {0,3}(?=[^|]*\|)\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$"
+)
+TABLE_CELL_SEPARATOR = re.compile(r"(?<!\\)\|")
+# `[ ] ` or `[x] ` opening a list item's first paragraph; as in GFM, the
+# marker must be followed by whitespace and then some content
+TASK_MARKER = re.compile(r"\[([ xX])\][ \t]+(?=\S)")
+# `[label]: destination "optional title"` on a single line
+LINK_DEFINITION = re.compile(
+    r" {0,3}\[((?:[^\[\]\\]|\\.){1,999})\]:[ \t]*(<[^<>\n]*>|\S+)"
+    r"(?:[ \t]+(\"[^\"]*\"|'[^']*'|\([^()]*\)))?[ \t]*$"
+)
+
+
+class Block:
+    def __init__(self, block_type, **attributes):
+        self.block_type = block_type
+        self.children = []
+        self.lines = []
+        # heading level and id, code fence and info, list marker, start and
+        # tightness, list item content indent and task state, table column
+        # alignments and rows of cells
+        self.level = None
+        self.slug = None
+        self.fence = None
+        self.info = None
+        self.marker = None
+        self.start = None
+        self.tight = True
+        self.indent = 0
+        self.checked = None
+        self.align = None
+        self.rows = None
+        # the BlockExtension that parses and renders an EXTENSION block
+        self.extension = None
+        # parsed inline TextNodes of a paragraph, or of each table cell by row
+        self.inlines = None
+        # a blank line was seen while this container was open
+        self.blank = False
+        for name, value in attributes.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"Block({self.block_type}, lines: {self.lines}, children: {self.children})"
+
+
+def indent_width(line: str) -> int:
+    width = 0
+    for char in line:
+        if char == " ":
+            width += 1
+        elif char == "\t":
+            width += 4 - width % 4
+        else:
+            break
+    return width
+
+
+def remove_indent(line: str, width: int) -> str:
+    removed = 0
+    for i, char in enumerate(line):
+        if removed >= width or char not in " \t":
+            return " " * (removed - width) + line[i:]
+        removed += 1 if char == " " else 4 - removed % 4
+    return " " * max(removed - width, 0)
+
+
+ALIGNMENTS = {(True, False): "left", (False, True): "right", (True, True): "center"}
+
+
+def split_table_row(line: str, width: int | None = None) -> list:
+    """Split a table row into stripped cells on its unescaped pipes.
+
+    With a width, the row is padded or cut to that many cells.
+    """
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    cells = [cell.strip() for cell in TABLE_CELL_SEPARATOR.split(line)]
+    if width is not None:
+        cells = cells[:width] + [""] * (width - len(cells))
+    return cells
+
+
+def parse_blocks(lines):
+    """Parse an iterable of markdown lines into a tree of Blocks.
+
+    Lines are visited once. Container blocks (quotes, lists and list items)
+    that are still open sit on a stack, and each line first re-matches their
+    markers or indentation before anything new is opened, so nested content
+    is never re-split or re-parsed. At most MAX_DEPTH containers are nested.
+    """
+    parser = BlockParser()
+    for line in lines:
+        parser.add_line(line)
+    return parser.document
+
+
+class BlockParser:
+    def __init__(self):
+        # every heading as (level, text, slug), in document order, link
+        # definitions by normalized label, and whether a `<!-- more -->`
+        # marker was seen
+        self.document = Block(
+            BlockType.DOCUMENT, outline=[], references={}, excerpt_break=False
+        )
+        self.stack = [self.document]
+        self.slugger = Slugger()
+        # the open paragraph or code block, always a child of stack[-1]
+        self.tip = None
+
+    def add_line(self, line):
+        rest = line
+        blank = not line.strip()
+
+        # 1. continue the open containers; a list stays open only through
+        # one of its items
+        matched = 1
+        for i, container in enumerate(self.stack[1:], start=1):
+            if container.block_type == BlockType.QUOTE:
+                match = QUOTE_MARKER.match(rest)
+                if not match:
+                    break
+                rest = rest[match.end():]
+                blank = not rest.strip()
+            elif container.block_type == BlockType.LIST_ITEM:
+                if not blank:
+                    if indent_width(rest) < container.indent:
+                        break
+                    rest = remove_indent(rest, container.indent)
+            else:
+                continue
+            matched = i + 1
+        all_matched = matched == len(self.stack)
+
+        # 2. fenced code swallows every line until its closing fence, and an
+        # extension block every line it accepts
+        if self.tip is not None and self.tip.block_type == BlockType.CODE and all_matched:
+            closing = CLOSING_FENCE.match(rest)
+            if closing and len(closing.group(1)) >= len(self.tip.fence):
+                self.tip = None
+            else:
+                self.tip.lines.append(remove_indent(rest, self.tip.indent))
+            return
+        if self.tip is not None and self.tip.block_type == BlockType.EXTENSION:
+            result = self.tip.extension.add_line(self.tip, rest) if all_matched else Line.REJECT
+            if result != Line.REJECT:
+                self.tip.lines.append(rest)
+                if result == Line.CLOSE:
+                    self.tip = None
+                return
+            self.tip = None
+
+        # 3. open new quotes and list items
+        started = False
+        while indent_width(rest) < 4 and len(self.stack) <= MAX_DEPTH:
+            match = QUOTE_MARKER.match(rest)
+            if match:
+                self.close(matched)
+                self.tip = None
+                matched = len(self.stack) + 1
+                self.open(Block(BlockType.QUOTE))
+                rest = rest[match.end():]
+                blank = not rest.strip()
+                started = True
+                continue
+
+            match = LIST_MARKER.match(rest)
+            if not match:
+                break
+            after = rest[match.end():]
+            ordered = match.group(3) is not None
+            if self.tip is not None and all_matched and not started and (
+                not after.strip() or (ordered and match.group(3) != "1")
+            ):
+                # only a non-empty, bullet or 1. item may interrupt a paragraph
+                break
+
+            self.close(matched)
+            self.tip = None
+            self.open_list_item(match, ordered)
+            matched = len(self.stack)
+            width = indent_width(after)
+            if not after.strip() or width > 4:
+                width = 1
+            self.stack[-1].indent = len(match.group(1)) + len(match.group(2)) + width
+            rest = remove_indent(after, width)
+            blank = not rest.strip()
+            started = True
+
+        # 4. a paragraph may lazily continue through unmatched containers
+        if (
+            not started
+            and not all_matched
+            and not blank
+            and self.tip is not None
+            and self.tip.block_type == BlockType.PARAGRAPH
+            and not HEADING_LINE.match(rest)
+            and not OPENING_FENCE.match(rest)
+        ):
+            self.tip.lines.append(rest.strip())
+            return
+
+        self.close(matched)
+
+        # 5. leaf blocks
+        if blank:
+            self.tip = None
+            if not started:
+                for container in self.stack:
+                    container.blank = True
+            return
+
+        if registry.block_extensions and self.start_extension(rest):
+            pass
+        elif EXCERPT_BREAK.match(rest):
+            self.add_child(Block(BlockType.EXCERPT_BREAK))
+            self.document.excerpt_break = True
+            self.tip = None
+        elif HEADING_LINE.match(rest):
+            level, text = get_heading_level_and_text(rest)
+            slug = self.slugger.slug(text)
+            self.document.outline.append((level, text, slug))
+            self.add_child(Block(BlockType.HEADING, level=level, lines=[text], slug=slug))
+            self.tip = None
+        elif match := OPENING_FENCE.match(rest):
+            self.add_leaf(Block(
+                BlockType.CODE,
+                fence=match.group(2),
+                info=match.group(3).strip(),
+                indent=len(match.group(1)),
+            ))
+        elif self.tip is not None and self.tip.block_type == BlockType.TABLE:
+            self.tip.rows.append(split_table_row(rest, len(self.tip.align)))
+        elif (
+            self.tip is not None
+            and self.tip.block_type == BlockType.PARAGRAPH
+            and TABLE_DELIMITER_ROW.match(rest)
+            and self.start_table(rest)
+        ):
+            pass
+        elif self.tip is not None and self.tip.block_type == BlockType.PARAGRAPH:
+            self.tip.lines.append(rest.strip())
+        elif (match := LINK_DEFINITION.match(rest)) and match.group(1).strip():
+            # definitions cannot interrupt a paragraph and produce no output;
+            # the first definition of a label wins
+            url = match.group(2)
+            if url.startswith("<"):
+                url = url[1:-1]
+            self.document.references.setdefault(
+                normalize_label(match.group(1)), (url, link_title(match.group(3)))
+            )
+        else:
+            self.add_paragraph(rest.strip())
+
+        for container in self.stack:
+            container.blank = False
+
+    def start_extension(self, line):
+        extensions = registry.block_extensions.get(line.lstrip(" ")[:1])
+        for extension in extensions or ():
+            attributes = extension.start(line)
+            if attributes is not None:
+                self.add_leaf(Block(
+                    BlockType.EXTENSION, extension=extension, lines=[line], **attributes
+                ))
+                return True
+        return False
+
+    def add_paragraph(self, line):
+        container = self.stack[-1]
+        if container.block_type == BlockType.LIST_ITEM and not container.children:
+            # a task list item: `- [ ] todo` or `- [x] done`
+            if match := TASK_MARKER.match(line):
+                container.checked = match.group(1) != " "
+                line = line[match.end():]
+        self.add_leaf(Block(BlockType.PARAGRAPH, lines=[line]))
+
+    def start_table(self, delimiter_row):
+        # the paragraph's last line is the header row when the cell counts agree
+        paragraph = self.tip
+        align = [
+            ALIGNMENTS.get((cell.startswith(":"), cell.endswith(":")))
+            for cell in split_table_row(delimiter_row)
+        ]
+        header = split_table_row(paragraph.lines[-1])
+        if len(header) != len(align):
+            return False
+
+        paragraph.lines.pop()
+        if not paragraph.lines:
+            self.stack[-1].children.pop()
+        self.add_leaf(Block(BlockType.TABLE, align=align, rows=[header]))
+        return True
+
+    def close(self, matched):
+        # close every container past the matched ones, and the leaf with them
+        if matched < len(self.stack):
+            self.tip = None
+            del self.stack[matched:]
+
+    def open(self, block):
+        self.add_child(block)
+        self.stack.append(block)
+
+    def add_leaf(self, block):
+        self.add_child(block)
+        self.tip = block
+
+    def add_child(self, block):
+        container = self.stack[-1]
+        if container.block_type == BlockType.LIST_ITEM and container.blank and container.children:
+            # blank line between two blocks of one item: the list is loose
+            self.stack[-2].tight = False
+        container.children.append(block)
+
+    def open_list_item(self, match, ordered):
+        list_type = BlockType.ORDERED_LIST if ordered else BlockType.UNORDERED_LIST
+        # bullets must repeat the same character, numbers the same delimiter
+        marker = match.group(2)[-1]
+        container = self.stack[-1]
+
+        last = container.children[-1] if container.children else None
+        if last is not None and last.block_type == list_type and last.marker == marker:
+            if last.blank:
+                last.tight = False
+            self.stack.append(last)
+        else:
+            start = int(match.group(3)) if ordered else None
+            self.open(Block(list_type, marker=marker, start=start))
+        self.open(Block(BlockType.LIST_ITEM))
+
+
 # helper functions for markdown_to_html
 def text_node_to_html_node(text_node):
     match text_node.text_type:
         case TextType.CODE:
-            node = LeafNode(tag="code", value=text_node.text)
+            node = LeafNode(tag="code", value=escape_text(text_node.text))
             return node
 
 
 def get_heading_level_and_text(block: str) -> tuple[int, str] | tuple[None, None]:
-    match = re.match(r"\s*(#{1,6})\s+(.*)", block)
+    match = HEADING_LINE.match(block)
     if not match:
         return None, None
     length = len(match.group(1))
-    text = match.group(2)
+    text = match.group(2) or ""
     return length, text
 
 
-def format_quote_text(block: str) -> str:
-    lines = block.strip().split("\n")
-    quote_lines = []
+def format_html_list_items(list_block: Block, refs=None) -> list:
+    list_nodes = []
 
-    for line in lines:
-        match = re.match(r"^\s*>\s*(.*)", line)
-        if match:
-            quote_lines.append(match.group(1))
+    for item in list_block.children:
+        # tight lists render their paragraphs without <p> tags
+        children = [
+            block_to_html_node(child, list_block.tight, refs) for child in item.children
+        ]
+        props = None
+        if item.checked is not None:
+            props = {"class": "task-list-item"}
+            checkbox = {"type": "checkbox", "disabled": ""}
+            if item.checked:
+                checkbox["checked"] = ""
+            children[:0] = [
+                LeafNode(tag="input", value="", props=checkbox),
+                LeafNode(tag=None, value=" "),
+            ]
+        if not children:
+            list_nodes.append(LeafNode(tag="li", value=""))
+        elif len(children) == 1 and children[0].tag is None:
+            list_nodes.append(LeafNode(tag="li", value=children[0].value))
+        else:
+            list_nodes.append(ParentNode(tag="li", children=children, props=props))
 
-        quote_text = "\n".join(quote_lines)
-    
-    return quote_text
+    return list_nodes
 
 
-def format_html_list_items(block: str, list_type: str) -> list:
-    lines = block.strip().split("\n")
-    list_nodes = []
+def format_html_table_row(cells: list, tag: str, align: list):
+    return ParentNode(tag="tr", children=[
+        LeafNode(
+            tag=tag,
+            value=format_inline_nodes(cell),
+            props={"align": alignment} if alignment else None,
+        )
+        for cell, alignment in zip(cells, align)
+    ])
 
-    for line in lines:
-        if list_type == "ol":
-            match = re.match(r"^\s*\d+\.\s*(.*)", line)
-        else:
-            match = re.match(r"^\s*-\s*(.*)", line)
-        if match:
-            value = match.group(1).rstrip()
-            text_nodes = text_to_textnodes(value)
-            li_value = format_inline_nodes(text_nodes)
-            list_nodes.append(LeafNode(tag="li", value=li_value))
 
-    return list_nodes
+def format_inline_text(text: str, refs=None) -> str:
+    return format_inline_nodes(text_to_textnodes(text, refs))
 
 
 def format_inline_nodes(text_nodes: list) -> str:
     html_nodes = []
+    overrides = registry.inline_renderers
     for node in text_nodes:
-        match node.text_type:
-            case TextType.BOLD:
-                b = LeafNode(tag="b", value=node.text)
-                html_nodes.append(b.to_html())
-            case TextType.ITALIC:
-                em = LeafNode(tag="i", value=node.text)
-                html_nodes.append(em.to_html())
-            case TextType.CODE:
-                code = LeafNode(tag="code", value=node.text)
-                html_nodes.append(code.to_html())
-            case TextType.LINK:
-                a = LeafNode(tag="a", value=node.text, props={"href": node.url})
-                html_nodes.append(a.to_html())
-            case TextType.ALT:
-                img = LeafNode(
-                    tag="img", value="", props={"src": node.url, "alt": node.text}
-                )
-                html_nodes.append(img.to_html())
-            case _:
-                text = LeafNode(tag=None, value=node.text)
-                html_nodes.append(text.to_html())
+        renderer = overrides.get(node.text_type) or INLINE_RENDERERS[node.text_type]
+        html_nodes.append(renderer(node))
 
     return "".join(html_nodes)
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    block_nodes = []
+def render_plain(node) -> str:
+    return escape_text(node.text)
 
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        match block_type:
-            case BlockType.CODE:
-                # a <code> tag nested inside a <pre> tag
-                match = re.search(r"```(.*?)```", block, re.DOTALL)
-                text = match.group(1).lstrip("\n") if match else None
-                text_node = TextNode(text, TextType.CODE)
-                code_node = text_node_to_html_node(text_node)
-                pre_node = ParentNode(tag="pre", children=[code_node])
-                block_nodes.append(pre_node)
 
-            case BlockType.HEADING:
-                # <h1> to <h6> tag, depending on the number of # characters.
-                level, text = get_heading_level_and_text(block)
-                heading_node = LeafNode(tag=f"h{level}", value=text)
-                block_nodes.append(heading_node)
-
-            case BlockType.QUOTE:
-                quote_text = format_quote_text(block)
-                blockquote = LeafNode(tag="blockquote", value=quote_text)
-                block_nodes.append(blockquote)
-
-            case BlockType.UNORDERED_LIST:
-                # a <ul> parent tag, and each list item should be surrounded by a <li> tag.
-                list_items = format_html_list_items(block, "ul")
-                ul = ParentNode(tag="ul", children=list_items)
-                block_nodes.append(ul)
-
-            case BlockType.ORDERED_LIST:
-                # a <ol> parent tag, and each list item should be surrounded by a <li> tag.
-                list_items = format_html_list_items(block, "ol")
-                ol = ParentNode(tag="ol", children=list_items)
-                block_nodes.append(ol)
+def render_bold(node) -> str:
+    return LeafNode(tag="b", value=format_inline_value(node)).to_html()
+
 
+def render_italic(node) -> str:
+    return LeafNode(tag="i", value=format_inline_value(node)).to_html()
+
+
+def render_code(node) -> str:
+    return LeafNode(tag="code", value=escape_text(node.text)).to_html()
+
+
+def render_link(node) -> str:
+    props = {"href": node.url}
+    if node.title is not None:
+        props["title"] = node.title
+    return LeafNode(tag="a", value=format_inline_value(node), props=props).to_html()
+
+
+def render_image(node) -> str:
+    props = {"src": node.url, "alt": node.text}
+    if node.title is not None:
+        props["title"] = node.title
+    return LeafNode(tag="img", value="", props=props).to_html()
+
+
+INLINE_RENDERERS = {
+    TextType.PLAIN: render_plain,
+    TextType.BOLD: render_bold,
+    TextType.ITALIC: render_italic,
+    TextType.CODE: render_code,
+    TextType.LINK: render_link,
+    TextType.ALT: render_image,
+}
+
+
+def format_inline_value(node) -> str:
+    # nested emphasis and links carry their content as child nodes
+    if node.children:
+        return format_inline_nodes(node.children)
+    return escape_text(node.text)
+
+
+def markdown_to_html_node(markdown, meta=None):
+    return lines_to_html_node(markdown.split("\n"), meta)
+
+
+def lines_to_html_node(lines, meta=None):
+    return document_to_html_node(parse_document(lines), meta)
+
+
+def parse_document(lines):
+    """Parse markdown lines into a document tree with its inline content parsed.
+
+    The tree can be rendered to HTML, or serialized to other formats by the
+    document module, without parsing anything again. The walk that parses
+    the inline content also fills `document.summary` (excerpt and word count).
+    """
+    document = parse_blocks(lines)
+    document.summary = Summary(has_marker=document.excerpt_break)
+    parse_inlines(document, document.references, document.summary)
+    return document
+
+
+def parse_inlines(block, refs, summary):
+    for child in block.children:
+        match child.block_type:
+            case BlockType.PARAGRAPH:
+                # a quote holding a single paragraph keeps its line breaks
+                plain_quote = block.block_type == BlockType.QUOTE and len(block.children) == 1
+                text = ("\n" if plain_quote else " ").join(child.lines)
+                child.inlines = text_to_textnodes(text, refs)
+                summary.add_paragraph(inline_text(child.inlines))
+            case BlockType.TABLE:
+                child.inlines = [
+                    [text_to_textnodes(cell, refs) for cell in row] for row in child.rows
+                ]
+                for row in child.inlines:
+                    for cell in row:
+                        summary.add_text(inline_text(cell))
+            case BlockType.HEADING:
+                summary.add_text(child.lines[0])
+            case BlockType.EXCERPT_BREAK:
+                summary.mark()
             case _:
-                # <p> tag. I removed the newlines and replaced them with spaces.
-                p_text = block.strip().replace("\n", " ")
-                text_nodes = text_to_textnodes(p_text)
-                p_value = format_inline_nodes(text_nodes)
-                p_node = LeafNode(tag="p", value=p_value)
-                block_nodes.append(p_node)
+                parse_inlines(child, refs, summary)
+
+
+def document_to_html_node(document, meta=None):
+    """Render a parsed document as a <div>.
+
+    If a meta dict is given, page data gathered while parsing is stored in
+    it: `outline` lists every heading as (level, text, slug), `excerpt` is
+    the page's leading plain text, `words` its word count and
+    `reading_time` the minutes it takes to read.
+    """
+    if meta is not None:
+        meta["outline"] = document.outline
+        meta["excerpt"] = document.summary.excerpt
+        meta["words"] = document.summary.words
+        meta["reading_time"] = document.summary.reading_time
+    refs = document.references
+    block_nodes = [block_to_html_node(block, refs=refs) for block in document.children]
 
     if block_nodes:
         return ParentNode(tag="div", children=block_nodes)
     else:
         return LeafNode(tag="div", value="")
+
+
+def block_to_html_node(block, tight=False, refs=None):
+    renderer = (
+        registry.block_renderers.get(block.block_type)
+        or BLOCK_RENDERERS[block.block_type]
+    )
+    return renderer(block, tight, refs)
+
+
+def render_code_block(block, tight, refs):
+    # a <code> tag nested inside a <pre> tag, highlighted when the
+    # fence names a known language
+    text = "".join(f"{line}\n" for line in block.lines)
+    language = language_name(block.info)
+    if language is None:
+        code_node = text_node_to_html_node(TextNode(text, TextType.CODE))
+    else:
+        code_node = LeafNode(
+            tag="code",
+            value=highlight(text, language) or escape_text(text),
+            props={"class": f"language-{language}"},
+        )
+    return ParentNode(tag="pre", children=[code_node])
+
+
+def render_heading(block, tight, refs):
+    # <h1> to <h6> tag, depending on the number of # characters.
+    return LeafNode(
+        tag=f"h{block.level}",
+        value=escape_text(block.lines[0]),
+        props={"id": block.slug},
+    )
+
+
+def render_quote(block, tight, refs):
+    children = block.children
+    if not children:
+        return LeafNode(tag="blockquote", value="")
+    if len(children) == 1 and children[0].block_type == BlockType.PARAGRAPH:
+        # a plain quote keeps its line breaks and needs no <p>
+        value = format_inline_nodes(children[0].inlines)
+        return LeafNode(tag="blockquote", value=value)
+    block_nodes = [block_to_html_node(child, refs=refs) for child in children]
+    return ParentNode(tag="blockquote", children=block_nodes)
+
+
+def render_unordered_list(block, tight, refs):
+    # a <ul> parent tag, and each list item should be surrounded by a <li> tag.
+    list_items = format_html_list_items(block, refs)
+    return ParentNode(tag="ul", children=list_items)
+
+
+def render_ordered_list(block, tight, refs):
+    # a <ol> parent tag, and each list item should be surrounded by a <li> tag.
+    list_items = format_html_list_items(block, refs)
+    props = {"start": str(block.start)} if block.start != 1 else None
+    return ParentNode(tag="ol", children=list_items, props=props)
+
+
+def render_table(block, tight, refs):
+    # a header row in <thead>, the remaining rows in <tbody>
+    header, *rows = block.inlines
+    sections = [ParentNode(tag="thead", children=[
+        format_html_table_row(header, "th", block.align)
+    ])]
+    if rows:
+        sections.append(ParentNode(tag="tbody", children=[
+            format_html_table_row(row, "td", block.align) for row in rows
+        ]))
+    return ParentNode(tag="table", children=sections)
+
+
+def render_excerpt_break(block, tight, refs):
+    # kept in the page so other tools can still find the marker
+    return LeafNode(tag=None, value="<!-- more -->")
+
+
+def render_extension_block(block, tight, refs):
+    return block.extension.render(block, refs)
+
+
+def render_paragraph(block, tight, refs):
+    # <p> tag, with the lines joined by spaces.
+    p_value = format_inline_nodes(block.inlines)
+    return LeafNode(tag=None if tight else "p", value=p_value)
+
+
+BLOCK_RENDERERS = {
+    BlockType.PARAGRAPH: render_paragraph,
+    BlockType.HEADING: render_heading,
+    BlockType.CODE: render_code_block,
+    BlockType.QUOTE: render_quote,
+    BlockType.UNORDERED_LIST: render_unordered_list,
+    BlockType.ORDERED_LIST: render_ordered_list,
+    BlockType.TABLE: render_table,
+    BlockType.EXTENSION: render_extension_block,
+    BlockType.EXCERPT_BREAK: render_excerpt_break,
+}
@@ -0,0 +1,64 @@
+import json
+import os
+
+# output hashes of the previous build, kept outside the output directory
+# because every build wipes it
+STATE_PATH = "./.boots-cache/outputs.json"
+
+
+def static_outputs(static_dir, cache, assets=None):
+    """Map each static file's output path (relative to the site root) to its sha256.
+
+    Copies are byte-identical to their sources, so digests come from the hash
+    cache and unchanged files are never read. With an assets mapping the
+    fingerprinted names are used.
+    """
+    static_dir = os.path.abspath(static_dir)
+    outputs = {}
+    for directory, _, files in os.walk(static_dir):
+        for name in files:
+            path = os.path.join(directory, name)
+            url = "/" + os.path.relpath(path, static_dir).replace(os.sep, "/")
+            if assets:
+                url = assets[url]
+            outputs[url[1:]] = cache.digest(path)
+    return outputs
+
+
+def diff_outputs(previous, current):
+    """Compare two {path: sha256} maps into added, modified and deleted entries."""
+    changes = {"added": [], "modified": [], "deleted": []}
+    for path in sorted(current):
+        if path not in previous:
+            changes["added"].append({"path": path, "sha256": current[path]})
+        elif previous[path] != current[path]:
+            changes["modified"].append({"path": path, "sha256": current[path]})
+    for path in sorted(previous):
+        if path not in current:
+            changes["deleted"].append({"path": path, "sha256": previous[path]})
+    return changes
+
+
+def load_outputs(dest_dir, state_path=STATE_PATH):
+    """Return the previous build's output hashes for dest_dir, or {} if unknown."""
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("dest") != os.path.abspath(dest_dir):
+        return {}
+    return state["outputs"]
+
+
+def save_outputs(dest_dir, outputs, state_path=STATE_PATH):
+    directory = os.path.dirname(state_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(state_path, "w") as f:
+        json.dump({"dest": os.path.abspath(dest_dir), "outputs": outputs}, f)
+
+
+def write_changes(path, changes):
+    with open(path, "w") as f:
+        json.dump(changes, f, indent=2)
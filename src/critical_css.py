@@ -0,0 +1,260 @@
+import os
+import re
+from urllib.parse import urljoin
+from archive import is_archive, iter_members
+
+# Critical CSS: the rules a page can use are inlined into its <head> and the
+# full stylesheets load without blocking rendering. What a page can use is
+# decided by its set of tags and classes, so pages with the same set share
+# one analysis.
+
+STYLESHEET_LINK = re.compile(r'<link\b[^>]*\brel="stylesheet"[^>]*>')
+HREF = re.compile(r'\bhref="(/[^"]*)"')
+TAG = re.compile(r"<([a-zA-Z][\w-]*)")
+CLASS_ATTRIBUTE = re.compile(r'\bclass="([^"]*)"')
+IMAGE = re.compile(r'<img\b[^>]*\bsrc="([^"]*)"')
+COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+# pseudo-classes and -elements, and attribute selectors, never rule a selector out
+PSEUDO = re.compile(r"::?[\w-]+(\([^)]*\))?")
+ATTRIBUTE_SELECTOR = re.compile(r"\[[^\]]*\]")
+COMBINATOR = re.compile(r"\s*[>+~]\s*|\s+")
+SELECTOR_TAG = re.compile(r"[a-zA-Z][\w-]*")
+SELECTOR_CLASS = re.compile(r"\.([\w-]+)")
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]*)\1\s*\)""")
+# URLs with a scheme, protocol-relative ones and bare fragments are left alone
+ABSOLUTE_URL = re.compile(r"[a-zA-Z][\w+.-]*:|//|#")
+# at-rules whose bodies are rules, filtered like the top level
+GROUPING_RULES = ("@media", "@supports", "@layer")
+# images that start within this many characters of the content are above the fold
+FOLD_CHARS = 3000
+MAX_PRELOADS = 2
+
+
+def inline_critical_css(template_text, static, basepath="/", assets=None):
+    """Prepare a template for critical CSS.
+
+    Every root-relative stylesheet found in static (a directory or archive)
+    is loaded with `rel=preload` instead of blocking, with a <noscript>
+    fallback, and `{{ CriticalCss }}{{ Preload }}` slots are put before the
+    first one. The url()s of the stylesheets are rebased for inlining (see
+    rebase_urls). Returns (template text, CriticalCss), or the template
+    unchanged and None when it links no such stylesheet.
+    """
+    links = [
+        (match, HREF.search(match.group(0)))
+        for match in STYLESHEET_LINK.finditer(template_text)
+    ]
+    hrefs = [href.group(1) for _, href in links if href]
+    sheets = read_static(static, [href.split("?")[0].split("#")[0] for href in hrefs])
+    if not sheets:
+        return template_text, None
+
+    parts = []
+    position = 0
+    inserted = False
+    for match, href in links:
+        if href is None or href.group(1).split("?")[0].split("#")[0] not in sheets:
+            continue
+        link = match.group(0)
+        deferred = link.replace(
+            'rel="stylesheet"',
+            'rel="preload" as="style" onload="this.onload=null;this.rel=\'stylesheet\'"',
+        )
+        parts.append(template_text[position:match.start()])
+        if not inserted:
+            parts.append("{{ CriticalCss }}{{ Preload }}")
+            inserted = True
+        parts.append(f"{deferred}<noscript>{link}</noscript>")
+        position = match.end()
+    parts.append(template_text[position:])
+
+    stylesheet = "\n".join(rebase_urls(sheets[href], href, basepath, assets) for href in sheets)
+    return "".join(parts), CriticalCss(stylesheet, template_text)
+
+
+def rebase_urls(css, href, basepath="/", assets=None):
+    """Rewrite the url()s of the stylesheet at href to root-relative URLs under basepath.
+
+    A relative url() resolves against its stylesheet, but inlined into a
+    page it would resolve against the page. With an assets mapping (see
+    fingerprint.hash_assets) static files get their fingerprinted names.
+    """
+    def rewrite(match):
+        quote, url = match.groups()
+        if not url or ABSOLUTE_URL.match(url):
+            return match.group(0)
+        url = urljoin(href, url)
+        end = len(url.split("?")[0].split("#")[0])
+        path = url[:end]
+        if assets:
+            path = assets.get(path, path)
+        return f"url({quote}{basepath}{path[1:]}{url[end:]}{quote})"
+
+    return CSS_URL.sub(rewrite, css)
+
+
+def read_static(static, hrefs):
+    """Return {href: text} for the hrefs that are files in static, in order."""
+    wanted = {href.lstrip("/"): href for href in hrefs}
+    found = {}
+    if is_archive(static):
+        for name, data in iter_members(static):
+            if name in wanted:
+                found[wanted[name]] = data.decode("utf-8")
+    else:
+        for name, href in wanted.items():
+            path = os.path.join(static, *name.split("/"))
+            if os.path.isfile(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    found[href] = f.read()
+    return {href: found[href] for href in hrefs if href in found}
+
+
+class CriticalCss:
+    """The rules of a stylesheet, and the subset already chosen per tag-set signature."""
+
+    def __init__(self, stylesheet, template_text=""):
+        self.rules = parse_rules(COMMENT.sub("", stylesheet))
+        # the template's own elements are on every page
+        self.tags, self.classes = html_names(template_text)
+        self.tags |= {"html", "body"}
+        # (tags, classes) -> <style> element
+        self.styles = {}
+
+    def style(self, tags, classes):
+        signature = (frozenset(tags | self.tags), frozenset(classes | self.classes))
+        style = self.styles.get(signature)
+        if style is None:
+            css = select_rules(self.rules, *signature)
+            style = f"<style>{css}</style>" if css else ""
+            self.styles[signature] = style
+        return style
+
+    def slots(self, node, content):
+        """CriticalCss and Preload slots for a page from its HTMLNode tree and HTML."""
+        tags, classes = node_names(node)
+        return {"CriticalCss": self.style(tags, classes), "Preload": preload_links(content)}
+
+    def slots_for_html(self, content):
+        """The same, for content that only exists as HTML (e.g. listing pages)."""
+        return {"CriticalCss": self.style(*html_names(content)), "Preload": preload_links(content)}
+
+
+def node_names(node):
+    """Return the (tags, classes) used by an HTMLNode tree."""
+    tags = set()
+    classes = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.tag is not None:
+            tags.add(node.tag)
+        if node.props and "class" in node.props:
+            classes.update(str(node.props["class"]).split())
+        if node.children:
+            stack.extend(node.children)
+        elif node.value and "<" in node.value:
+            # raw HTML values, e.g. highlighted code
+            value_tags, value_classes = html_names(node.value)
+            tags |= value_tags
+            classes |= value_classes
+    return tags, classes
+
+
+def html_names(html_string):
+    tags = {tag.lower() for tag in TAG.findall(html_string)}
+    classes = set()
+    for value in CLASS_ATTRIBUTE.findall(html_string):
+        classes.update(value.split())
+    return tags, classes
+
+
+def preload_links(content):
+    links = []
+    for match in IMAGE.finditer(content, 0, FOLD_CHARS):
+        href = match.group(1)
+        if href not in links:
+            links.append(href)
+        if len(links) == MAX_PRELOADS:
+            break
+    return "".join(f'<link rel="preload" as="image" href="{href}" />' for href in links)
+
+
+def parse_rules(css):
+    """Split CSS into (prelude, body) pairs; grouping at-rules get a list of rules as body."""
+    rules = []
+    i = 0
+    while True:
+        brace = css.find("{", i)
+        if brace == -1:
+            return rules
+        # statements such as @import or @charset end at `;`
+        prelude = css[i:brace].rsplit(";", 1)[-1].strip()
+        depth = 1
+        j = brace + 1
+        while j < len(css) and depth:
+            if css[j] == "{":
+                depth += 1
+            elif css[j] == "}":
+                depth -= 1
+            j += 1
+        body = css[brace + 1:j - 1]
+        if prelude.startswith(GROUPING_RULES):
+            rules.append((prelude, parse_rules(body)))
+        else:
+            rules.append((" ".join(prelude.split()), " ".join(body.split())))
+        i = j
+
+
+def select_rules(rules, tags, classes):
+    """Serialize the rules with a selector that can match the given tags and classes."""
+    selected = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            inner = select_rules(body, tags, classes)
+            if inner:
+                selected.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            # @font-face, @keyframes and the like cost little and are looked up by name
+            selected.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [
+                selector.strip() for selector in split_selectors(prelude)
+                if selector_matches(selector, tags, classes)
+            ]
+            if selectors:
+                selected.append(f"{','.join(selectors)}{{{body}}}")
+    return "".join(selected)
+
+
+def split_selectors(prelude):
+    """Split a selector list at commas outside parentheses."""
+    selectors = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(prelude):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(prelude[start:i])
+            start = i + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def selector_matches(selector, tags, classes):
+    """Whether some page with these tags and classes could match selector.
+
+    Only tag names and classes are checked; ids, attributes, pseudo-classes
+    and the structure between compounds are assumed to match.
+    """
+    selector = ATTRIBUTE_SELECTOR.sub("", PSEUDO.sub("", selector)).strip()
+    for compound in COMBINATOR.split(selector):
+        tag = SELECTOR_TAG.match(compound)
+        if tag and tag.group(0).lower() not in tags:
+            return False
+        if any(name not in classes for name in SELECTOR_CLASS.findall(compound)):
+            return False
+    return True
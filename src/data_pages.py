@@ -0,0 +1,201 @@
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from blocks_markdown import markdown_to_html_node
+from headings import slugify
+from htmlnode import escape_text
+from locales import link_files
+from render import Template
+from taxonomy import load_state, save_state, template_key
+
+# Pages generated from data exports: every `data/<name>.csv` or
+# `data/<name>.jsonl` next to a `data/<name>.html` row template becomes one
+# page per row at `<name>/<slug>.html`. Row fields fill the `{{ field }}`
+# slots of the row template, which fills `{{ Content }}` of the page template.
+DATA_EXTENSIONS = (".csv", ".jsonl")
+# fields named e.g. `description_md` hold markdown
+MARKDOWN_SUFFIX = "_md"
+BATCH_SIZE = 256
+# hashes of the rows of the last build, and a copy of each page they made
+STATE_PATH = "./.boots-cache/data.json"
+PAGES_DIR = "./.boots-cache/data"
+
+
+def find_sources(data_dir):
+    """Yield (name, data path, row template path) for every data source in data_dir."""
+    if not os.path.isdir(data_dir):
+        return
+    for entry in sorted(os.listdir(data_dir)):
+        name, ext = os.path.splitext(entry)
+        row_template_path = os.path.join(data_dir, f"{name}.html")
+        if ext in DATA_EXTENSIONS and os.path.isfile(row_template_path):
+            yield name, os.path.join(data_dir, entry), row_template_path
+
+
+def iter_rows(path):
+    """Stream the rows of a CSV (with a header line) or JSONL file as dicts."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                # DictReader files extra values under a None key
+                if None in row:
+                    raise ValueError(
+                        f"{path}:{reader.line_num}: more fields than the header has"
+                    )
+                yield row
+            return
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON: {e}")
+            if not isinstance(row, dict):
+                raise ValueError(f"{path}:{number}: expected a JSON object")
+            yield row
+
+
+def row_slug(row, number):
+    """The row's slug: its `slug` or `title` field, else its number in the file."""
+    text = str(row.get("slug") or row.get("title") or "")
+    return slugify(text) if text.strip() else str(number)
+
+
+def field_html(name, value):
+    if value is None:
+        return ""
+    if name.endswith(MARKDOWN_SUFFIX):
+        return markdown_to_html_node(str(value)).to_html()
+    return escape_text(str(value))
+
+
+def render_row(row, page_template, row_template):
+    """Render one row into a full page."""
+    slots = {name: "" for name in row_template.slots}
+    for name, value in row.items():
+        slots[name] = field_html(name, value)
+    content = row_template.render(**slots)
+    page_slots = {name: "" for name in page_template.slots}
+    title = escape_text(str(row.get("title") or row.get("slug") or ""))
+    return page_template.render(**{**page_slots, "Title": title, "Content": content})
+
+
+def render_batch(batch, page_template, row_template):
+    """Render a list of (rel path, row) into a list of (rel path, page)."""
+    return [(rel_path, render_row(row, page_template, row_template)) for rel_path, row in batch]
+
+
+def write_data_pages(
+    data_dir, page_template, dest_dir, jobs=1, batch_size=BATCH_SIZE,
+    state_path=STATE_PATH, pages_dir=PAGES_DIR, writer=None,
+):
+    """Render every data source in data_dir into dest_dir, or to an archive
+    writer (see archive.open_writer) when one is given.
+
+    Rows are read lazily and rendered in batches of batch_size, at most
+    `jobs` batches at a time, so memory stays bounded however large the
+    export is. A row whose fields and templates hash the same as in the last
+    build is not rendered again: its page is hard-linked from the copy kept
+    in pages_dir (or copied from it into the archive). Returns
+    ({rel path: sha256 of the page}, number rendered).
+    """
+    dest_dir = os.path.abspath(dest_dir)
+    previous = load_state(state_path)
+    key = template_key(page_template)
+    state = {}
+    outputs = {}
+    rendered = 0
+    seen = set()
+
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    in_flight = {}
+
+    def finish(results, hashes):
+        for rel_path, page in results:
+            data = page.encode("utf-8")
+            copy_path = os.path.join(pages_dir, rel_path)
+            os.makedirs(os.path.dirname(copy_path), exist_ok=True)
+            with open(copy_path, "wb") as f:
+                f.write(data)
+            if writer is None:
+                link_files(pages_dir, dest_dir, [rel_path])
+            else:
+                writer.add(rel_path, data)
+            digest = hashlib.sha256(data).hexdigest()
+            state[rel_path] = {"row": hashes[rel_path], "sha256": digest}
+            outputs[rel_path] = digest
+        return len(results)
+
+    def submit(batch, row_template):
+        nonlocal rendered
+        hashes = {rel_path: row_hash for rel_path, _, row_hash in batch}
+        batch = [(rel_path, row) for rel_path, row, _ in batch]
+        if executor is None:
+            rendered += finish(render_batch(batch, page_template, row_template), hashes)
+            return
+        # wait for a free worker rather than queueing rows without bound
+        while len(in_flight) >= jobs:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                rendered += finish(future.result(), in_flight.pop(future))
+        future = executor.submit(render_batch, batch, page_template, row_template)
+        in_flight[future] = hashes
+
+    try:
+        for name, data_path, row_template_path in find_sources(data_dir):
+            with open(row_template_path, "r") as f:
+                row_template_text = f.read()
+            row_template = Template(row_template_text)
+            source_key = hashlib.sha256(f"{key}\0{row_template_text}".encode("utf-8"))
+
+            batch = []
+            for number, row in enumerate(iter_rows(data_path), start=1):
+                slug = row_slug(row, number)
+                rel_path = os.path.join(name, f"{slug}.html")
+                if rel_path in seen:
+                    raise ValueError(f"{data_path}: more than one row has slug '{slug}'.")
+                seen.add(rel_path)
+
+                row_hash = source_key.copy()
+                row_hash.update(json.dumps(row, sort_keys=True).encode("utf-8"))
+                row_hash = row_hash.hexdigest()
+                entry = previous.get(rel_path)
+                if (
+                    entry and entry["row"] == row_hash
+                    and os.path.isfile(os.path.join(pages_dir, rel_path))
+                ):
+                    if writer is None:
+                        link_files(pages_dir, dest_dir, [rel_path])
+                    else:
+                        with open(os.path.join(pages_dir, rel_path), "rb") as f:
+                            writer.add(rel_path, f.read())
+                    state[rel_path] = entry
+                    outputs[rel_path] = entry["sha256"]
+                    continue
+
+                batch.append((rel_path, row, row_hash))
+                if len(batch) >= batch_size:
+                    submit(batch, row_template)
+                    batch = []
+            if batch:
+                submit(batch, row_template)
+
+        for future in list(in_flight):
+            rendered += finish(future.result(), in_flight.pop(future))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    # copies of pages for rows that no longer exist
+    for rel_path in previous.keys() - state.keys():
+        try:
+            os.remove(os.path.join(pages_dir, rel_path))
+        except FileNotFoundError:
+            pass
+
+    save_state(state, state_path)
+    return outputs, rendered
@@ -0,0 +1,115 @@
+import json
+import os
+from blocks_markdown import BlockType
+from render import render_document
+from summary import inline_text
+
+# output formats a page can be written in, and the extension of each file
+FORMATS = {"html": ".html", "json": ".json", "text": ".txt"}
+
+
+def parse_formats(spec):
+    """Parse a comma-separated format list such as `html,json`."""
+    formats = tuple(dict.fromkeys(name.strip() for name in spec.split(",") if name.strip()))
+    unknown = [name for name in formats if name not in FORMATS]
+    if unknown or not formats:
+        raise ValueError(
+            f"Invalid formats '{spec}', expected some of {', '.join(FORMATS)}."
+        )
+    return formats
+
+
+def format_path(html_path, output_format):
+    """Return the path a format is written to, next to the page's .html path."""
+    return os.path.splitext(html_path)[0] + FORMATS[output_format]
+
+
+def render_formats(document, title, template, formats=("html",)):
+    """Serialize one parsed document to each requested format.
+
+    Returns a dict of format name to file contents. The document is parsed
+    once by the caller and shared by every serializer.
+    """
+    outputs = {}
+    for output_format in formats:
+        if output_format == "html":
+            outputs["html"] = render_document(document, title, template)
+        elif output_format == "json":
+            summary = document.summary
+            outputs["json"] = json.dumps({
+                "title": title,
+                "excerpt": summary.excerpt,
+                "words": summary.words,
+                "reading_time": summary.reading_time,
+                "document": to_json(document),
+            })
+        else:
+            outputs["text"] = to_text(document)
+    return outputs
+
+
+def to_json(block):
+    """Return a block and its descendants as JSON-ready dicts."""
+    node = {"type": block.block_type.value}
+    match block.block_type:
+        case BlockType.HEADING:
+            node.update(level=block.level, id=block.slug, text=block.lines[0])
+        case BlockType.CODE:
+            node.update(info=block.info, text="".join(f"{line}\n" for line in block.lines))
+        case BlockType.PARAGRAPH:
+            node["inlines"] = [inline_to_json(text_node) for text_node in block.inlines]
+        case BlockType.TABLE:
+            node["align"] = block.align
+            node["rows"] = [
+                [[inline_to_json(text_node) for text_node in cell] for cell in row]
+                for row in block.inlines
+            ]
+        case BlockType.EXTENSION:
+            node.update(name=block.extension.name, lines=block.lines)
+        case BlockType.ORDERED_LIST:
+            node.update(start=block.start, tight=block.tight)
+        case BlockType.UNORDERED_LIST:
+            node["tight"] = block.tight
+        case BlockType.LIST_ITEM if block.checked is not None:
+            node["checked"] = block.checked
+
+    if block.children:
+        node["children"] = [to_json(child) for child in block.children]
+    return node
+
+
+def inline_to_json(text_node):
+    node = {"type": text_node.text_type.value, "text": text_node.text}
+    if text_node.url is not None:
+        node["url"] = text_node.url
+    if text_node.title is not None:
+        node["title"] = text_node.title
+    if text_node.children:
+        node["children"] = [inline_to_json(child) for child in text_node.children]
+    return node
+
+
+def to_text(document):
+    """Return the document's text without markup, one block per paragraph."""
+    parts = []
+    collect_text(document, parts)
+    return "\n\n".join(parts) + "\n" if parts else ""
+
+
+def collect_text(block, parts):
+    for child in block.children:
+        match child.block_type:
+            case BlockType.HEADING:
+                parts.append(child.lines[0])
+            case BlockType.CODE:
+                parts.append("\n".join(child.lines))
+            case BlockType.PARAGRAPH:
+                parts.append(inline_text(child.inlines))
+            case BlockType.TABLE:
+                parts.append("\n".join(
+                    "\t".join(inline_text(cell) for cell in row) for row in child.inlines
+                ))
+            case BlockType.EXTENSION | BlockType.EXCERPT_BREAK:
+                pass
+            case _:
+                collect_text(child, parts)
@@ -0,0 +1,72 @@
+from enum import Enum
+
+# extension points for the markdown renderer: custom block syntax, and
+# render overrides per block type or inline text type. Everything is looked
+# up in dicts, so the cost of classifying a line or rendering a node stays
+# flat however many extensions are registered.
+#
+# The registry is module state. Register extensions at import time, before
+# pages render; worker processes started by the scheduler inherit it when
+# they are forked.
+
+
+class Line(Enum):
+    """What BlockExtension.add_line did with the line it was offered."""
+
+    CONTINUE = "continue"  # the line belongs to the block, which stays open
+    CLOSE = "close"  # the line belongs to the block and ends it
+    REJECT = "reject"  # the line is not part of the block, which has ended
+
+
+class BlockExtension:
+    """Base class for a custom block, e.g. `{{< youtube id >}}` or `:::note`.
+
+    A line is only offered to `start` when its first non-space character is
+    one of `first_chars`, so lines that cannot match cost one dict lookup.
+    `start` returns the attributes for the new block, or None when the line
+    does not open one. The block keeps its raw lines in `block.lines`;
+    `render` turns it into an HTMLNode.
+    """
+
+    name = None
+    first_chars = ""
+
+    def start(self, line):
+        return None
+
+    def add_line(self, block, line):
+        # single-line blocks by default
+        return Line.REJECT
+
+    def render(self, block, refs):
+        raise NotImplementedError
+
+
+class Registry:
+    def __init__(self):
+        # first character -> block extensions to try, in registration order
+        self.block_extensions = {}
+        # BlockType -> fn(block, tight, refs) returning an HTMLNode
+        self.block_renderers = {}
+        # TextType -> fn(node) returning an HTML string
+        self.inline_renderers = {}
+
+    def add_block(self, extension):
+        if not extension.first_chars:
+            raise ValueError(f"Block extension {extension.name!r} has no first_chars.")
+        for char in extension.first_chars:
+            self.block_extensions.setdefault(char, []).append(extension)
+
+    def render_block(self, block_type, renderer):
+        self.block_renderers[block_type] = renderer
+
+    def render_inline(self, text_type, renderer):
+        self.inline_renderers[text_type] = renderer
+
+    def clear(self):
+        self.block_extensions.clear()
+        self.block_renderers.clear()
+        self.inline_renderers.clear()
+
+
+registry = Registry()
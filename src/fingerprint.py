@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import shutil
+
+# where content hashes of static files are remembered between builds
+CACHE_PATH = "./.boots-cache/hashes.json"
+MANIFEST_NAME = "asset-manifest.json"
+HASH_LENGTH = 10
+CHUNK_SIZE = 1 << 20
+
+
+class HashCache:
+    """sha256 digests of files, reused while a file's size and mtime are unchanged.
+
+    Large assets are only read again when they actually change on disk.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                # a damaged cache only costs a rehash
+                self.entries = {}
+
+    def digest(self, file_path):
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        entry = self.entries.get(file_path)
+        if entry is not None and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return entry[2]
+
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        self.entries[file_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f)
+
+
+def fingerprint_name(rel_path, digest):
+    """`images/tom.png` -> `images/tom.<hash>.png`."""
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def hash_assets(static_dir, cache):
+    """Map the URL of every file under static_dir to its fingerprinted URL.
+
+    e.g. {"/index.css": "/index.3f2a1b9c0d.css"}
+    """
+    static_dir = os.path.abspath(static_dir)
+    assets = {}
+    for directory, _, files in os.walk(static_dir):
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            rel_path = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            assets[f"/{rel_path}"] = "/" + fingerprint_name(rel_path, cache.digest(path))
+    return assets
+
+
+def copy_assets(static_dir, dest_dir, assets, clean=True):
+    """Copy static files into dest_dir under their fingerprinted names.
+
+    The URL mapping is written to dest_dir as asset-manifest.json for
+    tools outside the build. dest_dir is emptied first unless clean is false.
+    """
+    static_dir = os.path.abspath(static_dir)
+    dest_dir = os.path.abspath(dest_dir)
+    if clean and os.path.exists(dest_dir):
+        shutil.rmtree(dest_dir)
+    os.makedirs(dest_dir, exist_ok=True)
+
+    for url, fingerprinted in assets.items():
+        dest_path = os.path.join(dest_dir, fingerprinted[1:])
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copyfile(os.path.join(static_dir, url[1:]), dest_path)
+
+    with open(os.path.join(dest_dir, MANIFEST_NAME), "w") as f:
+        json.dump(assets, f, indent=2, sort_keys=True)
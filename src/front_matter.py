@@ -0,0 +1,72 @@
+import itertools
+import re
+
+# a small YAML subset between `---` lines at the top of a page:
+#
+#   ---
+#   title: Why Tom Bombadil Was a Mistake
+#   tags: [tolkien, opinion]
+#   ---
+#
+# Values are strings, or lists written as `[a, b]`, `a, b` (for tags) or
+# `- item` lines.
+FENCE = "---"
+FIELD = re.compile(r"([A-Za-z_][\w-]*)[ \t]*:[ \t]*(.*)$")
+LIST_ITEM = re.compile(r"[ \t]*-[ \t]+(.*)$")
+# fields whose plain values are comma-separated lists
+LIST_FIELDS = {"tags", "categories"}
+
+
+def split_front_matter(lines):
+    """Split an iterable of lines into (front matter dict, iterator of the rest).
+
+    Only the front matter lines are consumed, so a streamed document is not
+    read ahead. A page without front matter gets an empty dict.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.strip() != FENCE:
+        return {}, prepend(first, lines)
+
+    front_matter = {}
+    key = None
+    consumed = [first]
+    for line in lines:
+        consumed.append(line)
+        if line.strip() == FENCE:
+            return front_matter, lines
+        if match := LIST_ITEM.match(line):
+            if key is not None:
+                if not isinstance(front_matter[key], list):
+                    front_matter[key] = []
+                front_matter[key].append(unquote(match.group(1)))
+        elif match := FIELD.match(line):
+            key = match.group(1)
+            front_matter[key] = parse_value(key, match.group(2).strip())
+        elif line.strip():
+            break
+
+    # an unclosed fence or a line that is not a field: no front matter after all
+    return {}, itertools.chain(consumed, lines)
+
+
+def prepend(line, lines):
+    yield line
+    yield from lines
+
+
+def parse_value(key, value):
+    if value.startswith("[") and value.endswith("]"):
+        return [unquote(item) for item in value[1:-1].split(",") if item.strip()]
+    if key in LIST_FIELDS:
+        return [unquote(item) for item in value.split(",") if item.strip()]
+    return unquote(value)
+
+
+def unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
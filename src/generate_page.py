@@ -1,93 +1,137 @@
-import re
 import os
-from blocks_markdown import markdown_to_html_node
-
-def extract_title(markdown):
-    match = re.search(r'^\s*#\s+(.*)$', markdown, re.MULTILINE)
-    if not match:
-        raise ValueError("Title is missing.")
-    
-    return match.group(1).strip()
+from blocks_markdown import parse_document
+from document import format_path, render_formats
+from front_matter import split_front_matter
+from render import Template, extract_title
+from mapped_markdown import MMAP_THRESHOLD, read_mapped_document
 
 def is_existing_file(s):
     return os.path.isfile(s)
 
-def generate_page(from_path, template_file_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_file_path}")
-
-    from_path = os.path.abspath(from_path)
-    dest_path = os.path.abspath(dest_path)
+def read_template(template_path):
+    try:
+        with open(template_path, "r") as f:
+            return f.read()
+    except Exception as e:
+        raise RuntimeError(f"Failed to read template file: {e}")
 
+def generate_page(from_path, template_file_path, dest_path, basepath):
+    # template_file_path may be a path or the template text itself
     if is_existing_file(template_file_path):
-        template_path = os.path.abspath(template_file_path)
-
-        # load template
-        try:
-            with open(template_path, "r") as f:
-                template = f.read()
-        except Exception as e:
-            raise RuntimeError(f"Failed to read template file: {e}")
+        template = read_template(os.path.abspath(template_file_path))
     else:
         template = template_file_path
 
-    
-    # read the markdown
+    write_page(from_path, Template(template, basepath), dest_path)
+
+def write_page(from_path, template, dest_path, formats=("html",), meta=None):
+    """Render one page in each of formats next to dest_path.
+
+    The markdown is parsed once for all formats. Returns a dict of each
+    written path to its contents, in format order. If a meta dict is given,
+    it receives the page's front matter fields plus its title, tags,
+    excerpt, words and reading_time.
+    """
+    return next(write_page_copies(from_path, [(dest_path, template)], formats, meta))
+
+def write_page_copies(from_path, targets, formats=("html",), meta=None):
+    """Render one page for each (dest path, template) of targets.
+
+    Like write_page, but the markdown is read and parsed once for every
+    target, e.g. a page each locale without a translation renders from the
+    default locale's source. Yields each target's written dict in turn.
+    """
+    source_path = os.path.abspath(from_path)
+
     try:
-        with open(from_path, "r") as f:
-            markdown = f.read()
+        size = os.path.getsize(source_path)
     except Exception as e:
         raise RuntimeError(f"Failed to read markdown file: {e}")
 
-    # convert markdown to html
-    html_string = markdown_to_html_node(markdown).to_html()
-
-    # extract title
-    title = extract_title(markdown)
+    if size >= MMAP_THRESHOLD:
+        # huge sources are mapped and decoded block by block
+        title, document, front_matter = read_mapped_document(source_path)
+    else:
+        # read the markdown
+        try:
+            with open(source_path, "r") as f:
+                markdown = f.read()
+        except Exception as e:
+            raise RuntimeError(f"Failed to read markdown file: {e}")
+
+        title, document, front_matter = read_document(markdown)
+
+    fill_meta(meta, title, document, front_matter)
+    for dest_path, template in targets:
+        print(f"Generating page from {from_path} to {dest_path}")
+        dest_path = os.path.abspath(dest_path)
+        outputs = render_formats(document, title, template, formats)
+
+        # ensure dest. dir exists
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir and not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+
+        # write each format to its dest. file
+        written = {}
+        for output_format, output in outputs.items():
+            path = format_path(dest_path, output_format)
+            with open(path, "w") as f:
+                f.write(output)
+            written[path] = output
+
+        yield written
+
+def read_document(markdown):
+    """Parse markdown text into (title, document, front matter)."""
+    front_matter, lines = split_front_matter(markdown.split("\n"))
+    title = front_matter.get("title") or extract_title(markdown)
+    return title, parse_document(lines), front_matter
+
+def fill_meta(meta, title, document, front_matter):
+    if meta is None:
+        return
+    meta.update(front_matter)
+    meta.update(
+        title=title,
+        tags=front_matter.get("tags", []),
+        excerpt=document.summary.excerpt,
+        words=document.summary.words,
+        reading_time=document.summary.reading_time,
+    )
+
+def render_source(markdown, template, formats=("html",), meta=None):
+    """Render markdown text in each of formats; return {format: output}.
+
+    Like write_page, for pages that are not files on disk.
+    """
+    title, document, front_matter = read_document(markdown)
+    fill_meta(meta, title, document, front_matter)
+    return render_formats(document, title, template, formats)
 
-    # replace placeholders
-    page = template.replace("{{ Title }}", title)
-    page = page.replace("{{ Content }}", html_string)
-    page = page.replace("href=\"/", f"href=\"{basepath}")
-    page = page.replace("src=\"/", f"src=\"{basepath}")
+def generate_pages_recursive(content_dir_path, template_path, dest_dir_path, basepath):
+    # load and compile the template once for the whole tree
+    template = Template(read_template(os.path.abspath(template_path)), basepath)
+    write_pages_recursive(content_dir_path, template, dest_dir_path)
 
-    # ensure dest. dir exists
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
-    
-    # write html to dest. file
-    with open(dest_path, "w") as f:
-        f.write(page)
+def write_pages_recursive(content_dir_path, template, dest_dir_path):
+    for content_path, html_path in collect_pages(content_dir_path, dest_dir_path):
+        write_page(content_path, template, html_path)
 
-def generate_pages_recursive(content_dir_path, template_path, dest_dir_path, basepath):
+def collect_pages(content_dir_path, dest_dir_path):
+    """Yield (markdown path, html path) pairs for every page under content_dir_path."""
     content_dir_path = os.path.abspath(content_dir_path)
-    template_path = os.path.abspath(template_path)
     dest_dir_path = os.path.abspath(dest_dir_path)
 
-    # ensure destination directory exists
-    os.makedirs(dest_dir_path, exist_ok=True)
-
-    # load template
-    try:
-        with open(template_path, "r") as f:
-            template = f.read()
-    except Exception as e:
-        raise RuntimeError(f"Failed to read template file: {e}")
-
     for entry in os.listdir(content_dir_path):
         content_path = os.path.join(content_dir_path, entry)
-        # template_path
         dest_path = os.path.join(dest_dir_path, entry)
 
         # recurse into subdirectories
         if os.path.isdir(content_path):
-            generate_pages_recursive(content_path, template_path, dest_path, basepath)
+            yield from collect_pages(content_path, dest_path)
 
         # process markdown files
         elif entry.endswith(".md"):
             html_filename = entry.replace(".md", ".html")
-            html_path = os.path.join(dest_dir_path, html_filename)
-            generate_page(content_path, template, html_path, basepath)
-        
-        else:
-            continue
\ No newline at end of file
+            yield content_path, os.path.join(dest_dir_path, html_filename)
@@ -0,0 +1,63 @@
+import re
+from htmlnode import LeafNode, ParentNode, escape_text
+
+# anything that is not a word character, space or hyphen is dropped from slugs
+SLUG_STRIP = re.compile(r"[^\w\- ]")
+
+
+def slugify(text):
+    """Turn heading text into an id, e.g. `Getting Started!` -> `getting-started`."""
+    slug = SLUG_STRIP.sub("", text.strip().lower()).replace(" ", "-")
+    return slug or "section"
+
+
+class Slugger:
+    """Hand out unique slugs for the headings of one page.
+
+    Repeats get a numeric suffix (`intro`, `intro-1`, `intro-2`). The next
+    suffix for each slug is remembered, so every heading costs O(1) lookups
+    no matter how many share its text.
+    """
+
+    def __init__(self):
+        self.used = set()
+        self.next_suffix = {}
+
+    def slug(self, text):
+        base = slugify(text)
+        slug = base
+        suffix = self.next_suffix.get(base, 0)
+        while slug in self.used:
+            suffix += 1
+            slug = f"{base}-{suffix}"
+        self.next_suffix[base] = suffix
+        self.used.add(slug)
+        return slug
+
+
+def toc_html_node(outline):
+    """Build a nested <ul> of `#slug` links from (level, text, slug) headings.
+
+    Returns None for a page without headings.
+    """
+    root = []
+    # (heading level, list the next deeper heading is appended to)
+    stack = [(0, root)]
+    for level, text, slug in outline:
+        while stack[-1][0] >= level:
+            stack.pop()
+        item = (LeafNode(tag="a", value=escape_text(text), props={"href": f"#{slug}"}), [])
+        stack[-1][1].append(item)
+        stack.append((level, item[1]))
+
+    return toc_list_node(root) if root else None
+
+
+def toc_list_node(items):
+    list_items = []
+    for link, children in items:
+        if children:
+            list_items.append(ParentNode(tag="li", children=[link, toc_list_node(children)]))
+        else:
+            list_items.append(ParentNode(tag="li", children=[link]))
+    return ParentNode(tag="ul", children=list_items)
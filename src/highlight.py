@@ -0,0 +1,165 @@
+import hashlib
+import re
+from collections import OrderedDict
+from htmlnode import escape_text
+
+# class-based highlighting for fenced code blocks. Each language is a handful
+# of token patterns plus keyword sets; the combined regex for a language is
+# compiled on first use, and highlighted output is cached per process by
+# (language, hash of the code) so a snippet repeated across many pages is
+# tokenized once. The cache keeps the CACHE_SIZE most recently used snippets,
+# so long-lived processes (the dev server, the render daemon) stay bounded.
+
+NUMBER = r"\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?)\b"
+WORD = r"\b[A-Za-z_$][\w$]*\b"
+
+LANGUAGES = {
+    "python": {
+        "comment": r"#[^\n]*",
+        "string": r"[rRbBuUfF]{0,2}(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*')",
+        "keywords": """
+            and as assert async await break class continue def del elif else
+            except finally for from global if import in is lambda nonlocal not
+            or pass raise return try while with yield match case None True False
+        """,
+        "builtins": """
+            abs all any bool dict enumerate filter float getattr hasattr int
+            isinstance len list map max min object open print range repr reversed
+            set setattr sorted str sum super tuple type zip self cls
+        """,
+    },
+    "javascript": {
+        "comment": r"//[^\n]*|/\*[\s\S]*?\*/",
+        "string": r"`(?:\\.|[^`\\])*`|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'",
+        "keywords": """
+            async await break case catch class const continue debugger default
+            delete do else export extends finally for from function if import in
+            instanceof let new of return static super switch this throw try
+            typeof var void while with yield true false null undefined
+            interface type enum implements private public protected readonly
+        """,
+        "builtins": """
+            Array Boolean console Date Error JSON Map Math Number Object Promise
+            RegExp Set String Symbol document window require module
+        """,
+    },
+    "go": {
+        "comment": r"//[^\n]*|/\*[\s\S]*?\*/",
+        "string": r"`[^`]*`|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'",
+        "keywords": """
+            break case chan const continue default defer else fallthrough for
+            func go goto if import interface map package range return select
+            struct switch type var true false nil iota
+        """,
+        "builtins": """
+            append bool byte cap close complex copy delete error float32 float64
+            int int8 int16 int32 int64 len make new panic print println recover
+            rune string uint uint8 uint16 uint32 uint64 fmt
+        """,
+    },
+    "bash": {
+        "comment": r"(?<![\w$])#[^\n]*",
+        "string": r"\"(?:\\.|[^\"\\])*\"|'[^']*'",
+        "keywords": """
+            if then else elif fi case esac for while until do done in function
+            select return exit export local readonly
+        """,
+        "builtins": """
+            cd echo printf read source test set unset shift eval exec alias
+            python3 pip git sudo cat ls cp mv rm mkdir grep sed awk curl
+        """,
+    },
+    "json": {
+        "string": r"\"(?:\\.|[^\"\\\n])*\"",
+        "keywords": "true false null",
+    },
+    "css": {
+        "comment": r"/\*[\s\S]*?\*/",
+        "string": r"\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'",
+        "number": r"#[0-9a-fA-F]{3,8}\b|-?\b\d+(?:\.\d+)?(?:px|em|rem|%|vh|vw|s|ms|deg)?",
+        "keywords": "important inherit initial unset auto none",
+    },
+}
+
+ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "js": "javascript",
+    "ts": "javascript",
+    "typescript": "javascript",
+    "golang": "go",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+}
+
+CACHE_SIZE = 1024
+
+_tokenizers = {}
+_highlighted = OrderedDict()
+
+
+def language_name(info):
+    """Return the language named by a fence info string, e.g. `python` or None."""
+    if not info:
+        return None
+    language = info.split()[0].lower()
+    return ALIASES.get(language, language)
+
+
+def get_tokenizer(language):
+    tokenizer = _tokenizers.get(language)
+    if tokenizer is None and language in LANGUAGES:
+        spec = LANGUAGES[language]
+        patterns = []
+        for group in ("comment", "string", "number"):
+            pattern = spec.get(group, NUMBER if group == "number" else None)
+            if pattern:
+                patterns.append(f"(?P<{group}>{pattern})")
+        patterns.append(f"(?P<word>{WORD})")
+        tokenizer = (
+            re.compile("|".join(patterns)),
+            set(spec.get("keywords", "").split()),
+            set(spec.get("builtins", "").split()),
+        )
+        _tokenizers[language] = tokenizer
+    return tokenizer
+
+
+def highlight(code, language):
+    """Return code as HTML with class-based <span>s, or None if the language is unknown."""
+    tokenizer = get_tokenizer(language)
+    if tokenizer is None:
+        return None
+
+    key = (language, hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest())
+    highlighted = _highlighted.get(key)
+    if highlighted is None:
+        highlighted = _highlighted[key] = tokenize(code, *tokenizer)
+        while len(_highlighted) > CACHE_SIZE:
+            _highlighted.popitem(last=False)
+    else:
+        _highlighted.move_to_end(key)
+    return highlighted
+
+
+def tokenize(code, pattern, keywords, builtins):
+    parts = []
+    position = 0
+    for match in pattern.finditer(code):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == "word":
+            if text in keywords:
+                kind = "keyword"
+            elif text in builtins:
+                kind = "builtin"
+            else:
+                continue
+
+        parts.append(escape_text(code[position:match.start()]))
+        parts.append(f'<span class="hl-{kind}">{escape_text(text)}</span>')
+        position = match.end()
+
+    parts.append(escape_text(code[position:]))
+    return "".join(parts)
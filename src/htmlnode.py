@@ -1,4 +1,17 @@
-import html
+# translation tables for escaping text content and attribute values
+TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+ATTRIBUTE_ESCAPES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+)
+
+def escape_text(text):
+    # most text has nothing to escape, so skip the translate copy for it
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.translate(TEXT_ESCAPES)
+
+def escape_attribute(value):
+    return value.translate(ATTRIBUTE_ESCAPES)
 
 class HTMLNode:
     def __init__(self, *, tag=None, value=None, children=None, props=None):
@@ -14,7 +27,7 @@ class HTMLNode:
         if self.props is None:
             return ""
 
-        return ''.join(f' {key}="{html.escape(str(value), quote=True)}"' for key, value in self.props.items())
+        return ''.join(f' {key}="{escape_attribute(str(value))}"' for key, value in self.props.items())
     
     def children_to_string(self):
         if self.children is None:
@@ -1,13 +1,451 @@
 import re
+import unicodedata
 from textnode import TextType, TextNode
 
-def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.PLAIN)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+ASCII_PUNCTUATION = set("!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~")
+SPECIAL_CHARS = re.compile(r"[\\`*_\[\]!]")
+BACKTICK_RUN = re.compile(r"`+")
+# `(destination "optional title")`; the destination may be wrapped in <>,
+# and the title quoted with "" or '' or put in parentheses
+LINK_DESTINATION = re.compile(
+    r"\([ \t\n]*(?:<((?:[^<>\n\\]|\\.)*)>|([^()]*?))"
+    r"(?:[ \t\n]+(\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*'|\((?:[^()\\]|\\.)*\)))?[ \t\n]*\)"
+)
+BACKSLASH_ESCAPE = re.compile(r"\\([!-/:-@\[-`{-~])")
+LINK_LABEL = re.compile(r"\[((?:[^\[\]\\]|\\.)*)\]")
+# link labels longer than this never match a definition
+MAX_LABEL_LENGTH = 999
+# emphasis and links nested deeper than this stay literal text, so that the
+# recursive walks over TextNode children stay far from the recursion limit
+MAX_NESTING = 64
+
+
+def text_to_textnodes(text, refs=None):
+    """Parse inline markdown into a list of (possibly nested) TextNodes.
+
+    Emphasis follows the CommonMark delimiter-stack rules, so `**bold _italic_**`
+    nests, `snake_case` stays plain and unmatched delimiters are literal text.
+    Each character is scanned once and every delimiter is matched or dropped
+    once, which keeps parsing linear in the length of the text. Emphasis and
+    links are nested at most MAX_NESTING deep; delimiters that would nest
+    deeper are left as text.
+
+    refs maps normalized labels to (destination, title or None) for reference
+    links (`[text][label]`, `[label][]` and `[label]`); see normalize_label.
+    """
+    return InlineParser(text, refs).parse()
+
+
+def normalize_label(label):
+    """Normalize a link label for lookup: case-folded, whitespace collapsed."""
+    return " ".join(label.split()).casefold()
+
+
+def link_title(title):
+    """The text of a quoted or parenthesized link title, or None for no title."""
+    if not title:
+        return None
+    return BACKSLASH_ESCAPE.sub(r"\1", title[1:-1])
+
+
+def is_punctuation(char):
+    if char in ASCII_PUNCTUATION:
+        return True
+    return char.isascii() is False and unicodedata.category(char)[0] in "PS"
+
+
+class Inline:
+    """A node in the parser's working doubly-linked list of inline content."""
+
+    __slots__ = ("kind", "text", "url", "title", "depth", "first", "last", "prev", "next")
+
+    def __init__(self, kind, text="", url=None, title=None):
+        self.kind = kind
+        self.text = text
+        self.url = url
+        self.title = title
+        # how many emphasis and link nodes deep this node's content goes
+        self.depth = 0
+        self.first = None
+        self.last = None
+        self.prev = None
+        self.next = None
+
+    def append(self, node):
+        node.prev = self.last
+        if self.last is None:
+            self.first = node
+        else:
+            self.last.next = node
+        self.last = node
+
+
+class Delimiter:
+    __slots__ = (
+        "node", "char", "count", "length", "can_open", "can_close",
+        "prev", "next", "image", "bottom", "position",
+    )
+
+    def __init__(self, node, char, count, can_open=False, can_close=False):
+        self.node = node
+        self.char = char
+        self.count = count
+        self.length = count
+        self.can_open = can_open
+        self.can_close = can_close
+        self.prev = None
+        self.next = None
+        # used by bracket openers only
+        self.image = False
+        self.bottom = None
+        self.position = None
+
+
+class InlineParser:
+    def __init__(self, text, refs=None):
+        self.text = text
+        self.refs = refs or {}
+        self.root = Inline("root")
+        self.delimiters = None  # top of the emphasis delimiter stack
+        self.brackets = []
+        # link openers below this stack depth sit outside a link, and links
+        # may not nest, so they can no longer form links themselves
+        self.link_floor = 0
+        # likewise for link and image openers outside content already nested
+        # MAX_NESTING deep
+        self.nesting_floor = 0
+
+        # start offsets of every backtick run, grouped by run length, so the
+        # closing run of a code span is found without rescanning the text
+        self.backtick_runs = {}
+        self.backtick_seen = {}
+        for match in BACKTICK_RUN.finditer(text):
+            length = match.end() - match.start()
+            self.backtick_runs.setdefault(length, []).append(match.start())
+
+    def parse(self):
+        text = self.text
+        pos = 0
+        while pos < len(text):
+            match = SPECIAL_CHARS.search(text, pos)
+            if not match:
+                self.add_text(text[pos:])
+                break
+            if match.start() > pos:
+                self.add_text(text[pos:match.start()])
+            pos = match.start()
+            char = text[pos]
+
+            if char == "\\":
+                if pos + 1 < len(text) and text[pos + 1] in ASCII_PUNCTUATION:
+                    self.add_text(text[pos + 1])
+                    pos += 2
+                else:
+                    self.add_text(char)
+                    pos += 1
+            elif char == "`":
+                pos = self.parse_code_span(pos)
+            elif char in "*_":
+                pos = self.parse_delimiter_run(pos)
+            elif char == "[":
+                pos += 1
+                self.push_bracket(self.add_text("["), image=False, position=pos)
+            elif char == "!" and text.startswith("[", pos + 1):
+                pos += 2
+                self.push_bracket(self.add_text("!["), image=True, position=pos)
+            elif char == "]":
+                pos = self.parse_close_bracket(pos)
+            else:
+                self.add_text(char)
+                pos += 1
+
+        self.process_emphasis(None)
+        return to_textnodes(self.root)
+
+    def add_text(self, text):
+        node = Inline("text", text)
+        self.root.append(node)
+        return node
+
+    def parse_code_span(self, pos):
+        text = self.text
+        end = pos
+        while end < len(text) and text[end] == "`":
+            end += 1
+        length = end - pos
+
+        # find the next run of exactly the same length; the search position
+        # only ever moves forward, so each run is visited once
+        runs = self.backtick_runs.get(length, [])
+        i = self.backtick_seen.get(length, 0)
+        while i < len(runs) and runs[i] < end:
+            i += 1
+        self.backtick_seen[length] = i
+        if i == len(runs):
+            self.add_text(text[pos:end])
+            return end
+
+        closer = runs[i]
+        code = text[end:closer].replace("\n", " ")
+        if len(code) > 2 and code[0] == " " and code[-1] == " " and code.strip(" "):
+            code = code[1:-1]
+        self.root.append(Inline("code", code))
+        return closer + length
+
+    def parse_delimiter_run(self, pos):
+        text = self.text
+        char = text[pos]
+        end = pos
+        while end < len(text) and text[end] == char:
+            end += 1
+
+        before = text[pos - 1] if pos > 0 else " "
+        after = text[end] if end < len(text) else " "
+        left_flanking = not after.isspace() and (
+            not is_punctuation(after) or before.isspace() or is_punctuation(before)
+        )
+        right_flanking = not before.isspace() and (
+            not is_punctuation(before) or after.isspace() or is_punctuation(after)
+        )
+        if char == "*":
+            can_open = left_flanking
+            can_close = right_flanking
+        else:
+            # `_` may not open or close inside a word, e.g. snake_case
+            can_open = left_flanking and (not right_flanking or is_punctuation(before))
+            can_close = right_flanking and (not left_flanking or is_punctuation(after))
+
+        node = self.add_text(text[pos:end])
+        if can_open or can_close:
+            self.push_delimiter(Delimiter(node, char, end - pos, can_open, can_close))
+        return end
+
+    def push_delimiter(self, delimiter):
+        delimiter.prev = self.delimiters
+        if self.delimiters is not None:
+            self.delimiters.next = delimiter
+        self.delimiters = delimiter
+
+    def remove_delimiter(self, delimiter):
+        if delimiter.prev is not None:
+            delimiter.prev.next = delimiter.next
+        if delimiter.next is not None:
+            delimiter.next.prev = delimiter.prev
+        else:
+            self.delimiters = delimiter.prev
+
+    def push_bracket(self, node, image, position):
+        bracket = Delimiter(node, "[", 1)
+        bracket.image = image
+        bracket.bottom = self.delimiters
+        # where the bracketed text starts, for shortcut reference labels
+        bracket.position = position
+        self.brackets.append(bracket)
+
+    def parse_close_bracket(self, pos):
+        if not self.brackets:
+            self.add_text("]")
+            return pos + 1
+
+        opener = self.brackets.pop()
+        depth = len(self.brackets)
+        active = (opener.image or depth >= self.link_floor) and depth >= self.nesting_floor
+        self.link_floor = min(self.link_floor, depth)
+        self.nesting_floor = min(self.nesting_floor, depth)
+
+        url, title, end = self.link_target(opener, pos) if active else (None, None, None)
+        if url is None:
+            self.add_text("]")
+            return pos + 1
+
+        self.process_emphasis(opener.bottom)
+        nesting = 1 + max_depth(opener.node.next, None)
+        if nesting > MAX_NESTING:
+            # every enclosing bracket would contain this content too
+            self.nesting_floor = depth
+            self.add_text("]")
+            return pos + 1
+
+        kind = "image" if opener.image else "link"
+        link = Inline(kind, url=url, title=title)
+        link.depth = nesting
+        link.first = opener.node.next
+        link.last = self.root.last if link.first is not None else None
+        if link.first is not None:
+            link.first.prev = None
+
+        # the link node takes the place of the opening bracket
+        link.prev = opener.node.prev
+        if link.prev is None:
+            self.root.first = link
+        else:
+            link.prev.next = link
+        self.root.last = link
+
+        if not opener.image:
+            self.link_floor = depth
+        return end
+
+    def link_target(self, opener, pos):
+        """Return (url, title, end) for the link closed by the `]` at pos.
+
+        All three are None when the bracket closes no link.
+        """
+        match = LINK_DESTINATION.match(self.text, pos + 1)
+        if match:
+            if match.group(1) is not None:
+                url = BACKSLASH_ESCAPE.sub(r"\1", match.group(1))
+            else:
+                url = match.group(2).strip()
+            return url, link_title(match.group(3)), match.end()
+        if not self.refs:
+            return None, None, None
+
+        # [text][label], or the collapsed [label][] and shortcut [label] forms
+        match = LINK_LABEL.match(self.text, pos + 1)
+        if match and match.group(1).strip():
+            start, end = pos + 2, match.end() - 1
+        else:
+            start, end = opener.position, pos
+        if end - start > MAX_LABEL_LENGTH:
+            return None, None, None
+        target = self.refs.get(normalize_label(self.text[start:end]))
+        if target is None:
+            return None, None, None
+        return *target, match.end() if match else pos + 1
+
+    def process_emphasis(self, stack_bottom):
+        # first delimiter above stack_bottom
+        closer = self.delimiters
+        if closer is stack_bottom:
+            closer = None
+        while closer is not None and closer.prev is not stack_bottom:
+            closer = closer.prev
+
+        openers_bottom = {}
+        while closer is not None:
+            if not closer.can_close:
+                closer = closer.next
+                continue
+
+            key = (closer.char, closer.can_open, closer.length % 3)
+            bottom = openers_bottom.get(key, stack_bottom)
+            opener = closer.prev
+            while opener is not None and opener is not stack_bottom and opener is not bottom:
+                if opener.char == closer.char and opener.can_open:
+                    odd_match = (
+                        (closer.can_open or opener.can_close)
+                        and (opener.length + closer.length) % 3 == 0
+                        and not (opener.length % 3 == 0 and closer.length % 3 == 0)
+                    )
+                    if not odd_match:
+                        break
+                opener = opener.prev
+            else:
+                opener = None
+
+            if opener is not None:
+                nesting = 1 + max_depth(opener.node.next, closer.node)
+                if nesting > MAX_NESTING:
+                    opener = None
+
+            if opener is None:
+                openers_bottom[key] = closer.prev
+                next_closer = closer.next
+                if not closer.can_open:
+                    self.remove_delimiter(closer)
+                closer = next_closer
+                continue
+
+            used = 2 if opener.count >= 2 and closer.count >= 2 else 1
+            opener.count -= used
+            closer.count -= used
+            opener.node.text = opener.node.text[:opener.count]
+            closer.node.text = closer.node.text[:closer.count]
+
+            emphasis = Inline("strong" if used == 2 else "em")
+            emphasis.depth = nesting
+            if opener.node.next is not closer.node:
+                emphasis.first = opener.node.next
+                emphasis.last = closer.node.prev
+                emphasis.first.prev = None
+                emphasis.last.next = None
+            emphasis.prev = opener.node
+            emphasis.next = closer.node
+            opener.node.next = emphasis
+            closer.node.prev = emphasis
+
+            # delimiters between the pair can no longer match anything
+            opener.next = closer
+            closer.prev = opener
+
+            if opener.count == 0:
+                self.remove_node(opener.node)
+                self.remove_delimiter(opener)
+            if closer.count == 0:
+                next_closer = closer.next
+                self.remove_node(closer.node)
+                self.remove_delimiter(closer)
+                closer = next_closer
+
+        # drop everything above stack_bottom; unmatched runs stay as text
+        while self.delimiters is not stack_bottom and self.delimiters is not None:
+            self.remove_delimiter(self.delimiters)
+
+    def remove_node(self, node):
+        if node.prev is not None:
+            node.prev.next = node.next
+        else:
+            self.root.first = node.next
+        if node.next is not None:
+            node.next.prev = node.prev
+        else:
+            self.root.last = node.prev
+
+
+def max_depth(node, end):
+    """The deepest nesting among the nodes of a chain, from node up to end."""
+    depth = 0
+    while node is not end:
+        depth = max(depth, node.depth)
+        node = node.next
+    return depth
+
+
+def to_textnodes(parent):
+    """Convert a chain of Inline nodes into TextNodes, merging adjacent text."""
+    nodes = []
+    plain = []
+    node = parent.first
+    while node is not None:
+        if node.kind == "text":
+            plain.append(node.text)
+            node = node.next
+            continue
+
+        if plain:
+            nodes.append(TextNode("".join(plain), TextType.PLAIN))
+            plain = []
+
+        if node.kind == "code":
+            nodes.append(TextNode(node.text, TextType.CODE))
+        else:
+            children = to_textnodes(node)
+            text = "".join(child.text for child in children)
+            if len(children) == 1 and children[0].text_type == TextType.PLAIN:
+                children = None
+            if node.kind == "image":
+                nodes.append(TextNode(text, TextType.ALT, node.url, title=node.title))
+            elif node.kind == "link":
+                nodes.append(TextNode(text, TextType.LINK, node.url, children or None, node.title))
+            elif node.kind == "strong":
+                nodes.append(TextNode(text, TextType.BOLD, children=children or None))
+            else:
+                nodes.append(TextNode(text, TextType.ITALIC, children=children or None))
+        node = node.next
+
+    if plain:
+        nodes.append(TextNode("".join(plain), TextType.PLAIN))
     return nodes
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from taxonomy import template_key
+
+# pages finished by the current (or an interrupted) build
+JOURNAL_PATH = "./.boots-cache/journal.jsonl"
+
+
+def build_key(template, formats):
+    """A digest of everything besides a page's source that shapes its output."""
+    key = json.dumps([template_key(template), list(formats)])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class Journal:
+    """Append-only record of finished pages, so an interrupted build can resume.
+
+    The first line names the build: its output directory and build key.
+    Every further line is one finished page, flushed as soon as the page is
+    written, so whatever kills the build, the pages before it are on record.
+    Opened with resume=True, the entries of a journal for the same build
+    are kept (a torn last line is dropped) and the file is compacted to
+    them; otherwise the journal starts empty.
+    """
+
+    def __init__(self, dest_dir, key, path=JOURNAL_PATH, resume=False):
+        self.path = path
+        self.header = {"dest": os.path.abspath(dest_dir), "build": key}
+        self.pages = self.load() if resume else {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # rewrite through a temporary file so a crash now loses nothing
+        with open(f"{path}.tmp", "w") as f:
+            f.write(json.dumps(self.header) + "\n")
+            for entry in self.pages.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(f"{path}.tmp", path)
+        self.file = open(path, "a")
+
+    def load(self):
+        pages = {}
+        try:
+            with open(self.path, "r") as f:
+                if json.loads(f.readline() or "null") != self.header:
+                    return {}
+                for line in f:
+                    entry = json.loads(line)
+                    pages[entry["output"]] = entry
+        except (OSError, ValueError):
+            # no journal, or one cut off mid-line: keep what was read
+            pass
+        return pages
+
+    def completed(self, dest_path, input_hash):
+        """Return the entry of a page finished from the same input, if its files exist."""
+        entry = self.pages.get(os.path.abspath(dest_path))
+        if entry is None or entry["input"] != input_hash:
+            return None
+        if not all(os.path.isfile(path) for path in entry["files"]):
+            return None
+        return entry
+
+    def record(self, dest_path, input_hash, file_hashes, meta):
+        entry = {
+            "output": os.path.abspath(dest_path),
+            "input": input_hash,
+            "files": file_hashes,
+            "meta": meta,
+        }
+        self.pages[entry["output"]] = entry
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+        return entry
+
+    def prune(self, outputs):
+        """Forget the pages whose output is not among outputs; return their files."""
+        files = []
+        for output in self.pages.keys() - {os.path.abspath(path) for path in outputs}:
+            files.extend(self.pages.pop(output)["files"])
+        return files
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,77 @@
+import os
+import re
+import shutil
+from generate_page import collect_pages
+
+# e.g. `en`, `pt-BR`, `zh_Hant`
+LOCALE = re.compile(r"[A-Za-z]{2,3}([-_][A-Za-z0-9]{2,8})*$")
+
+
+def parse_locales(spec):
+    """Parse `en,fr,de` into a tuple of locales; the first is the default."""
+    locales = tuple(locale.strip() for locale in spec.split(",") if locale.strip())
+    for locale in locales:
+        if not LOCALE.match(locale):
+            raise ValueError(f"Invalid locale '{locale}'.")
+    if not locales or len(set(locales)) != len(locales):
+        raise ValueError(f"Invalid locales '{spec}', expected e.g. en,fr,de.")
+    return locales
+
+
+def locale_dirs(content_dir, dest_dir, locales):
+    """Yield (locale, content dir, dest dir) for each locale.
+
+    Every locale's pages come from content/<locale>/. The default locale is
+    written at the site root and the others under /<locale>/.
+    """
+    for locale in locales:
+        dest = dest_dir if locale == locales[0] else os.path.join(dest_dir, locale)
+        yield locale, os.path.join(content_dir, locale), dest
+
+
+def locale_basepath(basepath, locale, locales):
+    if locale == locales[0]:
+        return basepath
+    return f"{basepath}{locale}/"
+
+
+def collect_locale_pages(content_dir, dest_dir, locales):
+    """Yield (markdown path, html path, locale) for the pages of every locale.
+
+    A page of the default locale that another locale has no translation of
+    is rendered for that locale from the default locale's source, so every
+    locale has the same pages. scheduler.render_pages parses such a source
+    once for all the locales it is rendered for.
+    """
+    dirs = list(locale_dirs(content_dir, dest_dir, locales))
+    _, default_content, default_dest = dirs[0]
+    fallbacks = {}
+    for content_path, html_path in collect_pages(default_content, default_dest):
+        fallbacks[os.path.relpath(html_path, default_dest)] = content_path
+        yield content_path, html_path, locales[0]
+
+    for locale, locale_content, locale_dest in dirs[1:]:
+        pages = dict(fallbacks)
+        if os.path.isdir(locale_content):
+            for content_path, html_path in collect_pages(locale_content, locale_dest):
+                pages[os.path.relpath(html_path, locale_dest)] = content_path
+        for rel_path in sorted(pages):
+            yield pages[rel_path], os.path.join(locale_dest, rel_path), locale
+
+
+def link_files(src_dir, dest_dir, rel_paths):
+    """Hard-link each of rel_paths under src_dir to the same path under dest_dir.
+
+    Static files are copied once, then shared by every locale. Where a hard
+    link is not possible (e.g. another filesystem), the file is copied.
+    """
+    for rel_path in rel_paths:
+        src = os.path.join(src_dir, rel_path)
+        dest = os.path.join(dest_dir, rel_path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if os.path.lexists(dest):
+            os.remove(dest)
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copyfile(src, dest)
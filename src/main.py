@@ -1,11 +1,309 @@
+import argparse
+import hashlib
+import json
+import os
 import sys
-from src_to_dest import src_to_dest
-from generate_page import generate_pages_recursive
+from archive import is_archive, iter_files, open_writer
+from changes import diff_outputs, load_outputs, save_outputs, static_outputs, write_changes
+from src_to_dest import src_to_archive, src_to_dest
+from critical_css import inline_critical_css
+from data_pages import write_data_pages
+from document import format_path, parse_formats
+from fingerprint import MANIFEST_NAME, HashCache, copy_assets, hash_assets
+from generate_page import collect_pages, read_template
+from journal import Journal, build_key
+from locales import collect_locale_pages, link_files, locale_basepath, locale_dirs, parse_locales
+from render import Template
+from scheduler import parse_size, render_pages, render_sources
+from shard import build_shard, merge_shards, parse_shard, write_manifest
+from taxonomy import PAGES_DIR, STATE_PATH, TaxonomyIndex, listing_meta, write_taxonomies
 
-def main():
-    src_to_dest("./static", "./docs")
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-    generate_pages_recursive("./content", "./template.html", "./docs", basepath)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the site from ./content.")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--content", default="./content",
+        help="markdown directory, or a .zip/.tar(.gz) archive of it",
+    )
+    parser.add_argument(
+        "--static", default="./static",
+        help="static asset directory, or a .zip/.tar(.gz) archive of it",
+    )
+    parser.add_argument(
+        "--dest", default="./docs",
+        help="output directory, or a .zip/.tar(.gz) archive to write the site into",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="number of pages to render in parallel"
+    )
+    parser.add_argument(
+        "--memory-budget", metavar="SIZE", type=parse_size,
+        help="cap on estimated memory of pages rendering at once, e.g. 3G",
+    )
+    parser.add_argument(
+        "--formats", default=("html",), type=parse_formats, metavar="LIST",
+        help="comma-separated page formats to write: html, json, text",
+    )
+    parser.add_argument(
+        "--fingerprint", action="store_true",
+        help="copy static files as name.<hash>.ext and rewrite references to them",
+    )
+    parser.add_argument(
+        "--data", default="./data",
+        help="directory of CSV/JSONL data sources, each rendered one page per row",
+    )
+    parser.add_argument(
+        "--locales", metavar="LIST", type=parse_locales,
+        help="build content/<locale>/ for each comma-separated locale; the first is the default",
+    )
+    parser.add_argument(
+        "--critical-css", action="store_true",
+        help="inline the CSS rules each page uses and load stylesheets without blocking",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="keep --dest and skip pages the last build finished from unchanged sources",
+    )
+    parser.add_argument(
+        "--keep-going", action="store_true",
+        help="report pages that fail to render instead of stopping at the first",
+    )
+    parser.add_argument(
+        "--errors", default="./build-errors.json",
+        help="where --keep-going writes the pages that failed",
+    )
+    parser.add_argument(
+        "--shard", metavar="i/N", type=parse_shard,
+        help="render only shard i of N into --dest and write its manifest",
+    )
+    parser.add_argument(
+        "--merge", metavar="SHARD_DIR", nargs="+",
+        help="combine shard outputs into --dest",
+    )
+    parser.add_argument(
+        "--manifest", default="./build-manifest.json",
+        help="where --merge writes the combined manifest",
+    )
+    parser.add_argument(
+        "--changes", default="./changes.json",
+        help="where to write the files added, modified and deleted since the last build",
+    )
+    args = parser.parse_args(argv)
+    if args.locales and (args.shard or args.merge):
+        parser.error("--locales cannot be combined with --shard or --merge")
+    if any(map(is_archive, (args.content, args.static, args.dest))):
+        if args.locales or args.shard or args.merge or args.fingerprint:
+            parser.error(
+                "archives cannot be combined with --locales, --shard, --merge or --fingerprint"
+            )
+        if args.resume or args.keep_going:
+            parser.error("--resume and --keep-going need a directory --content and --dest")
+    if (args.resume or args.keep_going) and (args.shard or args.merge):
+        parser.error("--resume and --keep-going cannot be combined with --shard or --merge")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    options = {
+        "jobs": args.jobs, "memory_budget": args.memory_budget, "formats": args.formats
+    }
+    cache = HashCache()
+    # pages that failed to render, with --keep-going
+    errors = [] if args.keep_going else None
+    assets = hash_assets(args.static, cache) if args.fingerprint else None
+    template_text = read_template("./template.html")
+    critical = None
+    if args.critical_css:
+        template_text, critical = inline_critical_css(
+            template_text, args.static, args.basepath, assets
+        )
+    template = Template(template_text, args.basepath, assets, critical)
+
+    if args.shard:
+        cache.save()
+        build_shard(args.content, template, args.dest, *args.shard, **options)
+        return
+
+    if any(map(is_archive, (args.content, args.static, args.dest))):
+        outputs = build_archive(args, template)
+        write_changes(args.changes, diff_outputs(load_outputs(args.dest), outputs))
+        save_outputs(args.dest, outputs)
+        return
+
+    try:
+        outputs = build_directory(
+            args, template_text, template, assets, critical, cache, errors, options
+        )
+    finally:
+        # written even when the build dies, so the failures so far are on record
+        if errors is not None:
+            with open(args.errors, "w") as f:
+                json.dump(errors, f, indent=2)
+
+    # a report of what changed, for uploading and purging only the delta
+    write_changes(args.changes, diff_outputs(load_outputs(args.dest), outputs))
+    save_outputs(args.dest, outputs)
+    cache.save()
+
+    if errors:
+        print(f"{len(errors)} pages failed to render, see {args.errors}")
+        sys.exit(1)
+
+def build_directory(args, template_text, template, assets, critical, cache, errors, options):
+    """Build from a content directory into the --dest directory.
+
+    Returns {output path relative to --dest: sha256}.
+    """
+    # a resumed build keeps the pages already in --dest
+    if assets:
+        copy_assets(args.static, args.dest, assets, clean=not args.resume)
+    else:
+        src_to_dest(args.static, args.dest, clean=not args.resume)
+    static = static_outputs(args.static, cache, assets)
+    if assets:
+        static[MANIFEST_NAME] = cache.digest(os.path.join(args.dest, MANIFEST_NAME))
+    outputs = dict(static)
+
+    dest = os.path.abspath(args.dest)
+    # output directory and template of each site: one per locale, or just one
+    sites = {None: (dest, template)}
+    if args.locales:
+        sites = {}
+        for locale, _, locale_dest in locale_dirs(args.content, dest, args.locales):
+            basepath = locale_basepath(args.basepath, locale, args.locales)
+            sites[locale] = (locale_dest, Template(template_text, basepath, assets, critical))
+            if locale_dest != dest:
+                # static files are copied once; other locales link to them
+                link_files(dest, locale_dest, static)
+                for path, digest in static.items():
+                    outputs[f"{locale}/{path}"] = digest
+
+    # tags and categories of every page, for each site's taxonomy pages
+    indexes = {site: TaxonomyIndex() for site in sites}
+    stale_pages = []
+    if args.merge:
+        manifest = merge_shards(args.merge, args.dest)
+        write_manifest(args.manifest, manifest)
+        for entry in manifest["pages"]:
+            outputs.update(entry["files"])
+            indexes[None].add(entry["output"], entry["meta"])
+    else:
+        if args.locales:
+            # every locale renders in the same run, sharing the workers
+            pages = [
+                (from_path, dest_path, sites[locale][1])
+                for from_path, dest_path, locale in collect_locale_pages(args.content, dest, args.locales)
+            ]
+        else:
+            pages = list(collect_pages(args.content, dest))
+        site_of = {site_dest: site for site, (site_dest, _) in sites.items()}
+
+        def add_page(entry):
+            for path, digest in entry["files"].items():
+                outputs[os.path.relpath(path, dest)] = digest
+            site = page_site(entry["output"], dest, site_of)
+            indexes[site].add(os.path.relpath(entry["output"], sites[site][0]), entry["meta"])
+
+        with Journal(dest, build_key(template, args.formats), resume=args.resume) as journal:
+            # pages finished by the interrupted build, from unchanged sources, are kept
+            pending = []
+            inputs = {}
+            for page in pages:
+                input_hash = cache.digest(page[0])
+                entry = journal.completed(page[1], input_hash)
+                if entry is not None:
+                    add_page(entry)
+                else:
+                    inputs[page[1]] = input_hash
+                    pending.append(page)
+            # pages of the journaled build whose sources are gone
+            stale_pages = journal.prune({page[1] for page in pages})
+            if args.resume:
+                print(f"Resuming: {len(pages) - len(pending)} pages done, {len(pending)} to render")
+
+            results = render_pages(pending, template, errors=errors, **options)
+            for _, dest_path, _, file_hashes, meta in results:
+                add_page(journal.record(
+                    dest_path, inputs[dest_path], file_hashes, listing_meta(meta)
+                ))
+
+    data_outputs, rendered = write_data_pages(args.data, template, dest, args.jobs)
+    if data_outputs:
+        print(f"Data pages: {rendered} rendered, {len(data_outputs) - rendered} unchanged")
+    outputs.update(data_outputs)
+
+    for site, (site_dest, site_template) in sites.items():
+        paths = {}
+        if site is not None:
+            root, ext = os.path.splitext(STATE_PATH)
+            paths = {"state_path": f"{root}-{site}{ext}", "pages_dir": os.path.join(PAGES_DIR, site)}
+        taxonomy_outputs, rendered = write_taxonomies(indexes[site], site_template, site_dest, **paths)
+        print(f"Taxonomy pages: {rendered} rendered, {len(taxonomy_outputs) - rendered} unchanged")
+        for path, digest in taxonomy_outputs.items():
+            outputs[os.path.relpath(os.path.join(site_dest, path), dest)] = digest
+
+    if args.resume:
+        # outputs of pages and static files deleted since the last build
+        # would not be in a clean build either
+        stale = {os.path.relpath(path, dest) for path in stale_pages}
+        stale |= load_outputs(args.dest).keys()
+        remove_outputs(dest, stale - outputs.keys())
+    return outputs
+
+def build_archive(args, template):
+    """Build from and/or into archives, streaming members without unpacking them.
+
+    Returns {output name: sha256}.
+    """
+    index = TaxonomyIndex()
+    with open_writer(args.dest) as writer:
+        outputs = src_to_archive(args.static, writer)
+        sources = (
+            (name, data.decode("utf-8"))
+            for name, data in iter_files(args.content)
+            if name.endswith(".md")
+        )
+        for name, page_outputs, meta in render_sources(sources, template, args.jobs, args.formats):
+            html_name = name[:-len(".md")] + ".html"
+            print(f"Generating page from {name} to {html_name}")
+            for output_format, output in page_outputs.items():
+                data = output.encode("utf-8")
+                writer.add(format_path(html_name, output_format), data)
+                outputs[format_path(html_name, output_format)] = hashlib.sha256(data).hexdigest()
+            index.add(html_name, meta)
+
+        data_outputs, rendered = write_data_pages(
+            args.data, template, args.dest, args.jobs, writer=writer
+        )
+        if data_outputs:
+            print(f"Data pages: {rendered} rendered, {len(data_outputs) - rendered} unchanged")
+        outputs.update(data_outputs)
+
+        taxonomy_outputs, rendered = write_taxonomies(index, template, args.dest, writer=writer)
+        print(f"Taxonomy pages: {rendered} rendered, {len(taxonomy_outputs) - rendered} unchanged")
+        outputs.update(taxonomy_outputs)
+    return outputs
+
+def remove_outputs(dest, rel_paths):
+    """Delete the given files under dest, and the directories they leave empty."""
+    for rel_path in sorted(rel_paths):
+        path = os.path.join(dest, rel_path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        print(f"Removing stale {rel_path}")
+        directory = os.path.dirname(path)
+        while directory != dest and not os.listdir(directory):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+
+def page_site(dest_path, dest, site_of):
+    """Return the site whose output directory holds dest_path."""
+    rel_path = os.path.relpath(dest_path, dest)
+    top = rel_path.split(os.sep)[0]
+    return site_of.get(os.path.join(dest, top), site_of.get(dest))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
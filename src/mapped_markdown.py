@@ -0,0 +1,52 @@
+import mmap
+import re
+from blocks_markdown import parse_document
+from front_matter import split_front_matter
+from render import render_document
+
+# sources at least this large are memory-mapped instead of read into a string
+MMAP_THRESHOLD = 1 << 20
+
+# any of the line endings that text-mode reads would translate to "\n"
+LINE_ENDING = re.compile(rb"\r\n|\r|\n")
+# extract_title's pattern, with "\r" ending lines as well as "\n"
+TITLE_PATTERN = re.compile(rb"(?:\A|(?<=[\r\n]))\s*#\s+([^\r\n]*)")
+
+
+def iter_mapped_lines(mm):
+    """Yield the lines of a mapped markdown file, like markdown.split("\n").
+
+    Line boundaries are found on the raw bytes; only each line's own slice is
+    ever decoded, so the whole file never exists as one string.
+    """
+    start = 0
+    for line_ending in LINE_ENDING.finditer(mm):
+        yield mm[start:line_ending.start()].decode("utf-8")
+        start = line_ending.end()
+    yield mm[start:].decode("utf-8")
+
+
+def extract_mapped_title(mm):
+    match = TITLE_PATTERN.search(mm)
+    if not match:
+        raise ValueError("Title is missing.")
+
+    return match.group(1).decode("utf-8").strip()
+
+
+def read_mapped_document(from_path):
+    """Parse the markdown file at from_path via mmap into (title, document, front matter)."""
+    with open(from_path, "rb") as f:
+        # zero-length files cannot be mapped
+        if not f.seek(0, 2):
+            raise ValueError("Title is missing.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            front_matter, lines = split_front_matter(iter_mapped_lines(mm))
+            title = front_matter.get("title") or extract_mapped_title(mm)
+            return title, parse_document(lines), front_matter
+
+
+def render_mapped_page(from_path, template):
+    """Render the markdown file at from_path into a compiled Template via mmap."""
+    title, document, _ = read_mapped_document(from_path)
+    return render_document(document, title, template)
@@ -0,0 +1,128 @@
+import re
+from blocks_markdown import document_to_html_node, markdown_to_html_node, parse_document
+from front_matter import split_front_matter
+from headings import toc_html_node
+from htmlnode import escape_text
+
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+# a root-relative href or src; the path stops before any query or fragment
+ROOT_REFERENCE = re.compile(r'(href|src)="/([^"?#]*)')
+TITLE_PATTERN = re.compile(r"^\s*#\s+(.*)$", re.MULTILINE)
+
+
+def extract_title(markdown):
+    # `$` only stops at "\n", so a "\r"-only title line would run to the end
+    if "\r" in markdown:
+        markdown = markdown.replace("\r\n", "\n").replace("\r", "\n")
+    match = TITLE_PATTERN.search(markdown)
+    if not match:
+        raise ValueError("Title is missing.")
+
+    return match.group(1).strip()
+
+
+def apply_basepath(html_string, basepath, assets=None):
+    """Prefix root-relative href and src URLs with basepath.
+
+    With an assets mapping (see fingerprint.hash_assets), URLs of static
+    files are swapped for their fingerprinted names in the same pass.
+    """
+    if assets:
+        def rewrite(match):
+            path = assets.get(f"/{match.group(2)}", f"/{match.group(2)}")
+            return f'{match.group(1)}="{basepath}{path[1:]}'
+
+        return ROOT_REFERENCE.sub(rewrite, html_string)
+
+    if basepath == "/":
+        return html_string
+    html_string = html_string.replace("href=\"/", f"href=\"{basepath}")
+    return html_string.replace("src=\"/", f"src=\"{basepath}")
+
+
+class Template:
+    """A page template split once into literal text and `{{ Name }}` slots.
+
+    The basepath rewrite (and asset fingerprinting, when an assets mapping is
+    given) is applied to the literal text up front, so rendering a page only
+    joins the parts and rewrites the slot values. With a critical_css.CriticalCss
+    (for a template prepared by inline_critical_css), pages rendered without
+    their own `CriticalCss` slot get one computed from their `Content`.
+    """
+
+    def __init__(self, template, basepath="/", assets=None, critical=None):
+        self.basepath = basepath
+        self.assets = assets
+        self.critical = critical
+        # even indices hold literal text, odd indices hold slot names
+        self.parts = SLOT_PATTERN.split(template)
+        for i in range(0, len(self.parts), 2):
+            self.parts[i] = apply_basepath(self.parts[i], basepath, assets)
+        self.slot_names = frozenset(self.parts[1::2])
+
+    @property
+    def slots(self):
+        return self.slot_names
+
+    def render(self, **slots):
+        if self.critical is not None and not slots.get("CriticalCss"):
+            slots.update(self.critical.slots_for_html(slots.get("Content", "")))
+        page = []
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                page.append(part)
+            elif part in slots:
+                page.append(apply_basepath(slots[part], self.basepath, self.assets))
+            else:
+                page.append(f"{{{{ {part} }}}}")
+        return "".join(page)
+
+
+def render_markdown(markdown):
+    return markdown_to_html_node(markdown).to_html()
+
+
+def page_slots(meta, template):
+    """Return the optional slots the template asks for, built from page meta."""
+    slots = {}
+    if "Excerpt" in template.slots:
+        slots["Excerpt"] = escape_text(meta["excerpt"])
+    if "ReadingTime" in template.slots:
+        slots["ReadingTime"] = f"{meta['reading_time']} min read"
+    if "WordCount" in template.slots:
+        slots["WordCount"] = str(meta["words"])
+    if "Toc" in template.slots:
+        toc = toc_html_node(meta["outline"])
+        slots["Toc"] = toc.to_html() if toc else ""
+    return slots
+
+
+def render_page(markdown, template, basepath="/"):
+    if not isinstance(template, Template):
+        template = Template(template, basepath)
+
+    front_matter, lines = split_front_matter(markdown.split("\n"))
+    document = parse_document(lines)
+    title = front_matter.get("title") or extract_title(markdown)
+    return render_document(document, title, template)
+
+
+def render_document(document, title, template):
+    """Render a parsed document into a compiled Template."""
+    meta = {}
+    node = document_to_html_node(document, meta)
+    content = node.to_html()
+    slots = page_slots(meta, template)
+    if template.critical is not None:
+        # the tags come straight from the node tree, not from the HTML
+        slots.update(template.critical.slots(node, content))
+    return template.render(Title=escape_text(str(title)), Content=content, **slots)
+
+
+def render_many(markdowns, template, basepath="/"):
+    # compile the template once and reuse it for every page
+    if not isinstance(template, Template):
+        template = Template(template, basepath)
+
+    for markdown in markdowns:
+        yield render_page(markdown, template)
@@ -0,0 +1,87 @@
+import sys
+
+# Keep module-level imports to `sys` only: this entry point is spawned once per
+# editor preview, so everything else is imported on first use.
+
+USAGE = """usage: render_one.py [FILE | -]
+       render_one.py --serve SOCKET_PATH
+
+Render a single markdown file (or stdin when FILE is '-' or omitted) to HTML on
+stdout. With --serve, listen on a unix socket instead: each connection sends
+markdown, half-closes its write side and receives the rendered HTML, e.g.
+
+    socat - UNIX-CONNECT:SOCKET_PATH < page.md
+"""
+
+
+def render_one(markdown):
+    from blocks_markdown import lines_to_html_node
+    from front_matter import split_front_matter
+
+    _, lines = split_front_matter(markdown.split("\n"))
+    return lines_to_html_node(lines).to_html()
+
+
+def read_source(path):
+    if path == "-":
+        return sys.stdin.read()
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except Exception as e:
+        raise RuntimeError(f"Failed to read markdown file: {e}")
+
+
+def serve(socket_path):
+    import os
+    import socketserver
+
+    # import the renderer up front so the first preview is as fast as the rest
+    render_one("")
+
+    class RenderHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            markdown = self.rfile.read().decode("utf-8")
+            try:
+                html_string = render_one(markdown)
+            except Exception as e:
+                print(f"Failed to render: {e}", file=sys.stderr)
+                return
+            self.wfile.write(html_string.encode("utf-8"))
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    with socketserver.UnixStreamServer(socket_path, RenderHandler) as server:
+        print(f"Rendering on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+def main(argv):
+    if argv and argv[0] in ("-h", "--help"):
+        print(USAGE)
+        return 0
+
+    if argv and argv[0] == "--serve":
+        if len(argv) != 2:
+            print(USAGE, file=sys.stderr)
+            return 2
+        serve(argv[1])
+        return 0
+
+    if len(argv) > 1:
+        print(USAGE, file=sys.stderr)
+        return 2
+
+    markdown = read_source(argv[0] if argv else "-")
+    sys.stdout.write(render_one(markdown))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
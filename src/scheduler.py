@@ -0,0 +1,232 @@
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from generate_page import render_source, write_page_copies
+
+# rough peak memory per source byte while a page renders: the markdown, the
+# node tree and the final HTML string are all alive at once
+EXPANSION_FACTOR = 8
+
+SIZE_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+# in a worker process, the templates of the run it belongs to (see use_templates)
+_templates = []
+
+
+def parse_size(spec):
+    """Parse a byte count such as `4096`, `512M` or `4G`."""
+    spec = spec.strip().upper().removesuffix("B")
+    try:
+        if spec and spec[-1] in SIZE_UNITS:
+            return int(float(spec[:-1]) * SIZE_UNITS[spec[-1]])
+        return int(spec)
+    except ValueError:
+        raise ValueError(f"Invalid size '{spec}', expected e.g. 512M or 4G.")
+
+
+def use_templates(templates):
+    """Worker initializer: keep the run's templates for every page the worker renders.
+
+    Pages then name their template by index instead of sending a pickled
+    copy with each one, so state a template builds up as pages render (e.g.
+    the <style> elements its CriticalCss has chosen) is kept between them.
+    """
+    _templates[:] = templates
+
+
+def worker_template(template):
+    """Return template, or the worker's template at that index."""
+    return _templates[template] if isinstance(template, int) else template
+
+
+def template_pool(jobs, templates):
+    return ProcessPoolExecutor(
+        max_workers=jobs, initializer=use_templates, initargs=(templates,)
+    )
+
+
+def render_job(from_path, targets, formats=("html",)):
+    """Render one page for each (html path, template) of targets.
+
+    A template may be given by its index in the worker's templates (see
+    use_templates). The markdown is parsed once. Returns one result per
+    target: its paths, a hash of all its output, per-file hashes and the
+    page meta (see generate_page.write_page).
+    """
+    targets = [(dest_path, worker_template(template)) for dest_path, template in targets]
+    meta = {}
+    results = []
+    for (dest_path, _), written in zip(targets, write_page_copies(from_path, targets, formats, meta)):
+        page_hash = hashlib.sha256()
+        file_hashes = {}
+        for path, output in written.items():
+            data = output.encode("utf-8")
+            page_hash.update(data)
+            file_hashes[path] = hashlib.sha256(data).hexdigest()
+        results.append((from_path, dest_path, page_hash.hexdigest(), file_hashes, dict(meta)))
+    return results
+
+
+def render_pages(
+    pages, template, jobs=1, memory_budget=None, expansion=EXPANSION_FACTOR, formats=("html",),
+    errors=None,
+):
+    """Render (markdown path, html path) pairs, yielding results as pages finish.
+
+    A page given as (markdown path, html path, template) uses its own
+    template instead of `template`, so pages of several sites (e.g. one per
+    locale) can share one run. Pages with the same markdown path render in
+    one job that parses it once. Each page is written in every one of
+    formats (see document.FORMATS).
+
+    With jobs > 1 pages render in worker processes, largest first, and each
+    worker is given the templates once (see use_templates). A page is
+    only started while the estimated memory of every in-flight page (source
+    size times `expansion`) stays within memory_budget; a page too big for
+    the budget on its own still runs, but alone.
+
+    If an errors list is given, a page that fails is added to it (see
+    page_error) and skipped, instead of its exception ending the run. That
+    includes a page whose worker dies (e.g. killed for running out of
+    memory): the pool is restarted, and the pages that were in flight with
+    it are retried one at a time to find which one killed it.
+    """
+    # the (html path, template) targets of each markdown path
+    sources = {}
+    for page in pages:
+        target = (page[1], page[2] if len(page) > 2 else template)
+        sources.setdefault(page[0], []).append(target)
+
+    if jobs <= 1:
+        for from_path, targets in sources.items():
+            try:
+                results = render_job(from_path, targets, formats)
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors.extend(page_error(from_path, dest_path, e) for dest_path, _ in targets)
+                continue
+            yield from results
+        return
+
+    # every distinct template, by position in the workers' list
+    templates = []
+    indexes = {}
+    for targets in sources.values():
+        for _, page_template in targets:
+            if id(page_template) not in indexes:
+                indexes[id(page_template)] = len(templates)
+                templates.append(page_template)
+    queue = deque(sorted(
+        ((os.path.getsize(from_path) * expansion, from_path,
+          [(dest_path, indexes[id(page_template)]) for dest_path, page_template in targets])
+         for from_path, targets in sources.items()),
+        key=lambda job: (-job[0], job[1]),
+    ))
+
+    # pages in flight when a worker died, each retried alone
+    suspects = deque()
+    executor = template_pool(jobs, templates)
+    try:
+        in_flight = {}
+        in_flight_bytes = 0
+        while queue or suspects or in_flight:
+            if suspects and not in_flight:
+                job = suspects.popleft()
+                future = executor.submit(render_job, job[1], job[2], formats)
+                in_flight[future] = job
+                in_flight_bytes += job[0]
+            while not suspects and queue and len(in_flight) < jobs:
+                cost, from_path, targets = queue[0]
+                over_budget = (
+                    memory_budget is not None
+                    and in_flight_bytes + cost > memory_budget
+                )
+                if in_flight and over_budget:
+                    break
+                try:
+                    future = executor.submit(render_job, from_path, targets, formats)
+                except BrokenProcessPool:
+                    # a worker died since the last wait; the page stays queued
+                    # and the pages in flight show which one killed it
+                    if not in_flight:
+                        raise
+                    break
+                queue.popleft()
+                in_flight[future] = (cost, from_path, targets)
+                in_flight_bytes += cost
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            crashed = 0
+            if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                # a dead worker fails every page in flight, not just its own
+                done = wait(in_flight)[0]
+                crashed = sum(isinstance(future.exception(), BrokenProcessPool) for future in done)
+                executor.shutdown(wait=False)
+                if errors is not None:
+                    executor = template_pool(jobs, templates)
+
+            for future in done:
+                job = in_flight.pop(future)
+                cost, from_path, targets = job
+                in_flight_bytes -= cost
+                try:
+                    results = future.result()
+                except BrokenProcessPool as e:
+                    if errors is None:
+                        raise
+                    if crashed == 1:
+                        # it was alone, so it is the page that killed its worker
+                        errors.extend(
+                            page_error(from_path, dest_path, e) for dest_path, _ in targets
+                        )
+                    else:
+                        suspects.append(job)
+                    continue
+                except Exception as e:
+                    if errors is None:
+                        raise
+                    errors.extend(page_error(from_path, dest_path, e) for dest_path, _ in targets)
+                    continue
+                yield from results
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def page_error(from_path, dest_path, error):
+    return {"source": from_path, "output": dest_path, "error": f"{type(error).__name__}: {error}"}
+
+
+def render_source_job(name, markdown, template, formats=("html",)):
+    """Render one page from its markdown text; return (name, {format: output}, meta).
+
+    As in render_job, template may be an index in the worker's templates.
+    """
+    meta = {}
+    return name, render_source(markdown, worker_template(template), formats, meta), meta
+
+
+def render_sources(sources, template, jobs=1, formats=("html",)):
+    """Render (name, markdown) pairs that are not files, e.g. archive members.
+
+    Yields render_source_job results as pages finish. Sources are consumed
+    lazily: with jobs > 1 at most twice as many pages as workers are read
+    ahead, so a large archive is never held in memory at once.
+    """
+    if jobs <= 1:
+        for name, markdown in sources:
+            yield render_source_job(name, markdown, template, formats)
+        return
+
+    with template_pool(jobs, [template]) as executor:
+        in_flight = set()
+        for name, markdown in sources:
+            if len(in_flight) >= jobs * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            in_flight.add(executor.submit(render_source_job, name, markdown, 0, formats))
+        for future in as_completed(in_flight):
+            yield future.result()
@@ -0,0 +1,261 @@
+import argparse
+import mimetypes
+import os
+import posixpath
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+from htmlnode import escape_text
+from render import Template, render_page
+
+# Development server: pages are rendered from ./content when requested and
+# kept in a small LRU cache, so startup does no work however large the site
+# is. A watcher thread polls the mtimes of the template and of every cached
+# or served file only, drops stale entries and tells open pages to reload.
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}")'
+    ".onmessage = () => location.reload();</script>"
+)
+CACHE_SIZE = 256
+POLL_INTERVAL = 0.5
+# seconds between keep-alive comments on an idle live-reload stream
+KEEP_ALIVE = 15
+
+
+class LiveReload:
+    """A version counter that live-reload streams wait on."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until the version moves past `version` or timeout; return the version."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class DevSite:
+    def __init__(self, content_dir, static_dir, template_path, cache_size=CACHE_SIZE):
+        self.content_dir = os.path.abspath(content_dir)
+        self.static_dir = os.path.abspath(static_dir)
+        self.template_path = os.path.abspath(template_path)
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        # source path -> (mtime_ns, rendered page), least recently used first
+        self.pages = OrderedDict()
+        # static path -> mtime_ns of the version last served
+        self.served = {}
+        self.reload = LiveReload()
+        self.template_mtime = None
+        self.template = None
+        self.load_template()
+
+    def load_template(self):
+        self.template_mtime = mtime(self.template_path)
+        with open(self.template_path, "r") as f:
+            self.template = Template(f.read())
+
+    def resolve(self, url_path):
+        """Map a URL path to ("page", markdown path), ("static", file path) or None."""
+        path = posixpath.normpath(unquote(url_path)).lstrip("/")
+        if path in (".", ""):
+            path = ""
+        if path.split("/")[0] == "..":
+            return None
+
+        if path == "" or url_path.endswith("/"):
+            candidates = [os.path.join(path, "index.md")]
+        elif path.endswith(".html"):
+            candidates = [path[:-len(".html")] + ".md"]
+        else:
+            candidates = [os.path.join(path, "index.md"), path + ".md"]
+        for candidate in candidates:
+            source = os.path.join(self.content_dir, candidate)
+            if os.path.isfile(source):
+                return "page", source
+
+        static = os.path.join(self.static_dir, path)
+        if path and os.path.isfile(static):
+            return "static", static
+        return None
+
+    def render(self, source):
+        """Return the page for a markdown file, rendering it only on a cache miss."""
+        source_mtime = mtime(source)
+        with self.lock:
+            cached = self.pages.get(source)
+            if cached is not None and cached[0] == source_mtime:
+                self.pages.move_to_end(source)
+                return cached[1]
+            template = self.template
+
+        with open(source, "r") as f:
+            page = render_page(f.read(), template)
+
+        with self.lock:
+            self.pages[source] = (source_mtime, page)
+            self.pages.move_to_end(source)
+            while len(self.pages) > self.cache_size:
+                self.pages.popitem(last=False)
+        return page
+
+    def mark_served(self, path):
+        with self.lock:
+            self.served[path] = mtime(path)
+
+    def poll(self):
+        """Drop whatever changed since it was rendered or served; True if anything did."""
+        changed = False
+        if mtime(self.template_path) != self.template_mtime:
+            self.load_template()
+            with self.lock:
+                self.pages.clear()
+            changed = True
+
+        with self.lock:
+            pages = [(path, entry[0]) for path, entry in self.pages.items()]
+            served = list(self.served.items())
+        for path, seen in pages:
+            if mtime(path) != seen:
+                with self.lock:
+                    self.pages.pop(path, None)
+                changed = True
+        for path, seen in served:
+            if mtime(path) != seen:
+                with self.lock:
+                    del self.served[path]
+                changed = True
+
+        if changed:
+            self.reload.notify()
+        return changed
+
+    def watch(self, stop, interval=POLL_INTERVAL):
+        while not stop.wait(interval):
+            try:
+                self.poll()
+            except OSError as e:
+                print(f"Watcher failed: {e}")
+
+
+def mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def with_live_reload(page):
+    index = page.rfind("</body>")
+    if index == -1:
+        return page + LIVE_RELOAD_SCRIPT
+    return page[:index] + LIVE_RELOAD_SCRIPT + page[index:]
+
+
+def make_handler(site):
+    class DevHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url_path = urlsplit(self.path).path
+            if url_path == LIVE_RELOAD_PATH:
+                self.stream_reloads()
+                return
+
+            resolved = site.resolve(url_path)
+            if resolved is None:
+                self.send(HTTPStatus.NOT_FOUND, "text/plain", b"Not found")
+                return
+
+            kind, path = resolved
+            if kind == "static":
+                site.mark_served(path)
+                with open(path, "rb") as f:
+                    body = f.read()
+                content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                self.send(HTTPStatus.OK, content_type, body)
+                return
+
+            try:
+                page = site.render(path)
+                status = HTTPStatus.OK
+            except Exception as e:
+                # show the error, and reload once the file is fixed
+                site.mark_served(path)
+                page = f"<pre>Failed to render {escape_text(path)}: {escape_text(str(e))}</pre>"
+                status = HTTPStatus.INTERNAL_SERVER_ERROR
+            body = with_live_reload(page).encode("utf-8")
+            self.send(status, "text/html; charset=utf-8", body)
+
+        def send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream_reloads(self):
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            version = site.reload.version
+            try:
+                while True:
+                    current = site.reload.wait(version, KEEP_ALIVE)
+                    if current != version:
+                        self.wfile.write(b"data: reload\n\n")
+                        version = current
+                    else:
+                        self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            if not self.path.startswith(LIVE_RELOAD_PATH):
+                super().log_message(format, *args)
+
+    return DevHandler
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve ./content, rendering pages on request.")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--content", default="./content", help="markdown directory")
+    parser.add_argument("--static", default="./static", help="static asset directory")
+    parser.add_argument("--template", default="./template.html", help="page template")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    site = DevSite(args.content, args.static, args.template)
+
+    stop = threading.Event()
+    threading.Thread(target=site.watch, args=(stop,), daemon=True).start()
+
+    server = ThreadingHTTPServer(("", args.port), make_handler(site))
+    server.daemon_threads = True
+    print(f"Serving on http://localhost:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+from document import format_path
+from generate_page import collect_pages
+from scheduler import render_pages
+from taxonomy import listing_meta
+
+MANIFEST_NAME = "manifest.json"
+
+
+def parse_shard(spec):
+    """Parse an `i/N` shard spec (1-based) into (index, count)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected i/N.")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}', expected 1 <= i <= N.")
+    return index, count
+
+
+def partition_pages(pages, count):
+    """Split (source, output, size) pages into `count` shards of similar byte size.
+
+    Pages are placed largest first onto the lightest shard, with ties broken by
+    path, so every machine computes the same partition from the same content.
+    """
+    shards = [[] for _ in range(count)]
+    loads = [0] * count
+    for page in sorted(pages, key=lambda page: (-page[2], page[0])):
+        lightest = min(range(count), key=lambda i: (loads[i], i))
+        shards[lightest].append(page)
+        loads[lightest] += page[2]
+    return shards
+
+
+def build_shard(content_dir, template, dest_dir, index, count, **options):
+    """Render shard `index` of `count` into dest_dir and write its manifest.
+
+    Extra keyword options are passed on to scheduler.render_pages.
+    """
+    content_dir = os.path.abspath(content_dir)
+    dest_dir = os.path.abspath(dest_dir)
+
+    pages = []
+    for content_path, html_path in collect_pages(content_dir, dest_dir):
+        pages.append((
+            os.path.relpath(content_path, content_dir),
+            os.path.relpath(html_path, dest_dir),
+            os.path.getsize(content_path),
+        ))
+
+    if os.path.exists(dest_dir):
+        shutil.rmtree(dest_dir)
+    os.makedirs(dest_dir)
+
+    shard = partition_pages(pages, count)[index - 1]
+    sizes = {source: size for source, _, size in shard}
+    jobs = [
+        (os.path.join(content_dir, source), os.path.join(dest_dir, output))
+        for source, output, _ in shard
+    ]
+
+    entries = []
+    for from_path, dest_path, sha256, file_hashes, meta in render_pages(jobs, template, **options):
+        source = os.path.relpath(from_path, content_dir)
+        entries.append({
+            "source": source,
+            "output": os.path.relpath(dest_path, dest_dir),
+            "bytes": sizes[source],
+            "sha256": sha256,
+            "files": {
+                os.path.relpath(path, dest_dir): digest
+                for path, digest in file_hashes.items()
+            },
+            "meta": listing_meta(meta),
+        })
+    entries.sort(key=lambda entry: entry["output"])
+
+    formats = list(options.get("formats", ("html",)))
+    manifest = {"shard": f"{index}/{count}", "formats": formats, "pages": entries}
+    write_manifest(os.path.join(dest_dir, MANIFEST_NAME), manifest)
+    return manifest
+
+
+def merge_shards(shard_dirs, dest_dir):
+    """Copy every shard's pages into dest_dir and return the combined manifest.
+
+    The shard directories must hold exactly shards 1..N of one N-way build;
+    otherwise ValueError is raised before anything is copied.
+    """
+    dest_dir = os.path.abspath(dest_dir)
+    manifests = []
+    for shard_dir in shard_dirs:
+        shard_dir = os.path.abspath(shard_dir)
+        manifests.append((shard_dir, read_manifest(os.path.join(shard_dir, MANIFEST_NAME))))
+    check_shards(manifests)
+
+    pages = {}
+    for shard_dir, manifest in manifests:
+        for entry in manifest["pages"]:
+            if entry["output"] in pages:
+                raise ValueError(f"Page {entry['output']} is in more than one shard.")
+            pages[entry["output"]] = entry
+
+            dest_path = os.path.join(dest_dir, entry["output"])
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            for output_format in manifest.get("formats", ["html"]):
+                shutil.copyfile(
+                    format_path(os.path.join(shard_dir, entry["output"]), output_format),
+                    format_path(dest_path, output_format),
+                )
+
+    # site-wide stages that need every page belong here, after the merge
+    return {"pages": [pages[output] for output in sorted(pages)]}
+
+
+def check_shards(manifests):
+    """Raise ValueError unless the (shard dir, manifest) pairs are shards 1..N of one build."""
+    indices = {}
+    counts = set()
+    for shard_dir, manifest in manifests:
+        index, count = parse_shard(str(manifest.get("shard")))
+        if index in indices:
+            raise ValueError(f"{shard_dir} and {indices[index]} are both shard {index}/{count}.")
+        indices[index] = shard_dir
+        counts.add(count)
+    if len(counts) > 1:
+        raise ValueError(f"Shards come from builds split {sorted(counts)} ways.")
+    if counts:
+        missing = sorted(set(range(1, counts.pop() + 1)) - indices.keys())
+        if missing:
+            raise ValueError(f"Missing shards: {', '.join(map(str, missing))}.")
+
+
+def read_manifest(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        raise RuntimeError(f"Failed to read manifest: {e}")
+
+
+def write_manifest(path, manifest):
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
@@ -1,7 +1,10 @@
+import hashlib
 import os
 import shutil
+from archive import iter_files
 
-def src_to_dest(src, dest):
+def src_to_dest(src, dest, clean=True):
+    # with clean=False, files already in dest are kept (resumed builds)
     # ensure src exists
     src = os.path.abspath(src)
     print(f"Source dir: {src}")
@@ -15,7 +18,7 @@ def src_to_dest(src, dest):
         print(f"Creating {dest} directory...")
         os.mkdir(dest)
         print(f"Directory '{dest}' created.")
-    else:
+    elif clean:
         # delete all contents of dest, then create a fresh dest
         print(f"Directory '{dest}' exists.")
         try:
@@ -40,4 +43,20 @@ def src_to_dest(src, dest):
         shutil.copy(os.path.join(src, file), dest)
     
     for d in dirs:
-        src_to_dest(os.path.join(src, d), os.path.join(dest, d))
\ No newline at end of file
+        src_to_dest(os.path.join(src, d), os.path.join(dest, d), clean)
+
+def src_to_archive(src, writer):
+    """Copy every file of src, a directory or an archive, into an archive writer.
+
+    Archive members are passed straight through as they are read, and
+    already-compressed media are stored rather than compressed again (see
+    archive.STORED_SUFFIXES). Returns {name: sha256} of the copied files.
+    """
+    if not os.path.exists(src):
+        raise ValueError(f"Source - {src} - does not exist.")
+
+    digests = {}
+    for name, data in iter_files(src):
+        writer.add(name, data)
+        digests[name] = hashlib.sha256(data).hexdigest()
+    return digests
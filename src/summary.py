@@ -0,0 +1,62 @@
+import math
+
+# characters of text kept for an excerpt when the page has no `<!-- more -->`
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+
+class Summary:
+    """Excerpt and word count of a page, fed block by block as it is parsed.
+
+    If the page has a `<!-- more -->` marker (`has_marker`), paragraph text
+    is kept until it, which makes everything before it the excerpt. Without a
+    marker only the first `length` characters are kept, and the excerpt is
+    cut there at a word boundary.
+    """
+
+    def __init__(self, length=EXCERPT_LENGTH, has_marker=False):
+        self.length = length
+        self.has_marker = has_marker
+        self.words = 0
+        self.parts = []
+        # characters in parts, counting a space between paragraphs
+        self.kept = 0
+        self.marked = False
+
+    def add_paragraph(self, text):
+        self.add_text(text)
+        if self.marked or (not self.has_marker and self.kept > self.length):
+            return
+        self.parts.append(text)
+        self.kept += len(text) + 1
+
+    def add_text(self, text):
+        self.words += len(text.split())
+
+    def mark(self):
+        self.marked = True
+
+    @property
+    def excerpt(self):
+        text = " ".join(" ".join(self.parts).split())
+        if self.marked or len(text) <= self.length:
+            return text
+        cut = text[:self.length + 1]
+        cut = cut.rsplit(" ", 1)[0] if " " in cut else cut[:self.length]
+        return cut.rstrip(",;:.") + "…"
+
+    @property
+    def reading_time(self):
+        """Minutes to read the page, at least 1."""
+        return max(1, math.ceil(self.words / WORDS_PER_MINUTE))
+
+
+def inline_text(text_nodes):
+    """Return the plain text of parsed inline TextNodes."""
+    text = []
+    for text_node in text_nodes:
+        if text_node.children:
+            text.append(inline_text(text_node.children))
+        else:
+            text.append(text_node.text)
+    return "".join(text)
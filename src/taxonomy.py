@@ -0,0 +1,246 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+from headings import slugify
+from htmlnode import LeafNode, ParentNode, escape_text
+
+# front matter fields that group pages, and the site directory of each
+TAXONOMIES = ("tags", "categories")
+TITLES = {"tags": "Tagged: {}", "categories": "Category: {}"}
+CLOUD_TITLES = {"tags": "Tags", "categories": "Categories"}
+PAGE_SIZE = 10
+CLOUD_LEVELS = 5
+# signatures of the taxonomy pages of the last build, and a copy of each page
+STATE_PATH = "./.boots-cache/taxonomies.json"
+PAGES_DIR = "./.boots-cache/taxonomies"
+
+
+def listing_meta(meta):
+    """The part of a page's meta that taxonomy pages need (kept in shard manifests)."""
+    listing = {
+        "title": meta["title"],
+        "excerpt": meta.get("excerpt", ""),
+        "date": str(meta.get("date", "")),
+    }
+    for taxonomy in TAXONOMIES:
+        listing[taxonomy] = term_names(meta.get(taxonomy))
+    return listing
+
+
+def term_names(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def page_url(rel_path):
+    """`blog/tom/index.html` -> `/blog/tom/`."""
+    url = "/" + rel_path.replace(os.sep, "/")
+    if url.endswith("/index.html"):
+        url = url[:-len("index.html")]
+    return url
+
+
+class TaxonomyIndex:
+    """Inverted index of taxonomy term -> pages, filled as pages finish rendering.
+
+    Terms are grouped by slug, so `Tolkien` and `tolkien` share a page; the
+    first spelling seen names it.
+    """
+
+    def __init__(self, taxonomies=TAXONOMIES):
+        # taxonomy -> slug -> {"name": ..., "pages": {url: page}}
+        self.terms = {taxonomy: {} for taxonomy in taxonomies}
+
+    def add(self, rel_path, meta):
+        page = {
+            "url": page_url(rel_path),
+            "title": meta["title"],
+            "excerpt": meta.get("excerpt", ""),
+            "date": str(meta.get("date", "")),
+        }
+        for taxonomy, terms in self.terms.items():
+            for name in term_names(meta.get(taxonomy)):
+                term = terms.setdefault(slugify(name), {"name": name, "pages": {}})
+                term["pages"][page["url"]] = page
+
+    def pages(self, page_size=PAGE_SIZE):
+        """Yield (rel path, title, listing) for every listing page and cloud.
+
+        A listing is plain data (see listing_html); it is all a page's output
+        depends on besides the template. Pages within a term are newest first
+        by their `date` field, then by title, so the output does not depend
+        on the order pages finished rendering in.
+        """
+        for taxonomy, terms in self.terms.items():
+            if not terms:
+                continue
+            for slug in sorted(terms):
+                term = terms[slug]
+                entries = sorted(term["pages"].values(), key=lambda page: (page["title"], page["url"]))
+                entries.sort(key=lambda page: page["date"], reverse=True)
+                title = TITLES.get(taxonomy, "{}").format(term["name"])
+                count = max(1, math.ceil(len(entries) / page_size))
+                for number in range(1, count + 1):
+                    yield listing_path(taxonomy, slug, number), title, {
+                        "taxonomy": taxonomy,
+                        "slug": slug,
+                        "number": number,
+                        "count": count,
+                        "entries": entries[(number - 1) * page_size:number * page_size],
+                    }
+
+            cloud = [
+                (slug, terms[slug]["name"], len(terms[slug]["pages"]))
+                for slug in sorted(terms, key=lambda slug: (terms[slug]["name"].lower(), slug))
+            ]
+            title = CLOUD_TITLES.get(taxonomy, taxonomy.title())
+            yield f"{taxonomy}/index.html", title, {"taxonomy": taxonomy, "cloud": cloud}
+
+
+def listing_path(taxonomy, slug, number):
+    if number == 1:
+        return f"{taxonomy}/{slug}/index.html"
+    return f"{taxonomy}/{slug}/page/{number}/index.html"
+
+
+def listing_html(title, listing):
+    if "cloud" in listing:
+        return cloud_html(title, listing["taxonomy"], listing["cloud"])
+
+    items = []
+    for entry in listing["entries"]:
+        children = [LeafNode(tag="a", value=escape_text(entry["title"]), props={"href": entry["url"]})]
+        if entry["excerpt"]:
+            children.append(LeafNode(tag="p", value=escape_text(entry["excerpt"])))
+        items.append(ParentNode(tag="li", children=children))
+    children = [LeafNode(tag="h1", value=escape_text(title))]
+    if items:
+        children.append(ParentNode(tag="ul", children=items))
+
+    taxonomy, slug, number = listing["taxonomy"], listing["slug"], listing["number"]
+    links = []
+    if number > 1:
+        href = "/" + listing_path(taxonomy, slug, number - 1)[:-len("index.html")]
+        links.append(LeafNode(tag="a", value="← Newer", props={"href": href, "rel": "prev"}))
+    if number < listing["count"]:
+        href = "/" + listing_path(taxonomy, slug, number + 1)[:-len("index.html")]
+        links.append(LeafNode(tag="a", value="Older →", props={"href": href, "rel": "next"}))
+    if links:
+        children.append(ParentNode(tag="nav", children=links, props={"class": "pagination"}))
+    return ParentNode(tag="div", children=children).to_html()
+
+
+def cloud_html(title, taxonomy, cloud):
+    """A list of (slug, name, count) terms, weighted into CLOUD_LEVELS classes by count."""
+    most = max(count for _, _, count in cloud)
+    items = []
+    for slug, name, count in cloud:
+        level = 1
+        if most > 1:
+            level += round((CLOUD_LEVELS - 1) * math.log(count) / math.log(most))
+        link = LeafNode(
+            tag="a",
+            value=f"{escape_text(name)} ({count})",
+            props={"href": f"/{taxonomy}/{slug}/", "class": f"tag-cloud-{level}"},
+        )
+        items.append(ParentNode(tag="li", children=[link]))
+    return ParentNode(tag="div", children=[
+        LeafNode(tag="h1", value=escape_text(title)),
+        ParentNode(tag="ul", children=items, props={"class": "tag-cloud"}),
+    ]).to_html()
+
+
+def template_key(template):
+    """A digest of everything about a compiled Template that affects its output."""
+    key = hashlib.sha256("\0".join(template.parts).encode("utf-8"))
+    key.update(template.basepath.encode("utf-8"))
+    key.update(json.dumps(template.assets, sort_keys=True).encode("utf-8"))
+    if template.critical is not None:
+        key.update(json.dumps(template.critical.rules).encode("utf-8"))
+    return key.hexdigest()
+
+
+def write_taxonomies(
+    index, template, dest_dir, state_path=STATE_PATH, pages_dir=PAGES_DIR, writer=None
+):
+    """Write the index's listing pages and clouds into dest_dir, or to an
+    archive writer (see archive.open_writer) when one is given.
+
+    Only pages whose listing changed are rendered: one with the same title,
+    entries and template as in the last build is copied from that build's
+    copy in pages_dir instead. Returns ({rel path: sha256}, number rendered).
+    """
+    dest_dir = os.path.abspath(dest_dir)
+    previous = load_state(state_path)
+    key = template_key(template)
+    # slots the listing pages have no value for are left empty
+    empty = {name: "" for name in template.slots}
+
+    state = {}
+    outputs = {}
+    rendered = 0
+    for rel_path, title, listing in index.pages():
+        signature = hashlib.sha256(
+            json.dumps([key, title, listing], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        dest_path = os.path.join(dest_dir, rel_path)
+        copy_path = os.path.join(pages_dir, rel_path)
+        if writer is None:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+        entry = previous.get(rel_path)
+        if entry and entry["signature"] == signature and os.path.isfile(copy_path):
+            if writer is None:
+                shutil.copyfile(copy_path, dest_path)
+            else:
+                with open(copy_path, "rb") as f:
+                    writer.add(rel_path, f.read())
+            digest = entry["sha256"]
+        else:
+            content = listing_html(title, listing)
+            page = template.render(**{**empty, "Title": escape_text(title), "Content": content})
+            data = page.encode("utf-8")
+            os.makedirs(os.path.dirname(copy_path), exist_ok=True)
+            with open(copy_path, "wb") as f:
+                f.write(data)
+            if writer is None:
+                with open(dest_path, "wb") as f:
+                    f.write(data)
+            else:
+                writer.add(rel_path, data)
+            digest = hashlib.sha256(data).hexdigest()
+            rendered += 1
+
+        state[rel_path] = {"signature": signature, "sha256": digest}
+        outputs[rel_path] = digest
+
+    # copies of pages for terms that no longer exist
+    for rel_path in previous.keys() - state.keys():
+        try:
+            os.remove(os.path.join(pages_dir, rel_path))
+        except FileNotFoundError:
+            pass
+
+    save_state(state, state_path)
+    return outputs, rendered
+
+
+def load_state(state_path):
+    try:
+        with open(state_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, state_path):
+    directory = os.path.dirname(state_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(state_path, "w") as f:
+        json.dump(state, f)
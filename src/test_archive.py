@@ -0,0 +1,80 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import unittest.mock
+import zipfile
+from archive import iter_files, iter_members, member_name, open_writer
+from render import Template
+from scheduler import render_sources
+from src_to_dest import src_to_archive
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_member_name(self):
+        self.assertEqual(member_name("./blog/post.md"), "blog/post.md")
+        self.assertEqual(member_name("/index.md"), "index.md")
+        self.assertIsNone(member_name("../etc/passwd"))
+        self.assertIsNone(member_name("./"))
+
+    def test_tar_members_are_streamed(self):
+        with tarfile.open(self.path("content.tar.gz"), "w:gz") as archive:
+            directory = tarfile.TarInfo("blog")
+            directory.type = tarfile.DIRTYPE
+            archive.addfile(directory)
+            for name, data in (("./index.md", b"# Home"), ("blog/post.md", b"# Post")):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        self.assertEqual(
+            list(iter_members(self.path("content.tar.gz"))),
+            [("index.md", b"# Home"), ("blog/post.md", b"# Post")],
+        )
+
+    def test_zip_output_stores_compressed_media(self):
+        with open_writer(self.path("site.zip")) as writer:
+            writer.add("index.html", b"<p>hi</p>" * 100)
+            writer.add("images/a.png", b"png" * 100)
+        with zipfile.ZipFile(self.path("site.zip")) as archive:
+            self.assertEqual(archive.getinfo("index.html").compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(archive.getinfo("images/a.png").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(archive.read("images/a.png"), b"png" * 100)
+
+    def test_archive_to_archive_copy(self):
+        with zipfile.ZipFile(self.path("static.zip"), "w") as archive:
+            archive.writestr("index.css", "body {}")
+            archive.writestr("images/", "")
+            archive.writestr("images/a.png", b"png")
+        with open_writer(self.path("site.tar")) as writer:
+            digests = src_to_archive(self.path("static.zip"), writer)
+        self.assertEqual(sorted(digests), ["images/a.png", "index.css"])
+        self.assertEqual(
+            dict(iter_files(self.path("site.tar"))),
+            {"index.css": b"body {}", "images/a.png": b"png"},
+        )
+
+    def test_directory_writer_and_source(self):
+        with open_writer(self.path("docs")) as writer:
+            writer.add("blog/post.html", b"post")
+        self.assertEqual(list(iter_files(self.path("docs"))), [("blog/post.html", b"post")])
+
+    def test_render_sources(self):
+        sources = [(f"page{i}.md", f"---\ntags: [t]\n---\n# Page {i}") for i in range(5)]
+        for jobs in (1, 2):
+            results = sorted(render_sources(iter(sources), Template("{{ Title }}"), jobs, ("html", "text")))
+            self.assertEqual(
+                [(name, outputs["html"], meta["tags"]) for name, outputs, meta in results],
+                [(f"page{i}.md", f"Page {i}", ["t"]) for i in range(5)],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
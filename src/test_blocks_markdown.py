@@ -1,11 +1,18 @@
+import gc
+import os
+import time
 import unittest
 from blocks_markdown import (
     markdown_to_blocks,
     BlockType,
     block_to_block_type,
     markdown_to_html_node,
+    MAX_DEPTH,
 )
 
+# wall-clock checks are too noisy on a loaded machine for the default run
+RUN_PERFORMANCE = os.environ.get("BOOTS_PERF") == "1"
+
 
 class TestBlockMarkdown(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -86,7 +93,9 @@ the **same** even with inline stuff
         node = markdown_to_html_node(md)
         html = node.to_html()
         self.assertEqual(
-            html, "<div><h1>Title</h1><h2>Subtitle</h2><h4>Section</h4></div>"
+            html,
+            '<div><h1 id="title">Title</h1><h2 id="subtitle">Subtitle</h2>'
+            '<h4 id="section">Section</h4></div>',
         )
 
     def test_quote_block(self):
@@ -171,9 +180,9 @@ Final paragraph with [link](https://example.com) and ![image](image.jpg).
         html = node.to_html()
         expected = (
             "<div>"
-            "<h1>Main Title</h1>"
+            '<h1 id="main-title">Main Title</h1>'
             "<p>This is a paragraph with <b>bold</b> and <i>italic</i> text.</p>"
-            "<h2>Subsection</h2>"
+            '<h2 id="subsection">Subsection</h2>'
             "<blockquote>This is a quote block\nwith multiple lines</blockquote>"
             "<ul><li>List item one</li><li>List item two with <code>code</code></li><li>List item three</li></ul>"
             "<ol><li>Ordered item</li><li>Another ordered item</li></ol>"
@@ -199,9 +208,7 @@ Final paragraph with [link](https://example.com) and ![image](image.jpg).
         md = "This has **bold with _italic inside_** and `code text`"
         node = markdown_to_html_node(md)
         html = node.to_html()
-        # Note: This tests how your inline parser handles nested formatting
-        # The current parser may not handle nested formatting, so we test what it actually does
-        expected = "<div><p>This has <b>bold with _italic inside_</b> and <code>code text</code></p></div>"
+        expected = "<div><p>This has <b>bold with <i>italic inside</i></b> and <code>code text</code></p></div>"
         self.assertEqual(html, expected)
 
     def test_heading_levels(self):
@@ -218,7 +225,10 @@ Final paragraph with [link](https://example.com) and ![image](image.jpg).
 ###### H6"""
         node = markdown_to_html_node(md)
         html = node.to_html()
-        expected = "<div><h1>H1</h1><h2>H2</h2><h3>H3</h3><h4>H4</h4><h5>H5</h5><h6>H6</h6></div>"
+        expected = (
+            '<div><h1 id="h1">H1</h1><h2 id="h2">H2</h2><h3 id="h3">H3</h3>'
+            '<h4 id="h4">H4</h4><h5 id="h5">H5</h5><h6 id="h6">H6</h6></div>'
+        )
         self.assertEqual(html, expected)
 
     def test_code_block_with_language(self):
@@ -230,7 +240,12 @@ def greet(name):
 """
         node = markdown_to_html_node(md)
         html = node.to_html()
-        expected = "<div><pre><code>python\ndef greet(name):\n    return f\"Hello, {name}!\"\n</code></pre></div>"
+        expected = (
+            '<div><pre><code class="language-python">'
+            '<span class="hl-keyword">def</span> greet(name):\n'
+            '    <span class="hl-keyword">return</span> <span class="hl-string">f"Hello, {name}!"</span>\n'
+            "</code></pre></div>"
+        )
         self.assertEqual(html, expected)
 
     def test_multiline_quote_with_varying_spaces(self):
@@ -279,3 +294,249 @@ def greet(name):
             "</ol></div>"
         )
         self.assertEqual(html, expected)
+
+
+class NestedBlocks(unittest.TestCase):
+    def test_nested_unordered_list(self):
+        md = "- a\n  - b\n  - c\n- d"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>a<ul><li>b</li><li>c</li></ul></li><li>d</li></ul></div>",
+        )
+
+    def test_nested_ordered_list_in_unordered(self):
+        md = "- fruits\n    1. apple\n    2. pear\n- vegetables"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>fruits<ol><li>apple</li><li>pear</li></ol></li><li>vegetables</li></ul></div>",
+        )
+
+    def test_loose_list_with_multiple_paragraphs(self):
+        md = "- first\n\n  still first\n- second"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li><p>first</p><p>still first</p></li><li><p>second</p></li></ul></div>",
+        )
+
+    def test_code_block_in_list_item(self):
+        md = "- run:\n\n  ```\n  make\n\n  make test\n  ```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li><p>run:</p><pre><code>make\n\nmake test\n</code></pre></li></ul></div>",
+        )
+
+    def test_quote_is_inline_parsed(self):
+        md = "> a **bold** claim"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><blockquote>a <b>bold</b> claim</blockquote></div>",
+        )
+
+    def test_quote_with_blocks(self):
+        md = "> intro\n>\n> - one\n> - two\n>\n> > nested"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><blockquote><p>intro</p><ul><li>one</li><li>two</li></ul>"
+            "<blockquote>nested</blockquote></blockquote></div>",
+        )
+
+    def test_ordered_list_start(self):
+        md = "3. three\n4. four"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><ol start="3"><li>three</li><li>four</li></ol></div>',
+        )
+
+    def test_lazy_continuation(self):
+        md = "- item\ncontinues here\n\n> quote\ncontinues too"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>item continues here</li></ul>"
+            "<blockquote>quote\ncontinues too</blockquote></div>",
+        )
+
+    def test_list_interrupts_paragraph(self):
+        md = "Shopping:\n- milk\n- eggs"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>Shopping:</p><ul><li>milk</li><li>eggs</li></ul></div>",
+        )
+
+    def test_deep_quotes_are_capped(self):
+        html = markdown_to_html_node(">" * 1000 + " x").to_html()
+        self.assertEqual(html.count("<blockquote>"), MAX_DEPTH)
+        self.assertIn(">" * (1000 - MAX_DEPTH) + " x", html.replace("&gt;", ">"))
+
+    def test_deep_lists_are_capped(self):
+        md = "\n".join("  " * i + "- item" for i in range(300))
+        html = markdown_to_html_node(md).to_html()
+        # each level is a list and a list item
+        self.assertEqual(html.count("<ul>"), MAX_DEPTH // 2)
+        self.assertEqual(html.count("item"), 300)
+
+
+class HtmlEscaping(unittest.TestCase):
+    def test_paragraph_text_is_escaped(self):
+        md = "Use <div> & **<b>** for x > y"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>Use &lt;div&gt; &amp; <b>&lt;b&gt;</b> for x &gt; y</p></div>",
+        )
+
+    def test_inline_code_is_escaped(self):
+        self.assertEqual(
+            markdown_to_html_node("`a<b>&c`").to_html(),
+            "<div><p><code>a&lt;b&gt;&amp;c</code></p></div>",
+        )
+
+    def test_heading_is_escaped(self):
+        self.assertEqual(
+            markdown_to_html_node("# Tom & Jerry <3").to_html(),
+            '<div><h1 id="tom--jerry-3">Tom &amp; Jerry &lt;3</h1></div>',
+        )
+
+    def test_code_block_is_escaped(self):
+        md = "```\nif (a < b && c) {}\n```\n\n```unknown\n<x>\n```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>if (a &lt; b &amp;&amp; c) {}\n</code></pre>"
+            '<pre><code class="language-unknown">&lt;x&gt;\n</code></pre></div>',
+        )
+
+    def test_link_attributes_are_escaped(self):
+        self.assertEqual(
+            markdown_to_html_node('[a](/search?q="x"&y=1)').to_html(),
+            '<div><p><a href="/search?q=&quot;x&quot;&amp;y=1">a</a></p></div>',
+        )
+
+
+class ReferenceLinks(unittest.TestCase):
+    def test_definitions_are_collected_and_removed(self):
+        md = """See [the docs][docs] and [Home].
+
+[docs]: https://example.com/docs "Documentation"
+[home]: </index.html>
+[docs]: /ignored"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p>See <a href="https://example.com/docs" title="Documentation">the docs</a> and '
+            '<a href="/index.html">Home</a>.</p></div>',
+        )
+
+    def test_inline_titles_and_angle_destinations(self):
+        md = '[a](/a "A & \\"b\\"") [b](</my page> \'B\') ![c](/c.png (C)) [d](<e)f>)'
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p><a href="/a" title="A &amp; &quot;b&quot;">a</a> '
+            '<a href="/my page" title="B">b</a> '
+            '<img src="/c.png" alt="c" title="C"></img> '
+            '<a href="e)f">d</a></p></div>',
+        )
+
+    def test_definitions_inside_containers(self):
+        md = "> [a]: /a\n\n- [a] in a list"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><blockquote></blockquote><ul><li><a href="/a">a</a> in a list</li></ul></div>',
+        )
+
+    def test_definition_cannot_interrupt_paragraph(self):
+        md = "text\n[a]: /a\n\n[a]"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>text [a]: /a</p><p>[a]</p></div>",
+        )
+
+
+class Tables(unittest.TestCase):
+    def test_table_with_alignment(self):
+        md = "Intro\n| Name | Size |  |\n|:-----|-----:|:-:|\n| `a` | 1 \\| 2 | **x** |\n| b\n\nafter"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>Intro</p><table><thead><tr>"
+            '<th align="left">Name</th><th align="right">Size</th><th align="center"></th>'
+            "</tr></thead><tbody><tr>"
+            '<td align="left"><code>a</code></td><td align="right">1 | 2</td>'
+            '<td align="center"><b>x</b></td>'
+            '</tr><tr><td align="left">b</td><td align="right"></td><td align="center"></td>'
+            "</tr></tbody></table><p>after</p></div>",
+        )
+
+    def test_header_only_table_without_outer_pipes(self):
+        self.assertEqual(
+            markdown_to_html_node("a | b\n--|--").to_html(),
+            "<div><table><thead><tr><th>a</th><th>b</th></tr></thead></table></div>",
+        )
+
+    def test_mismatched_delimiter_row_is_paragraph(self):
+        self.assertEqual(
+            markdown_to_html_node("|a|b|\n|-|").to_html(),
+            "<div><p>|a|b| |-|</p></div>",
+        )
+
+    def test_table_ends_with_its_container(self):
+        md = "> | h |\n> |---|\n> | 1 |\n| 2 |"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><blockquote><table><thead><tr><th>h</th></tr></thead>"
+            "<tbody><tr><td>1</td></tr></tbody></table></blockquote><p>| 2 |</p></div>",
+        )
+
+
+class TaskLists(unittest.TestCase):
+    def test_task_items(self):
+        md = "- [ ] todo\n- [x] **done**\n- [y] not a task"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><ul><li class="task-list-item"><input type="checkbox" disabled=""></input> todo</li>'
+            '<li class="task-list-item"><input type="checkbox" disabled="" checked=""></input> '
+            "<b>done</b></li><li>[y] not a task</li></ul></div>",
+        )
+
+    def test_marker_without_content_is_not_a_task(self):
+        self.assertEqual(
+            markdown_to_html_node("- [ ]\n- [x]  \n- [ ]x").to_html(),
+            "<div><ul><li>[ ]</li><li>[x]</li><li>[ ]x</li></ul></div>",
+        )
+
+    def test_marker_only_counts_at_item_start(self):
+        md = "1. text\n\n   [x] later"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ol><li><p>text</p><p>[x] later</p></li></ol></div>",
+        )
+
+
+class TablePerformance(unittest.TestCase):
+    def make_table(self, rows):
+        lines = ["| Feature | Linux | macOS | Windows | Notes |", "|:--|:-:|:-:|:-:|--:|"]
+        for i in range(rows):
+            lines.append(f"| `feature_{i}` | yes | **no** | [docs](/f/{i}) | {i} \\| x |")
+        return "\n".join(lines)
+
+    def time_render(self, markdown):
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            markdown_to_html_node(markdown).to_html()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    @unittest.skipUnless(RUN_PERFORMANCE, "set BOOTS_PERF=1 to check timing")
+    def test_large_table_renders_in_linear_time(self):
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            small = self.time_render(self.make_table(500))
+            large = self.time_render(self.make_table(4000))
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        # 8x the rows: linear is ~8x, quadratic would be ~64x
+        self.assertLess(large, small * 24)
+
+    def test_large_table_output(self):
+        html = markdown_to_html_node(self.make_table(5000)).to_html()
+        self.assertEqual(html.count("<tr>"), 5001)
+        self.assertIn('<td align="center"><a href="/f/4999">docs</a></td>', html)
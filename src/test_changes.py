@@ -0,0 +1,47 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from changes import diff_outputs, load_outputs, save_outputs, static_outputs
+from fingerprint import HashCache
+
+
+class TestChanges(unittest.TestCase):
+    def test_diff_outputs(self):
+        previous = {"index.html": "a", "old.html": "b", "index.css": "c"}
+        current = {"index.html": "a2", "new.html": "d", "index.css": "c"}
+        self.assertEqual(
+            diff_outputs(previous, current),
+            {
+                "added": [{"path": "new.html", "sha256": "d"}],
+                "modified": [{"path": "index.html", "sha256": "a2"}],
+                "deleted": [{"path": "old.html", "sha256": "b"}],
+            },
+        )
+
+    def test_state_round_trip_is_per_destination(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "cache", "outputs.json")
+            self.assertEqual(load_outputs("docs", state), {})
+            save_outputs("docs", {"index.html": "a"}, state)
+            self.assertEqual(load_outputs("docs", state), {"index.html": "a"})
+            self.assertEqual(load_outputs("public", state), {})
+
+    def test_static_outputs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static = os.path.join(tmp, "static")
+            os.makedirs(os.path.join(static, "images"))
+            with open(os.path.join(static, "images", "a.png"), "wb") as f:
+                f.write(b"png")
+            cache = HashCache(os.path.join(tmp, "hashes.json"))
+            digest = hashlib.sha256(b"png").hexdigest()
+
+            self.assertEqual(static_outputs(static, cache), {"images/a.png": digest})
+            assets = {"/images/a.png": "/images/a.123.png"}
+            self.assertEqual(
+                static_outputs(static, cache, assets), {"images/a.123.png": digest}
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
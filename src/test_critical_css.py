@@ -0,0 +1,156 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+from blocks_markdown import markdown_to_html_node
+from critical_css import (
+    CriticalCss,
+    inline_critical_css,
+    node_names,
+    preload_links,
+    rebase_urls,
+    selector_matches,
+)
+from render import Template, render_page
+from scheduler import render_pages
+
+STYLESHEET = """
+/* base */
+body { margin: 0; }
+h1, h2 { color: red; }
+li.task-list-item { list-style: none; }
+table th, .unused { font-weight: bold; }
+a:hover { color: blue; }
+@media (max-width: 600px) {
+  h2 { font-size: 1em; }
+  pre { overflow: auto; }
+}
+@font-face { font-family: X; src: url(/x.woff2); }
+"""
+TEMPLATE = (
+    '<html><head><title>{{ Title }}</title>'
+    '<link href="/index.css" rel="stylesheet" /></head>'
+    "<body><article>{{ Content }}</article></body></html>"
+)
+
+
+class CountingCriticalCss(CriticalCss):
+    """Appends a line to the file at `log` for every <style> it has to work out."""
+
+    def __init__(self, stylesheet, template_text, log):
+        super().__init__(stylesheet, template_text)
+        self.log = log
+
+    def style(self, tags, classes):
+        known = len(self.styles)
+        style = super().style(tags, classes)
+        if len(self.styles) > known:
+            with open(self.log, "a") as f:
+                f.write(f"{os.getpid()}\n")
+        return style
+
+
+class TestCriticalCss(unittest.TestCase):
+    def test_selector_matches(self):
+        tags, classes = {"body", "li", "a"}, {"task-list-item"}
+        self.assertTrue(selector_matches("li.task-list-item", tags, classes))
+        self.assertTrue(selector_matches("a:hover", tags, classes))
+        self.assertTrue(selector_matches("::-webkit-scrollbar", tags, classes))
+        self.assertTrue(selector_matches("body > a[href]", tags, classes))
+        self.assertFalse(selector_matches("table th", tags, classes))
+        self.assertFalse(selector_matches(".unused", tags, classes))
+
+    def test_style_keeps_used_rules(self):
+        critical = CriticalCss(STYLESHEET)
+        self.assertEqual(
+            critical.style({"h2", "a", "li"}, {"task-list-item"}),
+            "<style>body{margin: 0;}h2{color: red;}"
+            "li.task-list-item{list-style: none;}a:hover{color: blue;}"
+            "@media (max-width: 600px){h2{font-size: 1em;}}"
+            "@font-face{font-family: X; src: url(/x.woff2);}</style>",
+        )
+
+    def test_style_is_memoized_per_signature(self):
+        critical = CriticalCss(STYLESHEET, TEMPLATE)
+        first = critical.style({"h1"}, set())
+        self.assertIs(critical.style({"h1", "html"}, set()), first)
+        self.assertEqual(len(critical.styles), 1)
+
+    def test_rebase_urls(self):
+        css = (
+            "a{background:url(img/a.png)}b{background:url('../b.png?v=1')}"
+            'c{background:url("/c.png")}d{background:url(data:image/png;base64,AA==)}'
+            "e{filter:url(#f)}f{background:url(https://x.y/f.png)}"
+        )
+        self.assertEqual(
+            rebase_urls(css, "/css/index.css", "/site/", {"/css/img/a.png": "/css/img/a.1234.png"}),
+            "a{background:url(/site/css/img/a.1234.png)}b{background:url('/site/b.png?v=1')}"
+            'c{background:url("/site/c.png")}d{background:url(data:image/png;base64,AA==)}'
+            "e{filter:url(#f)}f{background:url(https://x.y/f.png)}",
+        )
+
+    def test_node_names(self):
+        node = markdown_to_html_node("# T\n\n- [x] done\n\n```python\nx = 1\n```")
+        tags, classes = node_names(node)
+        self.assertTrue({"div", "h1", "ul", "li", "input", "pre", "code"} <= tags)
+        self.assertIn("task-list-item", classes)
+
+    def test_preload_links(self):
+        content = '<p><img src="/a.png"></p><img src="/a.png"><img src="/b.png"><img src="/c.png">'
+        self.assertEqual(
+            preload_links(content),
+            '<link rel="preload" as="image" href="/a.png" />'
+            '<link rel="preload" as="image" href="/b.png" />',
+        )
+        self.assertEqual(preload_links("<p>" + "x" * 5000 + '</p><img src="/late.png">'), "")
+
+    def test_inline_critical_css(self):
+        with tempfile.TemporaryDirectory() as static:
+            with open(os.path.join(static, "index.css"), "w") as f:
+                f.write(STYLESHEET)
+            text, critical = inline_critical_css(TEMPLATE, static)
+            self.assertEqual(inline_critical_css(TEMPLATE, os.path.join(static, "none")), (TEMPLATE, None))
+            # url()s in the inlined rules are made root-relative under the basepath
+            _, rebased = inline_critical_css(TEMPLATE, static, "/site/")
+            self.assertIn("url(/site/x.woff2)", rebased.style(set(), set()))
+
+        template = Template(text, "/site/", critical=critical)
+        page = render_page("# Title\n\n![x](/images/x.png)", template)
+        self.assertIn(
+            "<title>Title</title><style>body{margin: 0;}h1{color: red;}"
+            "@font-face{font-family: X; src: url(/x.woff2);}</style>"
+            '<link rel="preload" as="image" href="/site/images/x.png" />'
+            '<link href="/site/index.css" rel="preload" as="style"',
+            page,
+        )
+        self.assertIn('<noscript><link href="/site/index.css" rel="stylesheet" /></noscript>', page)
+
+        # pages rendered from HTML alone get the same treatment
+        listing = template.render(Title="Tags", Content="<ul><li>x</li></ul>", CriticalCss="")
+        self.assertIn("<style>body{margin: 0;}@font-face", listing)
+
+    def test_memo_is_kept_by_each_worker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, "styles.log")
+            with open(os.path.join(tmp, "index.css"), "w") as f:
+                f.write(STYLESHEET)
+            text, _ = inline_critical_css(TEMPLATE, tmp)
+            template = Template(text, critical=CountingCriticalCss(STYLESHEET, TEMPLATE, log))
+            pages = []
+            for i in range(12):
+                from_path = os.path.join(tmp, f"page{i}.md")
+                with open(from_path, "w") as f:
+                    f.write(f"# Page {i}\n\ntext")
+                pages.append((from_path, os.path.join(tmp, "out", f"page{i}.html")))
+
+            with unittest.mock.patch("builtins.print"):
+                list(render_pages(pages, template, jobs=2))
+            with open(log) as f:
+                workers = f.read().split()
+            # every page has the same tags: one <style> per worker, not per page
+            self.assertEqual(len(workers), len(set(workers)))
+            self.assertLessEqual(len(workers), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+import zipfile
+from archive import open_writer
+from data_pages import iter_rows, render_row, write_data_pages
+from render import Template
+
+
+class TestDataPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data = os.path.join(self.tmp.name, "data")
+        os.makedirs(self.data)
+        self.write("products.html", "<h1>{{ title }}</h1>{{ body_md }}<p>{{ price }}</p>")
+        self.template = Template("<title>{{ Title }}</title>{{ Toc }}{{ Content }}")
+
+    def write(self, name, text):
+        with open(os.path.join(self.data, name), "w") as f:
+            f.write(text)
+
+    def read(self, rel_path):
+        with open(os.path.join(self.tmp.name, "docs", rel_path)) as f:
+            return f.read()
+
+    def build(self, jobs=1, batch_size=2, writer=None):
+        return write_data_pages(
+            self.data,
+            self.template,
+            os.path.join(self.tmp.name, "docs"),
+            jobs,
+            batch_size,
+            os.path.join(self.tmp.name, "cache", "data.json"),
+            os.path.join(self.tmp.name, "cache", "data"),
+            writer,
+        )
+
+    def test_iter_rows(self):
+        self.write("a.csv", "slug,title\nx,\"X, Y\"\n")
+        self.write("b.jsonl", '{"slug": "x", "n": 1}\n\n{"slug": "y"}\n')
+        self.assertEqual(list(iter_rows(os.path.join(self.data, "a.csv"))), [{"slug": "x", "title": "X, Y"}])
+        self.assertEqual(
+            list(iter_rows(os.path.join(self.data, "b.jsonl"))), [{"slug": "x", "n": 1}, {"slug": "y"}]
+        )
+        self.write("c.jsonl", "[1]\n")
+        with self.assertRaisesRegex(ValueError, "c.jsonl:1"):
+            list(iter_rows(os.path.join(self.data, "c.jsonl")))
+        self.write("d.csv", "slug,title\nx,X\ny,Y,extra\n")
+        with self.assertRaisesRegex(ValueError, "d.csv:3: more fields"):
+            list(iter_rows(os.path.join(self.data, "d.csv")))
+
+    def test_render_row(self):
+        page = render_row(
+            {"title": "Ring & Co", "body_md": "**one** ring", "price": "<5"},
+            self.template,
+            Template("<h1>{{ title }}</h1>{{ body_md }}<p>{{ price }}</p>{{ missing }}"),
+        )
+        self.assertEqual(
+            page,
+            "<title>Ring &amp; Co</title><h1>Ring &amp; Co</h1>"
+            "<div><p><b>one</b> ring</p></div><p>&lt;5</p>",
+        )
+
+    def test_only_changed_rows_are_rendered(self):
+        rows = [f'{{"title": "Item {i}", "price": {i}}}' for i in range(5)]
+        self.write("products.jsonl", "\n".join(rows))
+        outputs, rendered = self.build()
+        self.assertEqual(rendered, 5)
+        self.assertEqual(len(outputs), 5)
+        self.assertIn("<p>3</p>", self.read("products/item-3.html"))
+
+        rows[3] = '{"title": "Item 3", "price": 30}'
+        self.write("products.jsonl", "\n".join(rows))
+        new_outputs, rendered = self.build(jobs=2)
+        self.assertEqual(rendered, 1)
+        self.assertIn("<p>30</p>", self.read("products/item-3.html"))
+        changed = [path for path in outputs if outputs[path] != new_outputs[path]]
+        self.assertEqual(changed, [os.path.join("products", "item-3.html")])
+
+        # a template change renders every row again
+        self.template = Template("{{ Content }}")
+        self.assertEqual(self.build()[1], 5)
+
+    def test_rows_without_slug_or_title_are_numbered(self):
+        self.write("products.csv", "price,body_md\n1,a\n2,b\n")
+        outputs, rendered = self.build()
+        self.assertEqual(rendered, 2)
+        self.assertEqual(
+            sorted(outputs), [os.path.join("products", "1.html"), os.path.join("products", "2.html")]
+        )
+        self.assertIn("<p>2</p>", self.read("products/2.html"))
+
+    def test_pages_are_written_to_an_archive(self):
+        self.write("products.jsonl", '{"title": "A", "price": 1}\n{"title": "B", "price": 2}')
+        site = os.path.join(self.tmp.name, "site.zip")
+        # the second build copies both unchanged pages into the archive
+        for expected_rendered in (2, 0):
+            with open_writer(site) as writer:
+                outputs, rendered = self.build(writer=writer)
+            self.assertEqual(rendered, expected_rendered)
+            with zipfile.ZipFile(site) as archive:
+                self.assertEqual(sorted(archive.namelist()), sorted(outputs))
+                self.assertIn(b"<p>2</p>", archive.read("products/b.html"))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "docs")))
+
+    def test_duplicate_slugs(self):
+        self.write("products.csv", "slug,title\na,A\na,B\n")
+        with self.assertRaisesRegex(ValueError, "slug 'a'"):
+            self.build()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+import generate_page
+from blocks_markdown import parse_document
+from document import format_path, parse_formats, render_formats, to_json, to_text
+from render import Template
+
+MARKDOWN = """# Guide
+
+Some **bold [link](/a)** text.
+
+> quoted
+
+- [x] done
+- ![cat](/cat.png)
+
+| a | b |
+|---|--:|
+| `1` | 2 |
+
+```py
+x = 1
+```"""
+
+
+class TestDocument(unittest.TestCase):
+    def test_parse_formats(self):
+        self.assertEqual(parse_formats("json, html,json"), ("json", "html"))
+        for spec in ("", "html,pdf"):
+            with self.assertRaises(ValueError):
+                parse_formats(spec)
+
+    def test_format_path(self):
+        self.assertEqual(format_path("/docs/blog/post.html", "text"), "/docs/blog/post.txt")
+
+    def test_to_text(self):
+        self.assertEqual(
+            to_text(parse_document(MARKDOWN.split("\n"))),
+            "Guide\n\nSome bold link text.\n\nquoted\n\ndone\n\ncat\n\na\tb\n1\t2\n\nx = 1\n",
+        )
+        self.assertEqual(to_text(parse_document([""])), "")
+
+    def test_to_json(self):
+        document = to_json(parse_document(MARKDOWN.split("\n")))
+        heading, paragraph, quote, task_list, table, code = document["children"]
+        self.assertEqual(heading, {"type": "heading", "level": 1, "id": "guide", "text": "Guide"})
+        self.assertEqual(
+            paragraph["inlines"][1],
+            {
+                "type": "bold",
+                "text": "bold link",
+                "children": [
+                    {"type": "plain", "text": "bold "},
+                    {"type": "link", "text": "link", "url": "/a"},
+                ],
+            },
+        )
+        self.assertEqual(task_list["children"][0]["checked"], True)
+        self.assertEqual(table["align"], [None, "right"])
+        self.assertEqual(table["rows"][1][0], [{"type": "code", "text": "1"}])
+        self.assertEqual(code, {"type": "code", "info": "py", "text": "x = 1\n"})
+        self.assertEqual(quote["children"][0]["inlines"], [{"type": "plain", "text": "quoted"}])
+
+    def test_render_formats(self):
+        document = parse_document(["# Hi", "", "there"])
+        outputs = render_formats(document, "Hi", Template("<t>{{ Title }}</t>"), ("text", "html"))
+        self.assertEqual(list(outputs), ["text", "html"])
+        self.assertEqual(outputs["html"], "<t>Hi</t>")
+        self.assertEqual(outputs["text"], "Hi\n\nthere\n")
+
+    def test_write_page_parses_once_for_every_format(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "page.md")
+            with open(source, "w") as f:
+                f.write(MARKDOWN)
+
+            dest = os.path.join(tmp, "out", "page.html")
+            parse = unittest.mock.Mock(wraps=parse_document)
+            with unittest.mock.patch.object(generate_page, "parse_document", parse), \
+                    unittest.mock.patch("builtins.print"):
+                generate_page.write_page(
+                    source, Template("{{ Content }}"), dest, ("html", "json", "text")
+                )
+
+            self.assertEqual(parse.call_count, 1)
+            self.assertEqual(
+                sorted(os.listdir(os.path.dirname(dest))),
+                ["page.html", "page.json", "page.txt"],
+            )
+            with open(format_path(dest, "json")) as f:
+                self.assertEqual(json.load(f)["title"], "Guide")
+
+
+if __name__ == "__main__":
+    unittest.main()
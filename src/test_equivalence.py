@@ -0,0 +1,299 @@
+import difflib
+import gc
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import unittest
+from html.parser import HTMLParser
+from blocks_markdown import markdown_to_html_node
+
+# Differential harness for the renderer. A deterministic corpus of realistic
+# pages plus seeded random markdown is rendered, and each page's HTML is
+# compared against the HTML the reference implementation produced, kept
+# gzipped in test_equivalence.html.gz; a mismatch prints a diff. Time per
+# page (relative to a fixed calibration loop, so the baseline carries across
+# machines) and peak traced memory are compared against the baseline in
+# test_equivalence.json, but only with BOOTS_PERF=1 set: on a loaded machine
+# they are too noisy for the default test run.
+#
+# BOOTS_SEED=<n> generates a different corpus, e.g. to try new random inputs
+# in CI. There is no reference HTML for it, so its pages are only checked to
+# render without errors into well-formed HTML.
+#
+# After an intended change to the output, or to accept new performance
+# numbers, regenerate the baseline:
+#
+#   python3 src/test_equivalence.py --update
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_equivalence.json")
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_equivalence.html.gz")
+CORPUS_PAGES = 60
+RANDOM_PAGES = 300
+DEFAULT_SEED = 20240601
+SEED = int(os.environ.get("BOOTS_SEED", DEFAULT_SEED))
+# allowed slowdown of time per page, and growth of peak memory, over the baseline
+TIME_TOLERANCE = float(os.environ.get("BOOTS_TIME_TOLERANCE", "2.0"))
+MEMORY_TOLERANCE = float(os.environ.get("BOOTS_MEMORY_TOLERANCE", "1.25"))
+RUN_PERFORMANCE = os.environ.get("BOOTS_PERF") == "1"
+# elements without an end tag
+VOID_TAGS = {"br", "hr", "img", "input", "link", "meta"}
+
+WORDS = (
+    "ring hobbit shire elf wizard mountain river forest tower king road shadow "
+    "light song sword council journey fellowship dragon gold lamp stone"
+).split()
+LANGUAGES = ("python", "javascript", "go", "bash", "json", "css", "")
+# fragments random markdown is assembled from, heavy on syntax characters
+FRAGMENTS = (
+    "*", "**", "_", "`", "```", "[", "]", "(", ")", "![", "](", "#", "# ", "## ",
+    ">", "> ", "- ", "1. ", "- [ ] ", "- [x] ", "|", "|---|", ":--", "\\", "<", "&",
+    "\n", "\n\n", "  ", "   ", "<!-- more -->", "[a]: /x", "[a]", "[a][]", "http://x.y",
+    "word", "two words", "é", "🙂",
+)
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def inline_text(rng, count):
+    parts = []
+    for _ in range(count):
+        word = rng.choice(WORDS)
+        kind = rng.randrange(12)
+        if kind == 0:
+            parts.append(f"**{word}**")
+        elif kind == 1:
+            parts.append(f"_{word}_")
+        elif kind == 2:
+            parts.append(f"`{word}()`")
+        elif kind == 3:
+            parts.append(f"[{word}](/{word}/)")
+        elif kind == 4:
+            parts.append(f"![{word}](/images/{word}.png)")
+        elif kind == 5:
+            parts.append(f"[{word}][{word}]")
+        else:
+            parts.append(word)
+    return " ".join(parts)
+
+
+def generated_page(rng):
+    """A long, realistic page using every block type the renderer knows."""
+    lines = [f"# {words(rng, 4).title()}", ""]
+    references = set()
+    for section in range(rng.randrange(4, 9)):
+        lines += [f"{'#' * rng.randrange(2, 5)} {words(rng, 3).title()}", ""]
+        for _ in range(rng.randrange(2, 6)):
+            kind = rng.randrange(8)
+            if kind == 0:
+                lines += [f"- {inline_text(rng, 6)}" for _ in range(rng.randrange(2, 6))]
+                lines.append(f"  - {inline_text(rng, 4)}")
+            elif kind == 1:
+                lines += [f"{i}. {inline_text(rng, 5)}" for i in range(1, rng.randrange(3, 7))]
+            elif kind == 2:
+                lines += [f"> {inline_text(rng, 10)}", ">", f"> - {words(rng, 3)}"]
+            elif kind == 3:
+                lines += [f"```{rng.choice(LANGUAGES)}", f"def {rng.choice(WORDS)}(x):",
+                          '    return "x" + 1  # note', "```"]
+            elif kind == 4:
+                lines += ["| Name | Count | Note |", "|:--|--:|:-:|"]
+                lines += [f"| {inline_text(rng, 2)} | {rng.randrange(100)} | {words(rng, 2)} |"
+                          for _ in range(rng.randrange(2, 5))]
+            elif kind == 5:
+                lines += [f"- [{rng.choice(' x')}] {inline_text(rng, 4)}" for _ in range(3)]
+            else:
+                lines.append(inline_text(rng, rng.randrange(20, 80)))
+            lines.append("")
+        if section == 0:
+            lines += ["<!-- more -->", ""]
+    for word in WORDS:
+        references.add(f"[{word}]: /{word}/ \"{word.title()}\"")
+    lines += sorted(references)
+    return "\n".join(lines)
+
+
+def random_page(rng):
+    """Markdown-ish noise, to catch inputs no hand-written test thought of."""
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(1, 120)))
+
+
+def corpus(seed=SEED):
+    """Yield (name, markdown) for every page of the corpus, always the same ones for a seed."""
+    rng = random.Random(seed)
+    for i in range(CORPUS_PAGES):
+        yield f"page-{i}", generated_page(rng)
+    for i in range(RANDOM_PAGES):
+        yield f"random-{i}", random_page(rng)
+
+
+def render(markdown):
+    """Render to HTML, or describe the error so that errors are compared too."""
+    try:
+        return markdown_to_html_node(markdown).to_html()
+    except Exception as e:
+        return f"error: {type(e).__name__}: {e}"
+
+
+def html_diff(expected, actual):
+    """Unified diff of two renderings, one tag per line."""
+    return "\n".join(difflib.unified_diff(
+        expected.replace("><", ">\n<").split("\n"),
+        actual.replace("><", ">\n<").split("\n"),
+        "reference", "renderer", lineterm="",
+    ))
+
+
+class TagBalance(HTMLParser):
+    """Collects the problems of an HTML fragment whose tags do not nest."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.open = []
+        self.problems = []
+
+    def handle_starttag(self, tag, attrs):
+        self.open.append(tag)
+
+    def handle_endtag(self, tag):
+        # a void element may or may not have an end tag
+        while self.open and self.open[-1] != tag and self.open[-1] in VOID_TAGS:
+            self.open.pop()
+        if not self.open or self.open[-1] != tag:
+            self.problems.append(f"</{tag}> closes {self.open[-1:] or 'nothing'}")
+        else:
+            self.open.pop()
+
+    def close(self):
+        super().close()
+        unclosed = [tag for tag in self.open if tag not in VOID_TAGS]
+        if unclosed:
+            self.problems.append(f"unclosed {unclosed}")
+
+
+def calibrate():
+    """Seconds for a fixed pure-Python workload, the unit page times are measured in."""
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        parts = []
+        for i in range(100_000):
+            parts.append(f"<p>{i}</p>".replace("p", "q"))
+        "".join(parts).split("<")
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(pages):
+    """Return (time per page in calibration units, peak traced bytes of one page)."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        unit = calibrate()
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            for markdown in pages:
+                markdown_to_html_node(markdown).to_html()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    largest = max(pages, key=len)
+    tracemalloc.start()
+    try:
+        markdown_to_html_node(largest).to_html()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best / len(pages) / unit, peak
+
+
+def build_baseline():
+    pages = dict(corpus(DEFAULT_SEED))
+    page_time, peak = measure([pages[name] for name in pages if name.startswith("page-")])
+    reference = {name: render(markdown) for name, markdown in pages.items()}
+    return {"performance": {"page_time": page_time, "peak_bytes": peak}}, reference
+
+
+def load_baseline():
+    with open(BASELINE_PATH, "r") as f:
+        return json.load(f)
+
+
+def load_reference():
+    with open(REFERENCE_PATH, "rb") as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+def write_baseline():
+    baseline, reference = build_baseline()
+    with open(BASELINE_PATH, "w") as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+        f.write("\n")
+    data = json.dumps(reference, indent=0, sort_keys=True).encode("utf-8")
+    with open(REFERENCE_PATH, "wb") as f:
+        # no timestamp, so an unchanged reference gives an identical file
+        f.write(gzip.compress(data, mtime=0))
+    print(f"Wrote {BASELINE_PATH} and {REFERENCE_PATH}")
+
+
+class TestEquivalence(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.baseline = load_baseline()
+        cls.reference = load_reference()
+        cls.pages = dict(corpus())
+
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(sorted(self.pages), sorted(self.reference))
+        self.assertEqual(dict(corpus()), self.pages)
+
+    @unittest.skipUnless(SEED == DEFAULT_SEED, "no reference HTML for this BOOTS_SEED")
+    def test_html_matches_reference(self):
+        for name, markdown in self.pages.items():
+            html = render(markdown)
+            if html != self.reference[name]:
+                self.fail(
+                    f"{name} renders differently from the reference.\n"
+                    f"markdown: {markdown[:300]!r}\n{html_diff(self.reference[name], html)}"
+                )
+
+    def test_html_is_well_formed(self):
+        for name, markdown in self.pages.items():
+            html = render(markdown)
+            self.assertFalse(html.startswith("error:"), f"{name} (seed {SEED}): {html}")
+            balance = TagBalance()
+            balance.feed(html)
+            balance.close()
+            self.assertEqual(
+                balance.problems, [], f"{name} (seed {SEED}): {markdown[:300]!r}"
+            )
+
+    @unittest.skipUnless(RUN_PERFORMANCE, "set BOOTS_PERF=1 to check timing and memory")
+    def test_performance(self):
+        expected = self.baseline["performance"]
+        page_time, peak = measure([
+            markdown for name, markdown in self.pages.items() if name.startswith("page-")
+        ])
+        self.assertLess(
+            page_time, expected["page_time"] * TIME_TOLERANCE,
+            f"time per page regressed: {page_time:.4f} vs {expected['page_time']:.4f} units",
+        )
+        self.assertLess(
+            peak, expected["peak_bytes"] * MEMORY_TOLERANCE,
+            f"peak memory regressed: {peak} vs {expected['peak_bytes']} bytes",
+        )
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv:
+        write_baseline()
+    else:
+        unittest.main()
@@ -0,0 +1,119 @@
+import re
+import unittest
+from blocks_markdown import BlockType, markdown_to_html_node
+from extensions import BlockExtension, Line, Registry, registry
+from htmlnode import LeafNode, ParentNode, escape_text
+from textnode import TextType
+
+
+class YouTube(BlockExtension):
+    name = "youtube"
+    first_chars = "{"
+    pattern = re.compile(r"\{\{< youtube (\w+) >\}\}$")
+
+    def __init__(self):
+        self.offered = []
+
+    def start(self, line):
+        self.offered.append(line)
+        match = self.pattern.match(line)
+        return {"info": match.group(1)} if match else None
+
+    def render(self, block, refs):
+        return LeafNode(
+            tag="iframe", value="", props={"src": f"https://www.youtube.com/embed/{block.info}"}
+        )
+
+
+class Admonition(BlockExtension):
+    name = "admonition"
+    first_chars = ":"
+
+    def start(self, line):
+        if line.startswith(":::") and line[3:].strip():
+            return {"info": line[3:].strip()}
+        return None
+
+    def add_line(self, block, line):
+        return Line.CLOSE if line.strip() == ":::" else Line.CONTINUE
+
+    def render(self, block, refs):
+        lines = block.lines[1:]
+        if lines and lines[-1].strip() == ":::":
+            lines.pop()
+        inner = markdown_to_html_node("\n".join(lines))
+        return ParentNode(tag="aside", children=[inner], props={"class": block.info})
+
+
+class TestBlockExtensions(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(registry.clear)
+
+    def test_single_line_block(self):
+        youtube = YouTube()
+        registry.add_block(youtube)
+        md = "Watch:\n{{< youtube abc123 >}}\nafter\n\n{not a shortcode}"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p>Watch:</p><iframe src="https://www.youtube.com/embed/abc123"></iframe>'
+            "<p>after</p><p>{not a shortcode}</p></div>",
+        )
+        # only lines starting with the prefilter character were offered
+        self.assertEqual(youtube.offered, ["{{< youtube abc123 >}}", "{not a shortcode}"])
+
+    def test_multi_line_block_inside_a_list(self):
+        registry.add_block(Admonition())
+        md = "- :::warning\n  Mind the **gap**\n  :::\n- next"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><ul><li><aside class="warning"><div><p>Mind the <b>gap</b></p></div></aside></li>'
+            "<li>next</li></ul></div>",
+        )
+
+    def test_block_ends_with_its_container(self):
+        registry.add_block(Admonition())
+        md = "> :::note\n> inside\noutside"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><blockquote><aside class="note"><div><p>inside</p></div></aside></blockquote>'
+            "<p>outside</p></div>",
+        )
+
+    def test_extension_needs_first_chars(self):
+        with self.assertRaises(ValueError):
+            Registry().add_block(BlockExtension())
+
+
+class TestRenderOverrides(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(registry.clear)
+
+    def test_block_override(self):
+        registry.render_block(
+            BlockType.HEADING,
+            lambda block, tight, refs: LeafNode(
+                tag=f"h{block.level + 1}", value=escape_text(block.lines[0])
+            ),
+        )
+        self.assertEqual(
+            markdown_to_html_node("# A & B\n\ntext").to_html(),
+            "<div><h2>A &amp; B</h2><p>text</p></div>",
+        )
+
+    def test_inline_override(self):
+        registry.render_inline(TextType.CODE, lambda node: f"<kbd>{escape_text(node.text)}</kbd>")
+        self.assertEqual(
+            markdown_to_html_node("Press `<Enter>` **now**").to_html(),
+            "<div><p>Press <kbd>&lt;Enter&gt;</kbd> <b>now</b></p></div>",
+        )
+
+    def test_clear_restores_defaults(self):
+        registry.render_inline(TextType.BOLD, lambda node: "")
+        registry.clear()
+        self.assertEqual(
+            markdown_to_html_node("**x**").to_html(), "<div><p><b>x</b></p></div>"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
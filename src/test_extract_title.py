@@ -63,6 +63,10 @@ No headings here
         with self.assertRaises(ValueError):
             extract_title("")
 
+    def test_carriage_return_line_endings(self):
+        self.assertEqual(extract_title("# Old Mac\rbody\rmore"), "Old Mac")
+        self.assertEqual(extract_title("intro\r\n# Windows\r\nbody"), "Windows")
+
     def test_whitespace_only_raises_error(self):
         with self.assertRaises(ValueError):
             extract_title("   \n   \n")
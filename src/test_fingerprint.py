@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from fingerprint import MANIFEST_NAME, HashCache, copy_assets, fingerprint_name, hash_assets
+from render import Template, apply_basepath
+
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.static = os.path.join(self.root, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("index.css", b"body {}")
+        self.write("images/tom.png", b"\x89PNG")
+
+    def write(self, name, data):
+        path = os.path.join(self.static, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_fingerprint_name(self):
+        self.assertEqual(
+            fingerprint_name("images/tom.png", "abcdef0123456789"), "images/tom.abcdef0123.png"
+        )
+        self.assertEqual(fingerprint_name("LICENSE", "abcdef0123456789"), "LICENSE.abcdef0123")
+
+    def test_hash_cache_skips_unchanged_files(self):
+        cache_path = os.path.join(self.root, "cache", "hashes.json")
+        path = os.path.join(self.static, "index.css")
+        digest = HashCache(cache_path).digest(path)
+        self.assertEqual(digest, hashlib.sha256(b"body {}").hexdigest())
+
+        cache = HashCache(cache_path)
+        cache.digest(path)
+        cache.save()
+
+        # same size and mtime: the cached digest is trusted without reading
+        stat = os.stat(path)
+        self.write("index.css", b"body {{")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(HashCache(cache_path).digest(path), digest)
+
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertEqual(
+            HashCache(cache_path).digest(path), hashlib.sha256(b"body {{").hexdigest()
+        )
+
+    def test_hash_and_copy_assets(self):
+        assets = hash_assets(self.static, HashCache(os.path.join(self.root, "hashes.json")))
+        css = hashlib.sha256(b"body {}").hexdigest()[:10]
+        png = hashlib.sha256(b"\x89PNG").hexdigest()[:10]
+        self.assertEqual(
+            assets,
+            {"/index.css": f"/index.{css}.css", "/images/tom.png": f"/images/tom.{png}.png"},
+        )
+
+        dest = os.path.join(self.root, "docs")
+        copy_assets(self.static, dest, assets)
+        with open(os.path.join(dest, "images", f"tom.{png}.png"), "rb") as f:
+            self.assertEqual(f.read(), b"\x89PNG")
+        self.assertFalse(os.path.exists(os.path.join(dest, "index.css")))
+        with open(os.path.join(dest, MANIFEST_NAME)) as f:
+            self.assertEqual(json.load(f), assets)
+
+
+class TestAssetReferences(unittest.TestCase):
+    assets = {"/index.css": "/index.abc.css", "/images/tom.png": "/images/tom.def.png"}
+
+    def test_rewrite_with_basepath(self):
+        html = (
+            '<link href="/index.css?v=2"><img src="/images/tom.png" alt="/index.css">'
+            '<a href="/blog/">blog</a><a href="https://x.org/index.css">x</a>'
+        )
+        self.assertEqual(
+            apply_basepath(html, "/site/", self.assets),
+            '<link href="/site/index.abc.css?v=2"><img src="/site/images/tom.def.png" '
+            'alt="/index.css"><a href="/site/blog/">blog</a><a href="https://x.org/index.css">x</a>',
+        )
+
+    def test_template_and_slots_are_rewritten(self):
+        template = Template('<link href="/index.css">{{ Content }}', "/", self.assets)
+        self.assertEqual(
+            template.render(Content='<img src="/images/tom.png">'),
+            '<link href="/index.abc.css"><img src="/images/tom.def.png">',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from front_matter import split_front_matter
+from render import Template, render_page
+
+
+class TestFrontMatter(unittest.TestCase):
+    def split(self, markdown):
+        front_matter, lines = split_front_matter(markdown.split("\n"))
+        return front_matter, list(lines)
+
+    def test_fields_and_lists(self):
+        front_matter, lines = self.split(
+            "---\n"
+            "title: \"Tom: a Mistake\"\n"
+            "tags: tolkien, opinion\n"
+            "categories: [characters]\n"
+            "authors:\n"
+            "  - Frodo\n"
+            "  - 'Sam'\n"
+            "---\n"
+            "# Tom\n"
+        )
+        self.assertEqual(front_matter, {
+            "title": "Tom: a Mistake",
+            "tags": ["tolkien", "opinion"],
+            "categories": ["characters"],
+            "authors": ["Frodo", "Sam"],
+        })
+        self.assertEqual(lines, ["# Tom", ""])
+
+    def test_no_front_matter(self):
+        self.assertEqual(self.split("# Title\n---\nx: y"), ({}, ["# Title", "---", "x: y"]))
+        self.assertEqual(self.split(""), ({}, [""]))
+
+    def test_thematic_break_is_not_front_matter(self):
+        markdown = "---\nJust some text.\n---\n# Title"
+        self.assertEqual(self.split(markdown), ({}, markdown.split("\n")))
+
+    def test_unclosed_fence(self):
+        markdown = "---\ntitle: x\n# Title"
+        self.assertEqual(self.split(markdown), ({}, markdown.split("\n")))
+
+    def test_rest_is_not_read_ahead(self):
+        consumed = []
+
+        def lines():
+            for line in ["---", "tags: a", "---", "# Title", "body"]:
+                consumed.append(line)
+                yield line
+
+        front_matter, rest = split_front_matter(lines())
+        self.assertEqual(front_matter, {"tags": ["a"]})
+        self.assertEqual(len(consumed), 3)
+        self.assertEqual(list(rest), ["# Title", "body"])
+
+    def test_render_page_strips_front_matter(self):
+        page = render_page(
+            "---\ntitle: Custom\ntags: [a]\n---\n# Heading\n\ntext",
+            Template("{{ Title }}|{{ Content }}"),
+        )
+        self.assertEqual(
+            page, 'Custom|<div><h1 id="heading">Heading</h1><p>text</p></div>'
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from blocks_markdown import markdown_to_html_node
+from headings import Slugger, slugify, toc_html_node
+from render import render_page
+
+
+class CountingSet(set):
+    """A set that counts membership tests."""
+
+    lookups = 0
+
+    def __contains__(self, item):
+        self.lookups += 1
+        return super().__contains__(item)
+
+
+class TestSlugs(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Getting Started!"), "getting-started")
+        self.assertEqual(slugify("  `render_page()` API "), "render_page-api")
+        self.assertEqual(slugify("???"), "section")
+
+    def test_duplicates_get_suffixes(self):
+        slugger = Slugger()
+        slugs = [slugger.slug(text) for text in ["Intro", "Intro", "Intro-1", "Intro"]]
+        self.assertEqual(slugs, ["intro", "intro-1", "intro-1-1", "intro-2"])
+
+    def test_thousands_of_duplicate_headings(self):
+        slugger = Slugger()
+        slugger.used = CountingSet()
+        slugs = [slugger.slug("Parameters") for _ in range(20000)]
+        self.assertEqual(len(set(slugs)), 20000)
+        self.assertEqual(slugs[-1], "parameters-19999")
+        # a rescan per duplicate would be ~2e8 lookups; resuming is two each
+        self.assertLessEqual(slugger.used.lookups, 2 * 20000)
+
+
+class TestOutline(unittest.TestCase):
+    def test_outline_is_collected_while_rendering(self):
+        meta = {}
+        html = markdown_to_html_node("# A\n\n> ## B\n\n- ### A", meta).to_html()
+        self.assertEqual(meta["outline"], [(1, "A", "a"), (2, "B", "b"), (3, "A", "a-1")])
+        self.assertIn('<h3 id="a-1">A</h3>', html)
+
+    def test_toc_nests_by_level(self):
+        toc = toc_html_node([(1, "A", "a"), (2, "B", "b"), (3, "C", "c"), (2, "D & E", "d--e")])
+        self.assertEqual(
+            toc.to_html(),
+            '<ul><li><a href="#a">A</a><ul><li><a href="#b">B</a><ul>'
+            '<li><a href="#c">C</a></li></ul></li>'
+            '<li><a href="#d--e">D &amp; E</a></li></ul></li></ul>',
+        )
+
+    def test_toc_skipped_levels_and_empty_outline(self):
+        toc = toc_html_node([(3, "Deep", "deep"), (1, "Top", "top")])
+        self.assertEqual(
+            toc.to_html(),
+            '<ul><li><a href="#deep">Deep</a></li><li><a href="#top">Top</a></li></ul>',
+        )
+        self.assertIsNone(toc_html_node([]))
+
+    def test_toc_slot(self):
+        page = render_page("# Title\n\n## Usage", "<nav>{{ Toc }}</nav>", "/site/")
+        self.assertEqual(
+            page,
+            '<nav><ul><li><a href="#title">Title</a><ul>'
+            '<li><a href="#usage">Usage</a></li></ul></li></ul></nav>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import highlight as highlight_module
+from highlight import highlight, language_name
+
+
+class TestHighlight(unittest.TestCase):
+    def test_language_name(self):
+        self.assertEqual(language_name("python"), "python")
+        self.assertEqual(language_name("JS {linenos}"), "javascript")
+        self.assertEqual(language_name("sh"), "bash")
+        self.assertIsNone(language_name(""))
+
+    def test_python(self):
+        self.assertEqual(
+            highlight("def f(x):  # doc\n    return 42\n", "python"),
+            '<span class="hl-keyword">def</span> f(x):  <span class="hl-comment"># doc</span>\n'
+            '    <span class="hl-keyword">return</span> <span class="hl-number">42</span>\n',
+        )
+
+    def test_strings_hide_keywords(self):
+        self.assertEqual(
+            highlight("x = 'if else'", "python"),
+            'x = <span class="hl-string">\'if else\'</span>',
+        )
+
+    def test_javascript_builtins(self):
+        self.assertEqual(
+            highlight("console.log(null)", "javascript"),
+            '<span class="hl-builtin">console</span>.log(<span class="hl-keyword">null</span>)',
+        )
+
+    def test_output_is_escaped(self):
+        self.assertEqual(
+            highlight('if a < b && c > "<d>"', "bash"),
+            '<span class="hl-keyword">if</span> a &lt; b &amp;&amp; c &gt; '
+            '<span class="hl-string">"&lt;d&gt;"</span>',
+        )
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight("anything", "brainfuck"))
+
+    def test_repeated_snippets_are_cached(self):
+        code = "for i in range(3):\n    print(i)\n"
+        self.assertIs(highlight(code, "python"), highlight(code, "python"))
+
+    def test_cache_is_bounded(self):
+        code = "x = 1\n"
+        first = highlight(code, "python")
+        for i in range(highlight_module.CACHE_SIZE - 1):
+            highlight(f"y = {i}\n", "python")
+        # still cached, and now the most recently used
+        self.assertIs(highlight(code, "python"), first)
+        for i in range(highlight_module.CACHE_SIZE):
+            highlight(f"z = {i}\n", "python")
+        self.assertLessEqual(len(highlight_module._highlighted), highlight_module.CACHE_SIZE)
+        self.assertIsNot(highlight(code, "python"), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_attribute, escape_text
 
 class TestHTMLNode(unittest.TestCase):
     def setUp(self):
@@ -95,4 +95,20 @@ class TestParentNode(unittest.TestCase):
     def test_to_html_with_props(self):
         child_node = LeafNode(tag="span", value="child")
         parent_node = ParentNode(tag="div", children=[child_node], props={"class": "container", "id": "main"})
-        self.assertEqual(parent_node.to_html(), '<div class="container" id="main"><span>child</span></div>')
\ No newline at end of file
+        self.assertEqual(parent_node.to_html(), '<div class="container" id="main"><span>child</span></div>')
+
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a < b && "c" > d'), 'a &lt; b &amp;&amp; "c" &gt; d')
+
+    def test_escape_text_fast_path_returns_same_string(self):
+        text = "nothing to see here"
+        self.assertIs(escape_text(text), text)
+
+    def test_escape_attribute(self):
+        self.assertEqual(escape_attribute("""a"b'c<d>&"""), "a&quot;b&#x27;c&lt;d&gt;&amp;")
+
+    def test_props_are_escaped(self):
+        node = LeafNode(tag="a", value="x", props={"href": "/?a=1&b=\"2\""})
+        self.assertEqual(node.to_html(), '<a href="/?a=1&amp;b=&quot;2&quot;">x</a>')
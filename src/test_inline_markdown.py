@@ -1,15 +1,23 @@
+import gc
+import os
+import random
+import time
 import unittest
 from inline_markdown import (
+    MAX_NESTING,
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
     text_to_textnodes,
+    normalize_label,
     extract_markdown_links,
     extract_markdown_images,
 )
-
 from textnode import TextNode, TextType
 
+# wall-clock checks are too noisy on a loaded machine for the default run
+RUN_PERFORMANCE = os.environ.get("BOOTS_PERF") == "1"
+
 
 class TestInlineMarkdown(unittest.TestCase):
     def test_delim_bold(self):
@@ -192,5 +200,221 @@ class TestInlineMarkdown(unittest.TestCase):
         )
 
 
+class TestInlineParser(unittest.TestCase):
+    def test_nested_emphasis(self):
+        self.assertListEqual(
+            [
+                TextNode(
+                    "bold italic",
+                    TextType.BOLD,
+                    children=[
+                        TextNode("bold ", TextType.PLAIN),
+                        TextNode("italic", TextType.ITALIC),
+                    ],
+                ),
+            ],
+            text_to_textnodes("**bold _italic_**"),
+        )
+
+    def test_triple_delimiters(self):
+        self.assertListEqual(
+            [
+                TextNode(
+                    "x", TextType.ITALIC, children=[TextNode("x", TextType.BOLD)]
+                ),
+            ],
+            text_to_textnodes("***x***"),
+        )
+
+    def test_snake_case_is_plain(self):
+        self.assertListEqual(
+            [TextNode("call snake_case_name now", TextType.PLAIN)],
+            text_to_textnodes("call snake_case_name now"),
+        )
+
+    def test_unmatched_delimiters_are_literal(self):
+        self.assertListEqual(
+            [TextNode("a _ b ** c ` d", TextType.PLAIN)],
+            text_to_textnodes("a _ b ** c ` d"),
+        )
+
+    def test_backslash_escapes(self):
+        self.assertListEqual(
+            [TextNode("_not italic_", TextType.PLAIN)],
+            text_to_textnodes("\\_not italic\\_"),
+        )
+
+    def test_code_span_wins_over_emphasis(self):
+        self.assertListEqual(
+            [
+                TextNode("*", TextType.PLAIN),
+                TextNode("a*", TextType.CODE),
+            ],
+            text_to_textnodes("*`a*`"),
+        )
+
+    def test_link_with_emphasis(self):
+        self.assertListEqual(
+            [
+                TextNode(
+                    "a b",
+                    TextType.LINK,
+                    "https://boot.dev",
+                    [TextNode("a ", TextType.PLAIN), TextNode("b", TextType.BOLD)],
+                ),
+            ],
+            text_to_textnodes("[a **b**](https://boot.dev)"),
+        )
+
+    def test_link_titles(self):
+        self.assertEqual(
+            text_to_textnodes('[a](b "t")'),
+            [TextNode("a", TextType.LINK, "b", title="t")],
+        )
+        self.assertEqual(
+            text_to_textnodes("[a](<b c>) ![i](<x y.png>  'alt')"),
+            [
+                TextNode("a", TextType.LINK, "b c"),
+                TextNode(" ", TextType.PLAIN),
+                TextNode("i", TextType.ALT, "x y.png", title="alt"),
+            ],
+        )
+        # a space without a quoted title stays part of the destination
+        self.assertEqual(
+            text_to_textnodes("[a](b c)"), [TextNode("a", TextType.LINK, "b c")]
+        )
+
+    def test_links_do_not_nest(self):
+        self.assertListEqual(
+            [
+                TextNode("[a ", TextType.PLAIN),
+                TextNode("b", TextType.LINK, "c"),
+                TextNode("](d)", TextType.PLAIN),
+            ],
+            text_to_textnodes("[a [b](c)](d)"),
+        )
+
+
+    def test_deep_nesting_is_capped(self):
+        def depth(nodes):
+            return max((1 + depth(node.children or []) for node in nodes), default=0)
+
+        for char in "*_":
+            text = f"{char}a " * 400 + "b" + f" a{char}" * 400
+            nodes = text_to_textnodes(text)
+            self.assertEqual(depth(nodes), MAX_NESTING)
+            self.assertEqual(count_char(nodes, char), 800 - 2 * MAX_NESTING)
+            self.assertEqual(count_char(nodes, "a"), 800)
+
+        nodes = text_to_textnodes("![" * 2000 + "x" + "](u)" * 2000)
+        self.assertEqual(count_char(nodes, "x"), 1)
+        self.assertEqual(len(nodes), 3)
+        self.assertEqual(nodes[1].text_type, TextType.ALT)
+        self.assertEqual(nodes[1].url, "u")
+
+
+class TestReferenceLinks(unittest.TestCase):
+    refs = {"docs": ("/docs", None), "big cat": ("/cat.png", None)}
+
+    def test_full_collapsed_and_shortcut(self):
+        for text in ["[Read][docs]", "[docs][]", "[docs]"]:
+            with self.subTest(text):
+                nodes = text_to_textnodes(f"{text} now", self.refs)
+                self.assertEqual(nodes[0].text_type, TextType.LINK)
+                self.assertEqual(nodes[0].url, "/docs")
+                self.assertEqual(nodes[1], TextNode(" now", TextType.PLAIN))
+
+    def test_labels_are_normalized(self):
+        self.assertEqual(normalize_label("  Big\n  CAT "), "big cat")
+        self.assertEqual(
+            text_to_textnodes("![a cat][Big  Cat]", self.refs),
+            [TextNode("a cat", TextType.ALT, "/cat.png")],
+        )
+
+    def test_undefined_reference_is_text(self):
+        self.assertEqual(
+            text_to_textnodes("[a][nope] and [b]", self.refs),
+            [TextNode("[a][nope] and [b]", TextType.PLAIN)],
+        )
+
+    def test_definition_titles(self):
+        self.assertEqual(
+            text_to_textnodes("[docs]", {"docs": ("/docs", "The docs")}),
+            [TextNode("docs", TextType.LINK, "/docs", title="The docs")],
+        )
+
+    def test_inline_destination_wins(self):
+        self.assertEqual(
+            text_to_textnodes("[docs](/other)", self.refs),
+            [TextNode("docs", TextType.LINK, "/other")],
+        )
+
+    @unittest.skipUnless(RUN_PERFORMANCE, "set BOOTS_PERF=1 to check timing")
+    def test_nested_brackets_scale_linearly(self):
+        refs = {"x": ("/x", None)}
+        for n in (2000, 16000):
+            start = time.perf_counter()
+            text_to_textnodes("[" * n + "x" + "]" * n, refs)
+            elapsed = time.perf_counter() - start
+        # labels are never longer than 999 characters, so each close is O(1)
+        self.assertLess(elapsed, 2)
+
+
+def count_char(nodes, char):
+    total = 0
+    for node in nodes:
+        if node.children:
+            total += count_char(node.children, char)
+        else:
+            total += node.text.count(char)
+        total += (node.url or "").count(char)
+    return total
+
+
+class TestInlineParserPerformance(unittest.TestCase):
+    PATHOLOGICAL = {
+        "emphasis openers": lambda n: "*a " * n,
+        "brackets": lambda n: "[" * n + "[a](b)" * n,
+        "mixed delimiters": lambda n: "*_" * n + "_*" * n,
+        "backtick runs": lambda n: "".join("`" * (i % 50 + 1) + "x" for i in range(n)),
+        "underscores": lambda n: "a_ " * n + " _b" * n,
+        "nested emphasis": lambda n: "*a " * n + "b" + " a*" * n,
+        "nested images": lambda n: "![" * n + "x" + "](u)" * n,
+    }
+
+    def time_parse(self, text):
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            text_to_textnodes(text)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    @unittest.skipUnless(RUN_PERFORMANCE, "set BOOTS_PERF=1 to check timing")
+    def test_parse_time_is_linear(self):
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for name, make in self.PATHOLOGICAL.items():
+                with self.subTest(name):
+                    small = self.time_parse(make(1000))
+                    large = self.time_parse(make(8000))
+                    # 8x the input: linear is ~8x, quadratic would be ~64x
+                    self.assertLess(large, max(small, 1e-4) * 24)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def test_fuzz(self):
+        rng = random.Random(1234)
+        alphabet = "**__``[]()!\\ a\n"
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+            nodes = text_to_textnodes(text)
+            # every ordinary character survives parsing exactly once
+            self.assertEqual(count_char(nodes, "a"), text.count("a"), text)
+
+
 if __name__ == "__main__":
     unittest.main()
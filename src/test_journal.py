@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+from journal import Journal
+from main import main
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cache", "journal.jsonl")
+        self.page = os.path.join(self.tmp.name, "docs", "index.html")
+        os.makedirs(os.path.dirname(self.page))
+        with open(self.page, "w") as f:
+            f.write("page")
+
+    def journal(self, resume, key="build"):
+        return Journal(os.path.join(self.tmp.name, "docs"), key, self.path, resume)
+
+    def record(self):
+        with self.journal(False) as journal:
+            journal.record(self.page, "in1", {self.page: "out1"}, {"title": "Home"})
+
+    def test_resume_skips_finished_pages(self):
+        self.record()
+        with self.journal(True) as journal:
+            entry = journal.completed(self.page, "in1")
+            self.assertEqual(entry["files"], {self.page: "out1"})
+            self.assertEqual(entry["meta"], {"title": "Home"})
+            # a changed source renders again
+            self.assertIsNone(journal.completed(self.page, "in2"))
+
+    def test_missing_output_renders_again(self):
+        self.record()
+        os.remove(self.page)
+        with self.journal(True) as journal:
+            self.assertIsNone(journal.completed(self.page, "in1"))
+
+    def test_fresh_build_and_other_build_start_empty(self):
+        self.record()
+        with self.journal(True, key="other") as journal:
+            self.assertEqual(journal.pages, {})
+        self.record()
+        with self.journal(False) as journal:
+            self.assertEqual(journal.pages, {})
+
+    def test_torn_last_line_is_dropped(self):
+        self.record()
+        with open(self.path, "a") as f:
+            f.write('{"output": "/x", "inp')
+        with self.journal(True) as journal:
+            self.assertEqual(list(journal.pages), [os.path.abspath(self.page)])
+        # and the journal was compacted, so it reads cleanly
+        with open(self.path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_prune_forgets_pages_not_in_outputs(self):
+        self.record()
+        with self.journal(True) as journal:
+            self.assertEqual(journal.prune([]), [self.page])
+            self.assertEqual(journal.pages, {})
+
+
+class TestResumedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/old/index.md", "# Old")
+        self.write("static/a.css", "a {}")
+        self.write("static/b.css", "b {}")
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, *argv):
+        with unittest.mock.patch("builtins.print"):
+            main(list(argv))
+
+    def test_resume_removes_outputs_of_deleted_sources(self):
+        self.build()
+        self.assertTrue(os.path.isfile("docs/blog/old/index.html"))
+        os.remove("content/blog/old/index.md")
+        os.remove("static/b.css")
+        # as if the last build was interrupted: only its journal knows the pages
+        os.remove(".boots-cache/outputs.json")
+        self.build("--resume")
+        self.assertFalse(os.path.exists("docs/blog"))
+        self.assertTrue(os.path.isfile("docs/index.html"))
+
+        self.write("static/b.css", "b {}")
+        self.build()
+        os.remove("static/b.css")
+        self.build("--resume")
+        self.assertEqual(sorted(os.listdir("docs")), ["a.css", "index.html"])
+
+    def test_errors_are_written_when_the_build_dies(self):
+        self.write("content/bad.md", "no title")
+        # a broken data export ends the build after the pages rendered
+        self.write("data/items.html", "{{ title }}")
+        self.write("data/items.csv", "title\na,extra\n")
+        with self.assertRaises(ValueError):
+            self.build("--keep-going", "--jobs", "2")
+        with open("build-errors.json") as f:
+            errors = json.load(f)
+        self.assertEqual([error["source"] for error in errors], [os.path.abspath("content/bad.md")])
+
+
+if __name__ == "__main__":
+    unittest.main()
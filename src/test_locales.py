@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from locales import collect_locale_pages, link_files, locale_basepath, parse_locales
+
+
+class TestLocales(unittest.TestCase):
+    def test_parse_locales(self):
+        self.assertEqual(parse_locales("en, fr,pt-BR"), ("en", "fr", "pt-BR"))
+        for spec in ("", "en,en", "en,../x", "e"):
+            with self.assertRaises(ValueError):
+                parse_locales(spec)
+
+    def test_locale_basepath(self):
+        locales = ("en", "fr")
+        self.assertEqual(locale_basepath("/site/", "en", locales), "/site/")
+        self.assertEqual(locale_basepath("/site/", "fr", locales), "/site/fr/")
+
+    def test_untranslated_pages_fall_back_to_default(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            for path in ("en/index.md", "en/blog/post.md", "fr/index.md", "fr/only.md"):
+                os.makedirs(os.path.dirname(os.path.join(content, path)), exist_ok=True)
+                with open(os.path.join(content, path), "w") as f:
+                    f.write("# Page")
+
+            docs = os.path.join(tmp, "docs")
+            pages = sorted(
+                (os.path.relpath(from_path, content), os.path.relpath(dest_path, docs), locale)
+                for from_path, dest_path, locale in collect_locale_pages(
+                    content, docs, ("en", "fr", "de")
+                )
+            )
+            self.assertEqual(pages, [
+                ("en/blog/post.md", "blog/post.html", "en"),
+                ("en/blog/post.md", "de/blog/post.html", "de"),
+                ("en/blog/post.md", "fr/blog/post.html", "fr"),
+                ("en/index.md", "de/index.html", "de"),
+                ("en/index.md", "index.html", "en"),
+                ("fr/index.md", "fr/index.html", "fr"),
+                ("fr/only.md", "fr/only.html", "fr"),
+            ])
+
+    def test_link_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "docs", "images"))
+            with open(os.path.join(tmp, "docs", "images", "a.png"), "wb") as f:
+                f.write(b"png")
+
+            for _ in range(2):
+                link_files(os.path.join(tmp, "docs"), os.path.join(tmp, "docs", "fr"), ["images/a.png"])
+            linked = os.path.join(tmp, "docs", "fr", "images", "a.png")
+            self.assertTrue(os.path.samefile(linked, os.path.join(tmp, "docs", "images", "a.png")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import mmap
+import os
+import tempfile
+import unittest
+from mapped_markdown import extract_mapped_title, iter_mapped_lines, render_mapped_page
+from render import Template, render_page
+
+
+class TestMappedMarkdown(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, data):
+        path = os.path.join(self.tmp.name, "index.md")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def mapped(self, data):
+        f = open(self.write(data), "rb")
+        self.addCleanup(f.close)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.addCleanup(mm.close)
+        return mm
+
+    def test_lines_match_text_mode_split(self):
+        md = "\n# Title\n\n\nSome **bold** text\nnext line\n\n- a\n- b\n\n   \n\n> quote é\n"
+        self.assertEqual(
+            list(iter_mapped_lines(self.mapped(md.encode("utf-8")))),
+            md.split("\n"),
+        )
+
+    def test_crlf_lines(self):
+        mm = self.mapped(b"# Title\r\n\r\nline one\rline two\r\n")
+        self.assertEqual(
+            list(iter_mapped_lines(mm)), ["# Title", "", "line one", "line two", ""]
+        )
+
+    def test_extract_mapped_title(self):
+        self.assertEqual(extract_mapped_title(self.mapped(b"intro\n#  Big Title \r\n")), "Big Title")
+        with self.assertRaises(ValueError):
+            extract_mapped_title(self.mapped(b"## not a title"))
+
+    def test_extract_mapped_title_carriage_returns(self):
+        self.assertEqual(extract_mapped_title(self.mapped(b"# Old Mac\rbody\rmore")), "Old Mac")
+        self.assertEqual(extract_mapped_title(self.mapped(b"intro\r  # Late\r")), "Late")
+        with self.assertRaises(ValueError):
+            extract_mapped_title(self.mapped(b"a # not\rb"))
+
+    def test_render_mapped_page_matches_render_page(self):
+        md = "# Title\n\nSome _text_ here\n\n1. one\n2. two\n\n```\ncode\n```\n"
+        template = Template("<h>{{ Title }}</h>{{ Content }}")
+        self.assertEqual(
+            render_mapped_page(self.write(md.encode("utf-8")), template),
+            render_page(md, template),
+        )
+
+    def test_render_mapped_page_front_matter(self):
+        md = "---\ntitle: Custom\ntags: [a]\n---\n# Title\n\ntext\n"
+        template = Template("<h>{{ Title }}</h>{{ Content }}")
+        page = render_mapped_page(self.write(md.encode("utf-8")), template)
+        self.assertEqual(page, render_page(md, template))
+        self.assertTrue(page.startswith("<h>Custom</h>"))
+
+    def test_render_mapped_page_empty_file(self):
+        with self.assertRaises(ValueError):
+            render_mapped_page(self.write(b""), Template("{{ Content }}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
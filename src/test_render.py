@@ -0,0 +1,65 @@
+import unittest
+from render import Template, render_markdown, render_page, render_many
+
+
+class TestRender(unittest.TestCase):
+    def test_render_markdown(self):
+        self.assertEqual(
+            render_markdown("Some **bold** text"), "<div><p>Some <b>bold</b> text</p></div>"
+        )
+
+    def test_render_page(self):
+        template = '<title>{{ Title }}</title><link href="/index.css"><main>{{ Content }}</main>'
+        page = render_page("# Hello\n\n![tom](/images/tom.png)", template, "/site/")
+        self.assertEqual(
+            page,
+            '<title>Hello</title><link href="/site/index.css"><main>'
+            '<div><h1 id="hello">Hello</h1><p><img src="/site/images/tom.png" alt="tom"></img></p></div>'
+            "</main>",
+        )
+
+    def test_render_page_escapes_title(self):
+        template = "<title>{{ Title }}</title>"
+        self.assertEqual(
+            render_page("# Tom & Jerry <3", template), "<title>Tom &amp; Jerry &lt;3</title>"
+        )
+        self.assertEqual(
+            render_page("---\ntitle: A <b> & c\n---\n# Heading", template),
+            "<title>A &lt;b&gt; &amp; c</title>",
+        )
+
+    def test_render_page_missing_title(self):
+        with self.assertRaises(ValueError):
+            render_page("no title here", "{{ Content }}")
+
+    def test_render_many(self):
+        pages = render_many(["# One", "# Two"], "{{ Title }}|{{ Content }}")
+        self.assertEqual(
+            list(pages),
+            [
+                'One|<div><h1 id="one">One</h1></div>',
+                'Two|<div><h1 id="two">Two</h1></div>',
+            ],
+        )
+
+
+class TestTemplate(unittest.TestCase):
+    def test_slots(self):
+        template = Template("{{ Title }} {{ Content }} {{ Title }}")
+        self.assertEqual(template.slots, {"Title", "Content"})
+        self.assertEqual(template.render(Title="a", Content="b"), "a b a")
+
+    def test_unknown_slot_is_left_alone(self):
+        template = Template("{{ Title }} {{ Footer }}")
+        self.assertEqual(template.render(Title="a"), "a {{ Footer }}")
+
+    def test_basepath_applies_to_template_and_slots(self):
+        template = Template('<a href="/x">{{ Content }}</a>', "/b/")
+        self.assertEqual(
+            template.render(Content='<img src="/y.png">'),
+            '<a href="/b/x"><img src="/b/y.png"></a>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from render_one import render_one, main
+
+
+class TestRenderOne(unittest.TestCase):
+    def test_render_one(self):
+        html = render_one("# Title\n\nSome **bold** text")
+        self.assertEqual(html, '<div><h1 id="title">Title</h1><p>Some <b>bold</b> text</p></div>')
+
+    def test_main_renders_file_to_stdout(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.md")
+            with open(path, "w") as f:
+                f.write("- one\n- two")
+            with mock.patch("sys.stdout", new=io.StringIO()) as out:
+                self.assertEqual(main([path]), 0)
+        self.assertEqual(out.getvalue(), "<div><ul><li>one</li><li>two</li></ul></div>")
+
+    def test_main_renders_stdin(self):
+        with mock.patch("sys.stdin", new=io.StringIO("_hi_")), mock.patch(
+            "sys.stdout", new=io.StringIO()
+        ) as out:
+            self.assertEqual(main(["-"]), 0)
+        self.assertEqual(out.getvalue(), "<div><p><i>hi</i></p></div>")
+
+    def test_main_rejects_extra_arguments(self):
+        with mock.patch("sys.stderr", new=io.StringIO()):
+            self.assertEqual(main(["a.md", "b.md"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+from concurrent.futures import ProcessPoolExecutor
+import generate_page
+from render import Template
+from scheduler import EXPANSION_FACTOR, parse_size, render_pages
+
+
+class CrashingTemplate(Template):
+    """Kills the worker process rendering a page that mentions CRASH."""
+
+    def render(self, **slots):
+        if "CRASH" in slots.get("Content", ""):
+            os._exit(1)
+        return super().render(**slots)
+
+
+class TestScheduler(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(parse_size("4096"), 4096)
+        self.assertEqual(parse_size("512M"), 512 * 1024 * 1024)
+        self.assertEqual(parse_size("4g"), 4 * 1024 ** 3)
+        self.assertEqual(parse_size("1.5KB"), 1536)
+        with self.assertRaises(ValueError):
+            parse_size("lots")
+
+    def render(self, jobs, memory_budget, submit=None):
+        with tempfile.TemporaryDirectory() as tmp:
+            pages = []
+            for i in range(6):
+                from_path = os.path.join(tmp, f"page{i}.md")
+                with open(from_path, "w") as f:
+                    f.write(f"# Page {i}\n\n" + "text " * (i * 100))
+                pages.append((from_path, os.path.join(tmp, "out", f"page{i}.html")))
+
+            with unittest.mock.patch("builtins.print"), unittest.mock.patch.object(
+                ProcessPoolExecutor, "submit", submit or ProcessPoolExecutor.submit
+            ):
+                results = list(
+                    render_pages(pages, Template("{{ Title }}"), jobs, memory_budget)
+                )
+            outputs = {}
+            for _, dest_path, _, _, _ in results:
+                with open(dest_path) as f:
+                    outputs[os.path.basename(dest_path)] = f.read()
+            return results, outputs
+
+    def test_sequential(self):
+        results, outputs = self.render(1, None)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(outputs["page3.html"], "Page 3")
+
+    def test_parallel_under_budget(self):
+        # the budget is smaller than the largest page, which must still render
+        results, outputs = self.render(3, 1000)
+        self.assertEqual(sorted(outputs), [f"page{i}.html" for i in range(6)])
+        self.assertEqual(
+            sorted(sha for _, _, sha, _, _ in results),
+            sorted(sha for _, _, sha, _, _ in self.render(1, None)[0]),
+        )
+
+    def test_in_flight_pages_stay_within_budget(self):
+        # pages cost 80 to 20080 bytes, so only some of them fit together
+        budget = 20000
+        submit = ProcessPoolExecutor.submit
+        running = {}
+        overruns = []
+
+        def checked_submit(executor, fn, from_path, *args):
+            cost = os.path.getsize(from_path) * EXPANSION_FACTOR
+            for future in [future for future in running if future.done()]:
+                del running[future]
+            if running and sum(running.values()) + cost > budget:
+                overruns.append((sorted(running.values()), cost))
+            future = submit(executor, fn, from_path, *args)
+            running[future] = cost
+            return future
+
+        results, outputs = self.render(3, budget, checked_submit)
+        self.assertEqual(sorted(outputs), [f"page{i}.html" for i in range(6)])
+        self.assertEqual(overruns, [])
+
+
+    def test_per_page_template(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            from_path = os.path.join(tmp, "index.md")
+            with open(from_path, "w") as f:
+                f.write("# Home")
+            pages = [
+                (from_path, os.path.join(tmp, "index.html")),
+                (from_path, os.path.join(tmp, "fr", "index.html"), Template("fr: {{ Title }}")),
+            ]
+            for jobs in (1, 2):
+                with unittest.mock.patch("builtins.print"):
+                    list(render_pages(pages, Template("{{ Title }}"), jobs))
+                with open(os.path.join(tmp, "index.html")) as f:
+                    self.assertEqual(f.read(), "Home")
+                with open(os.path.join(tmp, "fr", "index.html")) as f:
+                    self.assertEqual(f.read(), "fr: Home")
+
+    def test_shared_source_is_parsed_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            from_path = os.path.join(tmp, "index.md")
+            with open(from_path, "w") as f:
+                f.write("# Home")
+            pages = [(from_path, os.path.join(tmp, "index.html"))] + [
+                (from_path, os.path.join(tmp, locale, "index.html"), Template(locale + ": {{ Title }}"))
+                for locale in ("fr", "de")
+            ]
+            with unittest.mock.patch("builtins.print"), unittest.mock.patch(
+                "generate_page.read_document", wraps=generate_page.read_document
+            ) as read_document:
+                results = list(render_pages(pages, Template("{{ Title }}")))
+            self.assertEqual(read_document.call_count, 1)
+            self.assertEqual([result[1] for result in results], [page[1] for page in pages])
+            with open(os.path.join(tmp, "de", "index.html")) as f:
+                self.assertEqual(f.read(), "de: Home")
+
+
+    def test_errors_are_collected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pages = []
+            for name, text in (("good", "# Good"), ("bad", "no title")):
+                from_path = os.path.join(tmp, f"{name}.md")
+                with open(from_path, "w") as f:
+                    f.write(text)
+                pages.append((from_path, os.path.join(tmp, f"{name}.html")))
+
+            for jobs in (1, 2):
+                errors = []
+                with unittest.mock.patch("builtins.print"):
+                    results = list(render_pages(pages, Template("{{ Title }}"), jobs, errors=errors))
+                self.assertEqual([result[1] for result in results], [pages[0][1]])
+                self.assertEqual(errors, [{
+                    "source": pages[1][0],
+                    "output": pages[1][1],
+                    "error": "ValueError: Title is missing.",
+                }])
+
+            with self.assertRaises(ValueError):
+                with unittest.mock.patch("builtins.print"):
+                    list(render_pages(pages, Template("{{ Title }}")))
+
+    def test_worker_crash_is_collected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pages = []
+            for i in range(6):
+                from_path = os.path.join(tmp, f"page{i}.md")
+                with open(from_path, "w") as f:
+                    f.write(f"# Page {i}\n\n" + ("CRASH" if i == 2 else "fine"))
+                pages.append((from_path, os.path.join(tmp, f"page{i}.html")))
+
+            errors = []
+            with unittest.mock.patch("builtins.print"):
+                results = list(render_pages(pages, CrashingTemplate("{{ Title }}"), 2, errors=errors))
+            self.assertEqual(
+                sorted(result[1] for result in results),
+                [dest_path for i, (_, dest_path) in enumerate(pages) if i != 2],
+            )
+            self.assertEqual(len(errors), 1)
+            self.assertEqual(errors[0]["source"], pages[2][0])
+            self.assertTrue(errors[0]["error"].startswith("BrokenProcessPool"))
+
+
+if __name__ == "__main__":
+    unittest.main()
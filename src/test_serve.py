@@ -0,0 +1,136 @@
+import os
+import tempfile
+import threading
+import unittest
+import unittest.mock
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from render import render_page
+from serve import LIVE_RELOAD_SCRIPT, DevSite, LiveReload, make_handler
+
+
+class TestDevSite(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/index.md", "# Blog")
+        self.write("content/blog/post.md", "# Post")
+        self.write("static/index.css", "body {}")
+        self.write("template.html", "<body>{{ Title }}</body>")
+        self.site = DevSite(
+            self.path("content"), self.path("static"), self.path("template.html"), cache_size=2
+        )
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def write(self, name, text, mtime_ns=None):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_resolve(self):
+        cases = {
+            "/": ("page", "content/index.md"),
+            "/blog/": ("page", "content/blog/index.md"),
+            "/blog": ("page", "content/blog/index.md"),
+            "/blog/index.html": ("page", "content/blog/index.md"),
+            "/blog/post.html": ("page", "content/blog/post.md"),
+            "/blog/post": ("page", "content/blog/post.md"),
+            "/index.css": ("static", "static/index.css"),
+        }
+        for url, (kind, name) in cases.items():
+            with self.subTest(url):
+                self.assertEqual(self.site.resolve(url), (kind, self.path(name)))
+        for url in ("/missing", "/../template.html", "/%2e%2e/template.html"):
+            with self.subTest(url):
+                self.assertIsNone(self.site.resolve(url))
+
+    def test_pages_render_once_until_they_change(self):
+        source = self.path("content/index.md")
+        with unittest.mock.patch("serve.render_page", wraps=render_page) as render:
+            self.assertEqual(self.site.render(source), "<body>Home</body>")
+            self.assertEqual(self.site.render(source), "<body>Home</body>")
+            self.assertEqual(render.call_count, 1)
+
+            self.write("content/index.md", "# Changed", mtime_ns=1)
+            self.assertTrue(self.site.poll())
+            self.assertEqual(self.site.reload.version, 1)
+            self.assertEqual(self.site.render(source), "<body>Changed</body>")
+            self.assertEqual(render.call_count, 2)
+        self.assertFalse(self.site.poll())
+
+    def test_cache_is_bounded_lru(self):
+        for name in ("index.md", "blog/index.md", "index.md", "blog/post.md"):
+            self.site.render(self.path(f"content/{name}"))
+        self.assertEqual(
+            list(self.site.pages),
+            [self.path("content/index.md"), self.path("content/blog/post.md")],
+        )
+
+    def test_template_change_clears_cache(self):
+        self.site.render(self.path("content/index.md"))
+        self.write("template.html", "<main>{{ Title }}</main>", mtime_ns=1)
+        self.assertTrue(self.site.poll())
+        self.assertEqual(self.site.pages, {})
+        self.assertEqual(self.site.render(self.path("content/index.md")), "<main>Home</main>")
+
+    def test_served_static_files_are_watched(self):
+        self.site.mark_served(self.path("static/index.css"))
+        self.assertFalse(self.site.poll())
+        os.remove(self.path("static/index.css"))
+        self.assertTrue(self.site.poll())
+
+
+class TestLiveReload(unittest.TestCase):
+    def test_wait_returns_on_notify(self):
+        reload = LiveReload()
+        self.assertEqual(reload.wait(0, timeout=0.01), 0)
+        threading.Timer(0.01, reload.notify).start()
+        self.assertEqual(reload.wait(0, timeout=5), 1)
+
+
+class TestDevServer(unittest.TestCase):
+    def test_serves_rendered_pages(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "content"))
+            os.makedirs(os.path.join(root, "static"))
+            with open(os.path.join(root, "content", "index.md"), "w") as f:
+                f.write("# Home")
+            with open(os.path.join(root, "content", "broken.md"), "w") as f:
+                f.write("no title")
+            with open(os.path.join(root, "template.html"), "w") as f:
+                f.write("<body><h1>{{ Title }}</h1></body>")
+            site = DevSite(
+                os.path.join(root, "content"),
+                os.path.join(root, "static"),
+                os.path.join(root, "template.html"),
+            )
+
+            server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(site))
+            server.RequestHandlerClass.log_message = lambda *args: None
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+
+            with urllib.request.urlopen(f"{base}/") as response:
+                self.assertEqual(
+                    response.read().decode(), f"<body><h1>Home</h1>{LIVE_RELOAD_SCRIPT}</body>"
+                )
+            for path, status in (("/missing", 404), ("/broken", 500)):
+                with self.subTest(path):
+                    with self.assertRaises(urllib.error.HTTPError) as error:
+                        urllib.request.urlopen(f"{base}{path}")
+                    self.assertEqual(error.exception.code, status)
+                    error.exception.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+from render import Template
+from shard import build_shard, merge_shards, parse_shard, partition_pages
+
+
+class TestShard(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+
+    def test_parse_shard_rejects_bad_specs(self):
+        for spec in ("0/4", "5/4", "1/0", "a/b", "3"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_partition_balances_bytes(self):
+        pages = [("a.md", "a.html", 900), ("b.md", "b.html", 500)]
+        pages += [(f"s{i}.md", f"s{i}.html", 100) for i in range(4)]
+        shards = partition_pages(pages, 2)
+        loads = [sum(page[2] for page in shard) for shard in shards]
+        self.assertEqual(loads, [900, 900])
+
+    def test_partition_is_deterministic(self):
+        pages = [(f"p{i}.md", f"p{i}.html", i % 7) for i in range(50)]
+        self.assertEqual(
+            partition_pages(pages, 3), partition_pages(list(reversed(pages)), 3)
+        )
+
+    def test_build_and_merge(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(os.path.join(content, "blog"))
+            for path, title in (("index.md", "Home"), ("blog/post.md", "Post")):
+                with open(os.path.join(content, path), "w") as f:
+                    f.write(f"# {title}")
+
+            template = Template("{{ Title }}")
+            shard_dirs = [os.path.join(tmp, f"shard{i}") for i in (1, 2)]
+            with unittest.mock.patch("builtins.print"):
+                for index, shard_dir in enumerate(shard_dirs, start=1):
+                    build_shard(content, template, shard_dir, index, 2)
+                manifest = merge_shards(shard_dirs, os.path.join(tmp, "docs"))
+
+            self.assertEqual(
+                [entry["output"] for entry in manifest["pages"]],
+                ["blog/post.html", "index.html"],
+            )
+            with open(os.path.join(tmp, "docs", "blog", "post.html")) as f:
+                self.assertEqual(f.read(), "Post")
+            self.assertEqual(
+                manifest["pages"][0]["meta"],
+                {"title": "Post", "excerpt": "", "date": "", "tags": [], "categories": []},
+            )
+
+    def test_merge_requires_every_shard_of_one_build(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home")
+
+            def shard(name, index, count):
+                shard_dir = os.path.join(tmp, name)
+                build_shard(content, Template("{{ Title }}"), shard_dir, index, count)
+                return shard_dir
+
+            docs = os.path.join(tmp, "docs")
+            with unittest.mock.patch("builtins.print"):
+                first, second, third = shard("a", 1, 3), shard("b", 2, 3), shard("c", 3, 3)
+                other = shard("d", 2, 2)
+                with self.assertRaisesRegex(ValueError, "Missing shards: 2"):
+                    merge_shards([first, third], docs)
+                with self.assertRaisesRegex(ValueError, "both shard 1/3"):
+                    merge_shards([first, first, second, third], docs)
+                with self.assertRaisesRegex(ValueError, "split"):
+                    merge_shards([first, other, third], docs)
+                self.assertFalse(os.path.exists(docs))
+                merge_shards([third, first, second], docs)
+
+    def test_merge_copies_every_format(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home\n\nwelcome")
+
+            shard_dir = os.path.join(tmp, "shard1")
+            with unittest.mock.patch("builtins.print"):
+                build_shard(
+                    content, Template("{{ Title }}"), shard_dir, 1, 1, formats=("html", "text")
+                )
+                merge_shards([shard_dir], os.path.join(tmp, "docs"))
+
+            with open(os.path.join(tmp, "docs", "index.txt")) as f:
+                self.assertEqual(f.read(), "Home\n\nwelcome\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
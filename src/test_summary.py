@@ -0,0 +1,68 @@
+import unittest
+from blocks_markdown import markdown_to_html_node, parse_document
+from render import render_page
+from summary import Summary
+
+
+class TestSummary(unittest.TestCase):
+    def test_excerpt_is_cut_at_a_word_boundary(self):
+        summary = Summary(length=20)
+        summary.add_paragraph("The quick brown fox jumps over")
+        summary.add_paragraph("the lazy dog.")
+        self.assertEqual(summary.excerpt, "The quick brown fox…")
+        self.assertEqual(summary.words, 9)
+
+    def test_short_text_is_kept_whole(self):
+        summary = Summary(length=20)
+        summary.add_paragraph("Short  and\nsweet.")
+        self.assertEqual(summary.excerpt, "Short and sweet.")
+
+    def test_text_past_the_excerpt_is_not_kept(self):
+        summary = Summary(length=20)
+        for _ in range(1000):
+            summary.add_paragraph("one two three four five six")
+        self.assertEqual(len(summary.parts), 1)
+        self.assertEqual(summary.excerpt, "one two three four…")
+        self.assertEqual(summary.words, 6000)
+
+    def test_text_is_kept_until_a_marker(self):
+        summary = Summary(length=20, has_marker=True)
+        for _ in range(3):
+            summary.add_paragraph("one two three four five six")
+        summary.mark()
+        summary.add_paragraph("after")
+        self.assertEqual(summary.excerpt, " ".join(["one two three four five six"] * 3))
+
+    def test_reading_time(self):
+        summary = Summary()
+        self.assertEqual(summary.reading_time, 1)
+        summary.add_text("word " * 401)
+        self.assertEqual(summary.reading_time, 3)
+
+
+class TestPageSummary(unittest.TestCase):
+    def test_more_marker_ends_the_excerpt(self):
+        md = "# Post\n\nFirst *part*.\n\n- a [list](/x)\n\n<!-- more -->\n\nHidden text here."
+        meta = {}
+        html = markdown_to_html_node(md, meta).to_html()
+        self.assertEqual(meta["excerpt"], "First part. a list")
+        # title, then every word of the body, markers excluded
+        self.assertEqual(meta["words"], 8)
+        self.assertEqual(meta["reading_time"], 1)
+        self.assertIn("<!-- more --><p>Hidden text here.</p>", html)
+
+    def test_excerpt_skips_headings_and_code(self):
+        md = "# Title\n\n```\ncode words\n```\n\n| a | b |\n|---|---|\n| c | d |\n\nBody."
+        summary = parse_document(md.split("\n")).summary
+        self.assertEqual(summary.excerpt, "Body.")
+        self.assertEqual(summary.words, 6)
+
+    def test_template_slots(self):
+        template = "{{ Title }}|{{ Excerpt }}|{{ ReadingTime }}|{{ WordCount }}"
+        self.assertEqual(
+            render_page("# T\n\nFish & chips", template), "T|Fish &amp; chips|1 min read|4"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
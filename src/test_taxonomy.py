@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from render import Template
+from taxonomy import TaxonomyIndex, listing_meta, page_url, write_taxonomies
+
+
+def post(title, tags, date=""):
+    return {"title": title, "excerpt": f"About {title}.", "date": date, "tags": tags}
+
+
+class TestTaxonomy(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.template = Template("<title>{{ Title }}</title>{{ Toc }}{{ Content }}")
+
+    def write(self, index):
+        return write_taxonomies(
+            index,
+            self.template,
+            os.path.join(self.tmp.name, "docs"),
+            os.path.join(self.tmp.name, "cache", "taxonomies.json"),
+            os.path.join(self.tmp.name, "cache", "taxonomies"),
+        )
+
+    def read(self, rel_path):
+        with open(os.path.join(self.tmp.name, "docs", rel_path)) as f:
+            return f.read()
+
+    def test_page_url(self):
+        self.assertEqual(page_url("blog/tom/index.html"), "/blog/tom/")
+        self.assertEqual(page_url("contact.html"), "/contact.html")
+
+    def test_index_groups_terms_by_slug(self):
+        index = TaxonomyIndex()
+        index.add("a/index.html", post("A", ["Tolkien"]))
+        index.add("b/index.html", post("B", ["tolkien", "Elves"]))
+        index.add("b/index.html", post("B", ["tolkien"]))
+        terms = index.terms["tags"]
+        self.assertEqual(sorted(terms), ["elves", "tolkien"])
+        self.assertEqual(terms["tolkien"]["name"], "Tolkien")
+        self.assertEqual(sorted(terms["tolkien"]["pages"]), ["/a/", "/b/"])
+
+    def test_listing_meta(self):
+        meta = {"title": "T", "excerpt": "e", "words": 3, "tags": "solo", "date": 2024}
+        self.assertEqual(
+            listing_meta(meta),
+            {"title": "T", "excerpt": "e", "date": "2024", "tags": ["solo"], "categories": []},
+        )
+
+    def test_pagination_newest_first(self):
+        index = TaxonomyIndex()
+        for i in range(3):
+            index.add(f"p{i}.html", post(f"Post {i}", ["x"], f"2024-01-0{i + 1}"))
+        pages = {path: listing for path, _, listing in index.pages(page_size=2)}
+        self.assertEqual(
+            sorted(pages), ["tags/index.html", "tags/x/index.html", "tags/x/page/2/index.html"]
+        )
+        first = pages["tags/x/index.html"]
+        self.assertEqual([entry["title"] for entry in first["entries"]], ["Post 2", "Post 1"])
+        self.assertEqual(pages["tags/index.html"]["cloud"], [("x", "x", 3)])
+
+    def test_write_taxonomies(self):
+        index = TaxonomyIndex()
+        index.add("blog/tom/index.html", post("Tom", ["opinion", "tolkien"]))
+        index.add("blog/elf.html", post("Elf & Co", ["tolkien"]))
+        outputs, rendered = self.write(index)
+
+        self.assertEqual(rendered, 3)
+        self.assertEqual(
+            sorted(outputs), ["tags/index.html", "tags/opinion/index.html", "tags/tolkien/index.html"]
+        )
+        page = self.read("tags/tolkien/index.html")
+        self.assertTrue(page.startswith("<title>Tagged: tolkien</title><div><h1>"))
+        self.assertIn('<a href="/blog/elf.html">Elf &amp; Co</a><p>About Elf &amp; Co.</p>', page)
+        self.assertIn('<a href="/blog/tom/">Tom</a>', page)
+        cloud = self.read("tags/index.html")
+        self.assertIn('<a href="/tags/opinion/" class="tag-cloud-1">opinion (1)</a>', cloud)
+        self.assertIn('<a href="/tags/tolkien/" class="tag-cloud-5">tolkien (2)</a>', cloud)
+
+    def test_only_changed_listings_are_rendered(self):
+        index = TaxonomyIndex()
+        index.add("a.html", post("A", ["one", "two"]))
+        index.add("b.html", post("B", ["two"]))
+        first, rendered = self.write(index)
+        self.assertEqual(rendered, 3)
+
+        # the output directory is wiped between builds
+        os.remove(os.path.join(self.tmp.name, "docs", "tags", "one", "index.html"))
+        outputs, rendered = self.write(index)
+        self.assertEqual((outputs, rendered), (first, 0))
+        self.assertTrue(self.read("tags/one/index.html").startswith("<title>Tagged: one"))
+
+        # B gains a tag: its new listing and the cloud change, `two` does not
+        index.add("b.html", post("B", ["one", "two"]))
+        outputs, rendered = self.write(index)
+        self.assertEqual(rendered, 2)
+        self.assertEqual(outputs["tags/two/index.html"], first["tags/two/index.html"])
+        self.assertNotEqual(outputs["tags/one/index.html"], first["tags/one/index.html"])
+
+    def test_template_change_renders_everything(self):
+        index = TaxonomyIndex()
+        index.add("a.html", post("A", ["one"]))
+        self.write(index)
+        self.template = Template("{{ Content }}")
+        self.assertEqual(self.write(index)[1], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
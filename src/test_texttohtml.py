@@ -84,4 +84,13 @@ class TestTextToHTML(unittest.TestCase):
     def test_alt_with_empty_url(self):
         node = TextNode("Alt text", TextType.ALT, "")
         with self.assertRaises(ValueError):
-            text_node_to_html_node(node)
\ No newline at end of file
+            text_node_to_html_node(node)
+
+    def test_nested_bold_text(self):
+        node = TextNode(
+            "bold italic",
+            TextType.BOLD,
+            children=[TextNode("bold ", TextType.PLAIN), TextNode("italic", TextType.ITALIC)],
+        )
+        html_node = text_node_to_html_node(node)
+        self.assertEqual(html_node.to_html(), "<b>bold <i>italic</i></b>")
@@ -9,10 +9,14 @@ class TextType(Enum):
     ALT = "alt"
 
 class TextNode:
-    def __init__(self, text, text_type, url=None):
+    def __init__(self, text, text_type, url=None, children=None, title=None):
         self.text = text
         self.text_type = text_type
         self.url = url
+        # nested inline nodes, only set when the content is more than plain text
+        self.children = children
+        # the optional title of a link or image
+        self.title = title
     
     def __eq__(self, other):
         if not isinstance(other, TextNode):
@@ -20,8 +24,12 @@ class TextNode:
         return (
             self.text == other.text and
             self.text_type == other.text_type and
-            self.url == other.url
+            self.url == other.url and
+            self.children == other.children and
+            self.title == other.title
         )
     
     def __repr__(self):
-        return f'TextNode("{self.text}", {self.text_type}, {self.url})'
\ No newline at end of file
+        if self.children:
+            return f'TextNode("{self.text}", {self.text_type}, {self.url}, {self.children})'
+        return f'TextNode("{self.text}", {self.text_type}, {self.url})'
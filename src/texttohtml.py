@@ -1,5 +1,5 @@
 from textnode import TextType
-from htmlnode import LeafNode
+from htmlnode import LeafNode, ParentNode, escape_text
 
 def text_node_to_html_node(text_node):
     if not isinstance(text_node.text_type, TextType):
@@ -7,20 +7,32 @@ def text_node_to_html_node(text_node):
     
     match text_node.text_type:
         case TextType.PLAIN:
-            return LeafNode(tag=None, value=text_node.text)
+            return LeafNode(tag=None, value=escape_text(text_node.text))
         case TextType.BOLD:
-            return LeafNode(tag="b", value=text_node.text)
+            return nested_node("b", text_node)
         case TextType.ITALIC:
-            return LeafNode(tag="i", value=text_node.text)
+            return nested_node("i", text_node)
         case TextType.CODE:
-            return LeafNode(tag="code", value=text_node.text)
+            return LeafNode(tag="code", value=escape_text(text_node.text))
         case TextType.LINK:
             if not text_node.url:
                 raise ValueError("URL is required for LINK text type")
-            return LeafNode(tag="a", value=text_node.text, props={"href": text_node.url})
+            props = {"href": text_node.url}
+            if text_node.title is not None:
+                props["title"] = text_node.title
+            return nested_node("a", text_node, props=props)
         case TextType.ALT:
             if not text_node.url:
                 raise ValueError("URL is required for ALT text type")
-            return LeafNode(tag="img", value="", props={"src": text_node.url, "alt": text_node.text})
+            props = {"src": text_node.url, "alt": text_node.text}
+            if text_node.title is not None:
+                props["title"] = text_node.title
+            return LeafNode(tag="img", value="", props=props)
         case _:
-            raise ValueError(f"Unsupported text type: {text_node.text_type}")
\ No newline at end of file
+            raise ValueError(f"Unsupported text type: {text_node.text_type}")
+
+def nested_node(tag, text_node, props=None):
+    if text_node.children:
+        children = [text_node_to_html_node(child) for child in text_node.children]
+        return ParentNode(tag=tag, children=children, props=props)
+    return LeafNode(tag=tag, value=escape_text(text_node.text), props=props)